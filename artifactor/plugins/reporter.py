@@ -11,14 +11,17 @@ artifactor:
             enabled: True
             plugin: reporter
             only_failed: False #Only show faled tests in the report
+            incremental: True #Build the report test by test, see IncrementalReport
+            build_interval: 60 #Least seconds between two writes of the incremental report
 """
 import csv
 import datetime
-import difflib
 import math
 import shutil
 import time
 from copy import deepcopy
+from functools import partial
+from itertools import count
 
 import os
 import re
@@ -29,6 +32,7 @@ from artifactor import ArtifactorBasePlugin
 from cfme.utils import process_pytest_path
 from cfme.utils.conf import cfme_data  # Only for the provider specific reports
 from cfme.utils.path import template_path
+from cfme.utils.traceback_clusters import TracebackClusters
 import six
 
 _tests_tpl = {
@@ -44,6 +48,8 @@ _tests_tpl = {
     '_duration': 0
 }
 
+STATUSES = ('passed', 'failed', 'skipped', 'error', 'xpassed', 'xfailed')
+
 # Regexp, that finds all URLs in a string
 # Does not cover all the cases, but rather only those we can
 URL = re.compile(r"https?://[^/\s]+(?:/[^/\s?]+)*/?(?:\?(?:[^&\s=]+(?:=[^&\s]+)?&?)*)?")
@@ -83,14 +89,22 @@ class ReporterBase(object):
             self.render_report(template_data, "report_{}".format(mgmt), artifact_dir,
                 'test_report_provider.html')
 
+    @property
+    def template_env(self):
+        if getattr(self, '_template_env', None) is None:
+            self._template_env = Environment(
+                loader=FileSystemLoader(template_path.strpath)
+            )
+        return self._template_env
+
     def render_report(self, report, filename, log_dir, template):
-        template_env = Environment(
-            loader=FileSystemLoader(template_path.strpath)
-        )
-        data = template_env.get_template(template).render(**report)
+        data = self.template_env.get_template(template).render(**report)
 
         with open(os.path.join(log_dir, '{}.html'.format(filename)), "w") as f:
             f.write(data)
+        self.copy_dist(log_dir)
+
+    def copy_dist(self, log_dir):
         try:
             shutil.copytree(template_path.join('dist').strpath, os.path.join(log_dir, 'dist'))
         except OSError:
@@ -118,97 +132,22 @@ class ReporterBase(object):
             'error': 0,
             'xfailed': 0,
             'xpassed': 0}
-        colors = {
-            'passed': 'success',
-            'failed': 'warning',
-            'error': 'danger',
-            'xpassed': 'danger',
-            'xfailed': 'success',
-            'skipped': 'info'}
         # Iterate through the tests and process the counts and durations
         for test_name, test in artifacts.items():
             if not test.get('statuses'):
                 continue
-            overall_status = overall_test_status(test['statuses'])
+            test_data = self.test_data(test_name, test, log_dir, template_data['qa'])
+            overall_status = test_data['outcomes']['overall']
             counts[overall_status] += 1
             if not test.get('old', False):
                 current_counts[overall_status] += 1
-            color = colors[overall_status]
-            # This was removed previously but is needed as the overall is not generated
-            # until the test finishes. So this is here as a shim.
-            test['statuses']['overall'] = overall_status
-            test_data = {'name': test_name, 'outcomes': test['statuses'],
-                         'slaveid': test.get('slaveid', "Unknown"), 'color': color}
-            if 'composite' in test:
-                test_data['composite'] = test['composite']
-
-            if 'skipped' in test:
-                if test['skipped'].get('type') == 'provider':
-                    provider_skip_count += 1
-                    test_data['skip_provider'] = test['skipped'].get('reason')
-                if test['skipped'].get('type') == 'blocker':
-                    blocker_skip_count += 1
-                    test_data['skip_blocker'] = test['skipped'].get('reason')
-
+            if 'skip_provider' in test_data:
+                provider_skip_count += 1
             if 'skip_blocker' in test_data:
-                # Fix the inconveniently long list of repeated blockers until we sort out sets
-                # in riggerlib somehow.
-                test_data['skip_blocker'] = sorted(set(test_data['skip_blocker']))
-
-            if test.get('old', False):
-                test_data['old'] = True
-
-            if test.get('start_time'):
-                if test.get('finish_time'):
-                    test_data['in_progress'] = False
-                    test_data['duration'] = test['finish_time'] - test['start_time']
-                else:
-                    test_data['duration'] = time.time() - test['start_time']
-                    test_data['in_progress'] = True
-
-            # Set up destinations for the files
-            test_data["file_groups"] = []
-            test_data['qa_contact'] = []
-            processed_groups = {}
-            order = 0
-            for file_dict in test.get('files', []):
-                group = file_dict["group_id"]
-                if group not in processed_groups:
-                    processed_groups[group] = (order, [])
-                    order += 1
-                processed_groups[group][-1].append(file_dict)
-            # Current structure:
-            # {groupid: (group_order, [{filedict1}, {filedict2}])}
-            # Sorting by group_order
-            processed_groups = sorted(processed_groups.items(), key=lambda kv: kv[1][0])
-            # And now make it [(groupid, [{filedict1}, {filedict2}, ...])]
-            processed_groups = [(group_name, files) for group_name, (_, files) in processed_groups]
-            for group_name, file_dicts in processed_groups:
-                group_file_list = []
-                for file_dict in file_dicts:
-                    if file_dict["file_type"] == "qa_contact":
-                        with open(file_dict["os_filename"], 'rb') as qafile:
-                            qareader = csv.reader(qafile, delimiter=',', quotechar='"')
-                            for qacontact in qareader:
-                                test_data['qa_contact'].append(qacontact)
-                                if qacontact[0] not in template_data['qa']:
-                                    template_data['qa'].append(qacontact[0])
-                        continue  # Do not store, handled a different way :)
-                    elif file_dict["file_type"] == "short_tb":
-                        with open(file_dict["os_filename"], 'r') as short_tb:
-                            test_data["short_tb"] = short_tb.read()
-                        continue
-                    file_dict["filename"] = file_dict["os_filename"].replace(log_dir, "")
-                    group_file_list.append(file_dict)
-
-                test_data["file_groups"].append((group_name, group_file_list))
-            # Snd remove groups that are left empty because of eg. traceback or qa contact
-            test_data["file_groups"] = filter(
-                lambda group: len(group[1]) > 0, test_data["file_groups"])
-            if "short_tb" in test_data and test_data["short_tb"]:
-                urls = [url for url in URL.findall(test_data["short_tb"])]
-                if urls:
-                    test_data["urls"] = urls
+                blocker_skip_count += 1
+            tb_error = self.tb_error(test_name, test)
+            if tb_error:
+                tb_errors.append(tb_error)
             template_data['tests'].append(test_data)
         template_data['top10'] = self.top10(tb_errors)
         template_data['counts'] = counts
@@ -237,19 +176,116 @@ class ReporterBase(object):
 
         return template_data
 
-    def top10(self, tb_errors):
-        sets = []
-        for entry in tb_errors:
-            for tset in sets:
-                if difflib.SequenceMatcher(a=entry[0][:10], b=tset[0][0][:10]).ratio() > .8:
-                    if difflib.SequenceMatcher(a=entry[0][:20], b=tset[0][0][:20]).ratio() > .75:
-                        if difflib.SequenceMatcher(a=entry[0][:30], b=tset[0][0][:30]).ratio() > .7:
-                            tset.append(entry)
-                            break
+    def test_data(self, test_name, test, log_dir, qa):
+        """Processes the artifacts of a test into its data for the report templates
+
+        Args:
+            test_name: Identifier of the test
+            test: Artifacts of the test, they must have its ``statuses``
+            log_dir: Artifact dir ending with a slash, file names are made relative to it
+            qa: List of the QA contacts of the report, the new ones of the test are appended
+        """
+        colors = {
+            'passed': 'success',
+            'failed': 'warning',
+            'error': 'danger',
+            'xpassed': 'danger',
+            'xfailed': 'success',
+            'skipped': 'info'}
+        overall_status = overall_test_status(test['statuses'])
+        color = colors[overall_status]
+        # This was removed previously but is needed as the overall is not generated
+        # until the test finishes. So this is here as a shim.
+        test['statuses']['overall'] = overall_status
+        test_data = {'name': test_name, 'outcomes': test['statuses'],
+                     'slaveid': test.get('slaveid', "Unknown"), 'color': color}
+        if 'composite' in test:
+            test_data['composite'] = test['composite']
+
+        if 'skipped' in test:
+            if test['skipped'].get('type') == 'provider':
+                test_data['skip_provider'] = test['skipped'].get('reason')
+            if test['skipped'].get('type') == 'blocker':
+                test_data['skip_blocker'] = test['skipped'].get('reason')
+
+        if 'skip_blocker' in test_data:
+            # Fix the inconveniently long list of repeated blockers until we sort out sets
+            # in riggerlib somehow.
+            test_data['skip_blocker'] = sorted(set(test_data['skip_blocker']))
+
+        if test.get('old', False):
+            test_data['old'] = True
+
+        if test.get('start_time'):
+            if test.get('finish_time'):
+                test_data['in_progress'] = False
+                test_data['duration'] = test['finish_time'] - test['start_time']
             else:
-                sets.append([entry])
+                test_data['duration'] = time.time() - test['start_time']
+                test_data['in_progress'] = True
+
+        # Set up destinations for the files
+        test_data["file_groups"] = []
+        test_data['qa_contact'] = []
+        processed_groups = {}
+        order = 0
+        for file_dict in test.get('files', []):
+            group = file_dict["group_id"]
+            if group not in processed_groups:
+                processed_groups[group] = (order, [])
+                order += 1
+            processed_groups[group][-1].append(file_dict)
+        # Current structure:
+        # {groupid: (group_order, [{filedict1}, {filedict2}])}
+        # Sorting by group_order
+        processed_groups = sorted(processed_groups.items(), key=lambda kv: kv[1][0])
+        # And now make it [(groupid, [{filedict1}, {filedict2}, ...])]
+        processed_groups = [(group_name, files) for group_name, (_, files) in processed_groups]
+        for group_name, file_dicts in processed_groups:
+            group_file_list = []
+            for file_dict in file_dicts:
+                if file_dict["file_type"] == "qa_contact":
+                    with open(file_dict["os_filename"], 'rb') as qafile:
+                        qareader = csv.reader(qafile, delimiter=',', quotechar='"')
+                        for qacontact in qareader:
+                            test_data['qa_contact'].append(qacontact)
+                            if qacontact[0] not in qa:
+                                qa.append(qacontact[0])
+                    continue  # Do not store, handled a different way :)
+                elif file_dict["file_type"] == "short_tb":
+                    with open(file_dict["os_filename"], 'r') as short_tb:
+                        test_data["short_tb"] = short_tb.read()
+                    continue
+                file_dict["filename"] = file_dict["os_filename"].replace(log_dir, "")
+                group_file_list.append(file_dict)
+
+            test_data["file_groups"].append((group_name, group_file_list))
+        # Snd remove groups that are left empty because of eg. traceback or qa contact
+        test_data["file_groups"] = filter(
+            lambda group: len(group[1]) > 0, test_data["file_groups"])
+        if "short_tb" in test_data and test_data["short_tb"]:
+            urls = [url for url in URL.findall(test_data["short_tb"])]
+            if urls:
+                test_data["urls"] = urls
+        return test_data
+
+    def tb_error(self, test_name, test):
+        """Returns the ``(short traceback, test name)`` of a failed test for :py:meth:`top10`"""
+        if test['statuses'].get('overall') not in ('failed', 'error'):
+            return None
+        exception = test.get('exception') or {}
+        text = exception.get('short_tb') or exception.get('exception')
+        return (text, test_name) if text else None
 
-        return sorted(sets, lambda p, q: cmp(len(p), len(q)), reverse=True)[:10]
+    def top10(self, tb_errors):
+        """Clusters the ``(short traceback, test name)`` of the failed tests, returns the entries
+        of the 10 largest clusters, the example of the cluster first"""
+        clusters = TracebackClusters()
+        for entry in tb_errors:
+            clusters.add(*entry)
+        return [[cluster.example] + [entry for entry in cluster.entries
+                                     if entry is not cluster.example]
+                for cluster in clusters.top(10)]
 
     def build_dict(self, path, container, contents):
         """
@@ -279,70 +315,349 @@ class ReporterBase(object):
             container['_stats'][contents['outcomes']['overall']] += 1
             container['_duration'] += contents['duration']
 
+    _bimdict = {'passed': 'success',
+                'failed': 'warning',
+                'error': 'danger',
+                'skipped': 'primary',
+                'xpassed': 'danger',
+                'xfailed': 'success'}
+
     def build_li(self, lev):
         """
         Build up the actual HTML tree from the dict from build_dict
         """
-        bimdict = {'passed': 'success',
-                   'failed': 'warning',
-                   'error': 'danger',
-                   'skipped': 'primary',
-                   'xpassed': 'danger',
-                   'xfailed': 'success'}
         list_string = '<ul>\n'
         for k, v in lev['_sub'].items():
 
             # If 'name' is an attribute then we are looking at a test (leaf).
             if 'name' in v:
-                pretty_time = str(datetime.timedelta(seconds=math.ceil(v['duration'])))
-                teststring = '<span name="mod_lev" class="label label-primary">T</span>'
-                label = '<span class="label label-{}">{}</span>'.format(
-                    bimdict[v['outcomes']['overall']], v['outcomes']['overall'].upper())
-                proc_name = process_pytest_path(v['name'])[-1]
-                link = (
-                    '<a href="#{}">{} {} {} <span style="color:#888888"><em>[{}]</em></span></a>'
-                    .format(v['name'], proc_name, teststring, label, pretty_time))
-                # Do we really need the os.path.split (now process_pytest_path) here?
-                # For me it seems the name is always the leaf
-                list_string += '<li>{}</li>\n'.format(link)
+                list_string += self.test_li(v)
 
             # If there is a '_sub' attribute then we know we have other modules to go.
             elif '_sub' in v:
-                percenstring = ""
-                bmax = 0
-                for _, val in v['_stats'].items():
-                    bmax += val
-                # If there were any NON skipped tests, we now calculate the percentage which
-                # passed.
-                if bmax:
-                    percen = "{:.2f}".format((float(v['_stats']['passed']) +
-                                              float(v['_stats']['xfailed'])) / float(bmax) * 100)
-                    if float(percen) == 100.0:
-                        level = 'passed'
-                    elif float(percen) > 80.0:
-                        level = 'failed'
-                    else:
-                        level = 'error'
-                    percenstring = '<span name="blab" class="label label-{}">{}%</span>'.format(
-                        bimdict[level], percen)
-                modstring = '<span name="mod_lev" class="label label-primary">M</span>'
-                pretty_time = str(datetime.timedelta(seconds=math.ceil(v['_duration'])))
-                list_string += ('<li>{} {}<span>&nbsp;</span>'
-                                '{}{}<span style="color:#888888">&nbsp;<em>[{}]'
-                                '</em></span></li>\n').format(k,
-                                                              modstring,
-                                                              str(percenstring),
-                                                              self.build_li(v),
-                                                              pretty_time)
+                head, tail = self.module_li(k, v['_stats'], v['_duration'])
+                list_string += head + self.build_li(v) + tail
         list_string += '</ul>\n'
         return list_string
 
+    def test_li(self, test_data):
+        """Returns the tree item of a test"""
+        pretty_time = str(datetime.timedelta(seconds=math.ceil(test_data.get('duration', 0))))
+        teststring = '<span name="mod_lev" class="label label-primary">T</span>'
+        label = '<span class="label label-{}">{}</span>'.format(
+            self._bimdict[test_data['outcomes']['overall']],
+            test_data['outcomes']['overall'].upper())
+        proc_name = process_pytest_path(test_data['name'])[-1]
+        link = (
+            '<a href="#{}">{} {} {} <span style="color:#888888"><em>[{}]</em></span></a>'
+            .format(test_data['name'], proc_name, teststring, label, pretty_time))
+        # Do we really need the os.path.split (now process_pytest_path) here?
+        # For me it seems the name is always the leaf
+        return '<li>{}</li>\n'.format(link)
+
+    def module_li(self, name, stats, duration):
+        """Returns the beginning and the end of the tree item of a module, its subtree goes
+        in between"""
+        percenstring = ""
+        bmax = 0
+        for _, val in stats.items():
+            bmax += val
+        # If there were any NON skipped tests, we now calculate the percentage which
+        # passed.
+        if bmax:
+            percen = "{:.2f}".format((float(stats['passed']) +
+                                      float(stats['xfailed'])) / float(bmax) * 100)
+            if float(percen) == 100.0:
+                level = 'passed'
+            elif float(percen) > 80.0:
+                level = 'failed'
+            else:
+                level = 'error'
+            percenstring = '<span name="blab" class="label label-{}">{}%</span>'.format(
+                self._bimdict[level], percen)
+        modstring = '<span name="mod_lev" class="label label-primary">M</span>'
+        pretty_time = str(datetime.timedelta(seconds=math.ceil(duration)))
+        head = '<li>{} {}<span>&nbsp;</span>{}'.format(name, modstring, str(percenstring))
+        tail = '<span style="color:#888888">&nbsp;<em>[{}]</em></span></li>\n'.format(pretty_time)
+        return head, tail
+
+
+class Fragments(object):
+    """Append-only file of HTML fragments
+
+    Fragments replaced by newer ones are discarded and left out when the file is copied.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self.discarded = []
+        open(path, 'wb').close()
+
+    def append(self, text):
+        """Appends ``text``, returns its span to discard it later"""
+        data = _utf8(text)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        span = (self.size, len(data))
+        self.size += len(data)
+        return span
+
+    def discard(self, span):
+        self.discarded.append(span)
+
+    def copy_to(self, out):
+        with open(self.path, 'rb') as f:
+            position = 0
+            for offset, length in sorted(self.discarded):
+                _copy_bytes(f, out, offset - position)
+                f.seek(offset + length)
+                position = offset + length
+            _copy_bytes(f, out, self.size - position)
+
+
+def _utf8(text):
+    return text.encode('utf-8') if isinstance(text, six.text_type) else text
+
+
+def _copy_bytes(src, dst, length, chunk_size=1024 * 1024):
+    while length > 0:
+        data = src.read(min(length, chunk_size))
+        if not data:
+            break
+        dst.write(data)
+        length -= len(data)
+
+
+class ReportStore(object):
+    """Tree of modules and pre-rendered fragments of one report
+
+    Every module keeps the aggregated stats and duration of the tests below it, and a
+    :py:class:`Fragments` file of the tree items of its own tests. Writing the tree takes time
+    linear in the number of modules, the fragments are copied as they are.
+
+    Args:
+        directory: Where the fragment files are kept
+        name_filter: Only tests matching it belong to the report, like in ``process_data``
+    """
+    def __init__(self, directory, name_filter=None):
+        self.directory = local(directory)
+        self.directory.ensure(dir=True)
+        self.name_filter = name_filter
+        self._node_ids = count()
+        self.root = self._node()
+        self.root['_sub']['tests'] = self._node()
+        self.panels = Fragments(self.directory.join('panels.html').strpath)
+        self.blocker_rows = Fragments(self.directory.join('blockers.html').strpath)
+        self.provider_rows = Fragments(self.directory.join('providers.html').strpath)
+        # test name: (module nodes from the root, overall status, duration, [(fragments, span)])
+        self.tests = {}
+
+    def _node(self):
+        node = deepcopy(_tests_tpl)
+        node['_id'] = next(self._node_ids)
+        node['_tests'] = None
+        return node
+
+    def matches(self, test_name):
+        return not self.name_filter or re.findall('{}[-\]]+'.format(self.name_filter), test_name)
+
+    def add(self, test_data, test_li, panel=None, blocker_row=None, provider_row=None):
+        """Adds a test to the report, replacing its previous version"""
+        name = test_data['name']
+        self.remove(name)
+        nodes = [self.root]
+        for seg in process_pytest_path(name.replace('cfme/', ''))[:-1]:
+            sub = nodes[-1]['_sub']
+            if seg not in sub:
+                sub[seg] = self._node()
+            nodes.append(sub[seg])
+        module = nodes[-1]
+        if module['_tests'] is None:
+            module['_tests'] = Fragments(
+                self.directory.join('tree_{}.html'.format(module['_id'])).strpath)
+        overall = test_data['outcomes']['overall']
+        duration = test_data.get('duration', 0)
+        for node in nodes[1:]:
+            node['_stats'][overall] += 1
+            node['_duration'] += duration
+        spans = [(module['_tests'], module['_tests'].append(test_li))]
+        for fragments, text in [(self.panels, panel), (self.blocker_rows, blocker_row),
+                                (self.provider_rows, provider_row)]:
+            if text:
+                spans.append((fragments, fragments.append(text)))
+        self.tests[name] = (nodes, overall, duration, spans)
+
+    def remove(self, test_name):
+        if test_name not in self.tests:
+            return
+        nodes, overall, duration, spans = self.tests.pop(test_name)
+        for node in nodes[1:]:
+            node['_stats'][overall] -= 1
+            node['_duration'] -= duration
+        for fragments, span in spans:
+            fragments.discard(span)
+
+    def write_tree(self, out, module_li, node=None):
+        """Writes the ``<ul>`` of the tree, ``module_li`` is :py:meth:`ReporterBase.module_li`"""
+        node = node or self.root
+        out.write(b'<ul>\n')
+        for name, sub in node['_sub'].items():
+            head, tail = module_li(name, sub['_stats'], sub['_duration'])
+            out.write(_utf8(head))
+            self.write_tree(out, module_li, sub)
+            out.write(_utf8(tail))
+        if node['_tests'] is not None:
+            node['_tests'].copy_to(out)
+        out.write(b'</ul>\n')
+
+
+class IncrementalReport(object):
+    """Builds the reports of :py:class:`Reporter` test by test
+
+    Tests are rendered into :py:class:`ReportStore` s once they finish, the tests in progress
+    each time the report is written. Writing a report renders its page once and copies the
+    stored fragments into it, rather than processing every test of the run again as
+    :py:meth:`ReporterBase.process_data` does.
+
+    Args:
+        reporter: The :py:class:`ReporterBase` rendering the tests
+        directory: Where the stores are kept
+        providers: Keys of the providers to make the provider reports of
+        only_failed: Whether to leave the panels of passed tests out of the report
+    """
+    # replaced by the stored fragments when the page is written
+    MARKERS = ('tree', 'panels', 'blocker_rows', 'provider_rows')
+
+    def __init__(self, reporter, directory, providers=(), only_failed=False):
+        self.reporter = reporter
+        self.directory = local(directory)
+        self.only_failed = only_failed
+        self.store = ReportStore(self.directory.join('report'))
+        self.provider_stores = {
+            provider: ReportStore(self.directory.join('report_{}'.format(provider)),
+                                  name_filter=provider)
+            for provider in providers}
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.current_counts = dict.fromkeys(STATUSES, 0)
+        self.blocker_skip_count = 0
+        self.provider_skip_count = 0
+        self.qa = []
+        # test name: (short traceback, test name) of the failed tests
+        self.tb_errors = {}
+        # test name: (overall status, old, blocker skip, provider skip)
+        self.tests = {}
+        self.in_progress = set()
+        self.finished = set()
+        self.marker_re = re.compile('(<!--report-store:(?:{})-->)'.format('|'.join(self.MARKERS)))
+
+    def report(self, test_name):
+        self.finished.discard(test_name)
+        self.in_progress.add(test_name)
+
+    def finish(self, test_name):
+        self.in_progress.discard(test_name)
+        self.finished.add(test_name)
+
+    def flush(self, artifacts, log_dir):
+        """Renders the finished tests and the ones in progress into the stores"""
+        log_dir = local(log_dir).strpath + "/"
+        for test_name in list(self.finished) + list(self.in_progress):
+            test = artifacts.get(test_name)
+            if test and test.get('statuses'):
+                self.add(test_name, test, log_dir)
+        self.finished.clear()
+
+    def add(self, test_name, test, log_dir):
+        test_data = self.reporter.test_data(test_name, test, log_dir, self.qa)
+        self._count(test_name, -1)
+        self.tests[test_name] = (
+            test_data['outcomes']['overall'], bool(test.get('old', False)),
+            'skip_blocker' in test_data, 'skip_provider' in test_data)
+        self._count(test_name, 1)
+        tb_error = self.reporter.tb_error(test_name, test)
+        if tb_error:
+            self.tb_errors[test_name] = tb_error
+        else:
+            self.tb_errors.pop(test_name, None)
+
+        test_li = self.reporter.test_li(test_data)
+        macros = self.reporter.template_env.get_template('test_report_macros.html').module
+        panel_data = dict(test_data)
+        if panel_data.get('duration'):
+            panel_data['duration'] = str(datetime.timedelta(
+                seconds=math.ceil(panel_data['duration'])))
+        # one per line, like the loops of the templates put them
+        panel = blocker_row = provider_row = None
+        if not (self.only_failed and test_data['outcomes']['overall'] == 'passed'):
+            panel = macros.test_panel(panel_data) + '\n'
+        if 'skip_blocker' in test_data:
+            blocker_row = macros.blocker_row(panel_data) + '\n'
+        if 'skip_provider' in test_data:
+            provider_row = macros.provider_row(panel_data) + '\n'
+        self.store.add(test_data, test_li, panel, blocker_row, provider_row)
+        for store in self.provider_stores.values():
+            if store.matches(test_name):
+                store.add(test_data, test_li)
+
+    def _count(self, test_name, sign):
+        if test_name not in self.tests:
+            return
+        overall, old, blocker, provider = self.tests[test_name]
+        self.counts[overall] += sign
+        if not old:
+            self.current_counts[overall] += sign
+        self.blocker_skip_count += sign * blocker
+        self.provider_skip_count += sign * provider
+
+    def template_data(self, version, fw_version, top10=()):
+        return {
+            'tests': [], 'qa': self.qa, 'version': version, 'fw_version': fw_version,
+            'top10': top10, 'counts': self.counts,
+            'current_counts': self.current_counts,
+            'blocker_skip_count': self.blocker_skip_count,
+            'provider_skip_count': self.provider_skip_count,
+            'ndata': '<!--report-store:tree-->',
+            'test_panels': '<!--report-store:panels-->',
+            'blocker_rows': '<!--report-store:blocker_rows-->',
+            'provider_rows': '<!--report-store:provider_rows-->'}
+
+    def write(self, store, filename, log_dir, template, version=None, fw_version=None,
+              top10=()):
+        """Writes the page of ``store`` to ``log_dir/filename.html``"""
+        page = self.reporter.template_env.get_template(template).render(
+            **self.template_data(version, fw_version, top10))
+        fragments = {
+            '<!--report-store:tree-->': partial(
+                store.write_tree, module_li=self.reporter.module_li),
+            '<!--report-store:panels-->': store.panels.copy_to,
+            '<!--report-store:blocker_rows-->': store.blocker_rows.copy_to,
+            '<!--report-store:provider_rows-->': store.provider_rows.copy_to,
+        }
+        path = os.path.join(log_dir, '{}.html'.format(filename))
+        # write aside so that the report is never seen half written
+        with open(path + '.tmp', 'wb') as out:
+            for part in self.marker_re.split(page):
+                if part in fragments:
+                    fragments[part](out)
+                else:
+                    out.write(_utf8(part))
+        os.rename(path + '.tmp', path)
+        self.reporter.copy_dist(log_dir)
+
+    def write_report(self, log_dir, version=None, fw_version=None):
+        self.write(self.store, 'report', log_dir, 'test_report.html', version, fw_version,
+                   top10=self.reporter.top10(self.tb_errors.values()))
+
+    def write_provider_reports(self, log_dir, version=None, fw_version=None):
+        for provider, store in self.provider_stores.items():
+            self.write(store, 'report_{}'.format(provider), log_dir,
+                       'test_report_provider.html', version, fw_version)
+
 
 class Reporter(ArtifactorBasePlugin, ReporterBase):
     def plugin_initialize(self):
         self.register_plugin_hook('report_test', self.report_test)
-        self.register_plugin_hook('finish_session', self.run_report)
-        self.register_plugin_hook('finish_session', self.run_provider_report)
+        self.register_plugin_hook('finish_session', self.finish_session)
         self.register_plugin_hook('build_report', self.run_report)
         self.register_plugin_hook('start_test', self.start_test)
         self.register_plugin_hook('skip_test', self.skip_test)
@@ -353,10 +668,25 @@ class Reporter(ArtifactorBasePlugin, ReporterBase):
 
     def configure(self):
         self.only_failed = self.data.get('only_failed', False)
+        self.incremental = self.data.get('incremental', True)
+        self.build_interval = self.data.get('build_interval', 60)
+        self.incremental_report = None
+        self.last_build = 0
         self.configured = True
 
+    def _incremental_report(self, artifact_dir):
+        if self.incremental_report is None:
+            self.incremental_report = IncrementalReport(
+                self, local(artifact_dir).join('.report_store'),
+                providers=cfme_data['management_systems'].keys(), only_failed=self.only_failed)
+        return self.incremental_report
+
     @ArtifactorBasePlugin.check_configured
-    def composite_pump(self, old_artifacts):
+    def composite_pump(self, old_artifacts, artifact_dir):
+        if self.incremental:
+            report = self._incremental_report(artifact_dir)
+            for test_ident in old_artifacts:
+                report.finish(test_ident)
         return None, {'old_artifacts': old_artifacts}
 
     @ArtifactorBasePlugin.check_configured
@@ -382,15 +712,20 @@ class Reporter(ArtifactorBasePlugin, ReporterBase):
     def finish_test(self, artifacts, test_location, test_name, slaveid):
         test_ident = "{}/{}".format(test_location, test_name)
         overall_status = overall_test_status(artifacts[test_ident]['statuses'])
+        if self.incremental_report is not None:
+            # rendered by the next run_report, once the other plugins have added their files
+            self.incremental_report.finish(test_ident)
         return None, {'artifacts': {test_ident: {
             'finish_time': time.time(), 'slaveid': slaveid,
             'statuses': {'overall': overall_status}
         }}}
 
     @ArtifactorBasePlugin.check_configured
-    def report_test(self, artifacts, test_location, test_name, test_xfail, test_when, test_outcome,
-                    test_phase_duration):
+    def report_test(self, artifacts, artifact_dir, test_location, test_name, test_xfail, test_when,
+                    test_outcome, test_phase_duration):
         test_ident = "{}/{}".format(test_location, test_name)
+        if self.incremental:
+            self._incremental_report(artifact_dir).report(test_ident)
         ret_dict = {
             'artifacts': {
                 test_ident: {
@@ -417,8 +752,27 @@ class Reporter(ArtifactorBasePlugin, ReporterBase):
 
     @ArtifactorBasePlugin.check_configured
     def run_report(self, old_artifacts, artifact_dir, version=None, fw_version=None):
-        self._run_report(old_artifacts, artifact_dir, version, fw_version)
+        if not self.incremental:
+            self._run_report(old_artifacts, artifact_dir, version, fw_version)
+            return
+        report = self._incremental_report(artifact_dir)
+        report.flush(old_artifacts, artifact_dir)
+        # the report is built after every test phase, writing it is what takes time now
+        if time.time() - self.last_build >= self.build_interval:
+            report.write_report(artifact_dir, version, fw_version)
+            self.last_build = time.time()
 
     @ArtifactorBasePlugin.check_configured
     def run_provider_report(self, old_artifacts, artifact_dir, version=None, fw_version=None):
-        self._run_provider_report(old_artifacts, artifact_dir, version, fw_version)
+        if not self.incremental:
+            self._run_provider_report(old_artifacts, artifact_dir, version, fw_version)
+            return
+        report = self._incremental_report(artifact_dir)
+        report.flush(old_artifacts, artifact_dir)
+        report.write_provider_reports(artifact_dir, version, fw_version)
+
+    @ArtifactorBasePlugin.check_configured
+    def finish_session(self, old_artifacts, artifact_dir, version=None, fw_version=None):
+        self.last_build = 0
+        self.run_report(old_artifacts, artifact_dir, version, fw_version)
+        self.run_provider_report(old_artifacts, artifact_dir, version, fw_version)
@@ -91,6 +91,7 @@ class Server(BaseEntity, sentaku.modeling.ElementMixin):
             url=self._api_settings_url,
             data=json.dumps(settings_dict)
         )
+        self.appliance.config_cache.invalidate()
         assert result.ok
 
 
@@ -195,6 +196,7 @@ class Zone(Pretty, BaseEntity, sentaku.modeling.ElementMixin):
             url=self._api_settings_url,
             data=json.dumps(settings_dict)
         )
+        self.appliance.config_cache.invalidate()
         assert result.ok
 
 
@@ -280,6 +282,7 @@ class Region(BaseEntity, sentaku.modeling.ElementMixin):
             url=self._api_settings_url,
             data=json.dumps(settings_dict)
         )
+        self.appliance.config_cache.invalidate()
         assert result.ok
 
 
@@ -23,7 +23,8 @@ from cfme.intelligence.chargeback import ChargebackView
 from cfme.intelligence.rss import RSSView
 from cfme.utils import conf
 from cfme.utils.appliance import MiqImplementationContext
-from cfme.utils.appliance.implementations.ui import navigator, CFMENavigateStep, ViaUI, navigate_to
+from cfme.utils.appliance.implementations.ui import (
+    navigator, CFMENavigateStep, DetachedMiqBrowser, ViaUI, navigate_to)
 from cfme.utils.blockers import BZ
 from cfme.utils.log import logger
 from widgetastic_manageiq import (ManageIQTree, Checkbox, AttributeValueForm, TimelinesView,
@@ -82,7 +83,7 @@ class LoginPage(View):
         if self.flash.is_displayed:
             self.flash.assert_no_error()
 
-    def log_in(self, user, method='click_on_login'):
+    def log_in(self, user, method='click_on_login', set_appliance_user=True):
         self.fill({
             'username': user.credential.principal,
             'password': user.credential.secret,
@@ -95,7 +96,8 @@ class LoginPage(View):
                 self.logger.info(
                     'setting the appliance.user.name to %r because it was not specified', name)
                 user.name = name
-            self.extra.appliance.user = user
+            if set_appliance_user:
+                self.extra.appliance.user = user
 
     def update_password(
             self, username, password, new_password, verify_password=None,
@@ -141,6 +143,21 @@ class LoginPage(View):
         return self.logged_out
 
 
+def log_in_spare_browser(appliance, selenium):
+    """Logs the admin in on a spare browser of :py:class:`cfme.utils.browser_pool.BrowserPool`
+
+    The appliance user is left as it is, the test running meanwhile may be logged in as someone
+    else.
+    """
+    login_view = LoginPage(DetachedMiqBrowser(selenium, appliance.browser))
+    login_view.login_admin(set_appliance_user=False)
+
+
+def spare_browser_logged_in(appliance, selenium):
+    """Whether a spare browser of :py:class:`cfme.utils.browser_pool.BrowserPool` is logged in"""
+    return BaseLoggedInPage(DetachedMiqBrowser(selenium, appliance.browser)).logged_in
+
+
 @MiqImplementationContext.external_for(Server.logged_in, ViaUI)
 def logged_in(self):
     return self.appliance.browser.create_view(BaseLoggedInPage).logged_in
@@ -3,6 +3,7 @@ import datetime
 from collections import Iterable
 
 from manageiq_client.api import APIException
+from sqlalchemy import text
 from widgetastic.widget import View, Text
 from widgetastic_patternfly import Button, Input
 
@@ -66,6 +67,15 @@ def prepare_endpoints(endpoints):
         raise ValueError("Endpoints should be either dict or endpoint class")
 
 
+def ems_count_query(table_str):
+    """ Returns a subquery counting rows of a table related to the provider, for STATS_DB_QUERIES
+
+    Args:
+        table_str: Name of the table with ``ems_id`` column; e.g. 'vms' or 'hosts'
+    """
+    return 'SELECT count(*) FROM {0} WHERE {0}.ems_id = ems.id'.format(table_str)
+
+
 @attr.s(hash=False)
 class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
     # List of constants that every non-abstract subclass must have defined
@@ -75,6 +85,14 @@ class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
 
     _param_name = ParamClassName('name')
     STATS_TO_MATCH = []
+    # Scalar subqueries counting the stats in the database, ``ems`` being the provider's row of
+    # ext_management_systems. All the stats found here are fetched by a single query.
+    STATS_DB_QUERIES = {
+        'num_template': ems_count_query('vms') + ' AND vms.template',
+        'num_vm': ems_count_query('vms') + ' AND NOT vms.template',
+    }
+    # Seconds between checks of the provider refresh in the database
+    REFRESH_POLL_DELAY = 5
     db_types = ["Providers"]
     ems_events = []
     settings_key = None
@@ -551,23 +569,62 @@ class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
         else:
             return True
 
-    def validate(self):
+    @is_refreshed.variant('db')
+    def is_refreshed_db(self, refresh_timer=None, refresh_delta=600):
+        """Checks the last refresh with a single database query.
+
+        Unlike the REST variant, an outdated refresh doesn't trigger a new refresh unless
+        ``refresh_timer`` says it is time, so it can be polled often.
+        """
+        _, age, _ = self._refresh_state()
+        if age is not None and age <= refresh_delta:
+            return True
+        if refresh_timer and refresh_timer.is_it_time():
+            logger.info(' Time for a refresh!')
+            self.refresh_provider_relationships()
+            refresh_timer.reset()
+        return False
+
+    def _refresh_state(self):
+        """ Fetches the last refresh of this provider from the database.
+
+        Returns:
+            ``(last_refresh_date, age, last_refresh_error)`` tuple with the age of the last refresh
+            in seconds, date and age are ``None`` if the provider was not refreshed yet.
+        """
+        result = self.appliance.db.client.engine.execute(
+            text("SELECT last_refresh_date, "
+                 "EXTRACT(EPOCH FROM timezone('utc', now()) - last_refresh_date), "
+                 "last_refresh_error "
+                 "FROM ext_management_systems WHERE name = :name"),
+            name=self.name).first()
+        if result is None:
+            return None, None, None
+        refresh_date, age, error = result
+        return refresh_date, None if age is None else float(age), error
+
+    def validate(self, refresh_delta=600):
         refresh_timer = RefreshTimer(time_for_refresh=300)
+        _, age, _ = self._refresh_state()
+        if age is not None and age > refresh_delta:
+            self.refresh_provider_relationships()
         try:
             wait_for(self.is_refreshed,
                      [refresh_timer],
+                     {'refresh_delta': refresh_delta, 'method': 'db'},
                      message="is_refreshed",
                      num_sec=1000,
-                     delay=60,
+                     delay=self.REFRESH_POLL_DELAY,
                      handle_exception=True)
         except Exception:
             # To see the possible error.
             self.load_details(refresh=True)
             raise
         else:
-            if self.last_refresh_error() is not None:
+            last_refresh_error = self._refresh_state()[2]
+            if last_refresh_error is not None:
                 raise AddProviderError("Cannot validate the provider. Error occured: {}".format(
-                                       self.last_refresh_error()))
+                                       last_refresh_error))
 
     def validate_stats(self, ui=False):
         """ Validates that the detail page matches the Providers information.
@@ -592,12 +649,24 @@ class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
             self.refresh_provider_relationships(method=method)
 
             refresh_timer = RefreshTimer(time_for_refresh=300)
-            wait_for(self._do_stats_match,
-                     [self.mgmt, self.STATS_TO_MATCH, refresh_timer],
-                     {'ui': ui},
+            # The stats in CFME only change with a refresh, so they are matched again once the
+            # last refresh date changes, or after a minute in case the refresh was not noticed
+            recheck_timer = RefreshTimer(time_for_refresh=60)
+            last_refresh = {'date': self._refresh_state()[0]}
+
+            def _stats_match_after_refresh():
+                refresh_date = self._refresh_state()[0]
+                if refresh_date == last_refresh['date'] and not recheck_timer.is_it_time():
+                    return False
+                last_refresh['date'] = refresh_date
+                recheck_timer.reset()
+                return self._do_stats_match(
+                    self.mgmt, self.STATS_TO_MATCH, refresh_timer, ui=ui)
+
+            wait_for(_stats_match_after_refresh,
                      message="do_stats_match_db",
                      num_sec=1000,
-                     delay=60)
+                     delay=self.REFRESH_POLL_DELAY)
 
         self.mgmt.disconnect()
 
@@ -653,6 +722,27 @@ class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
             "AND ext_management_systems.name='{1}'".format(table_str, self.name))
         return int(res.first()[0])
 
+    def _db_stats(self, stats):
+        """ Fetches counts of the stats with one query, see ``STATS_DB_QUERIES``
+
+        Args:
+            stats: Names of the stats, all of them must be in ``STATS_DB_QUERIES``
+
+        Returns:
+            :py:class:`dict` of stat name to its count
+        """
+        if not stats:
+            return {}
+        columns = ', '.join(
+            '({}) AS {}'.format(self.STATS_DB_QUERIES[stat], stat) for stat in stats)
+        result = self.appliance.db.client.engine.execute(
+            text('SELECT {} FROM ext_management_systems ems WHERE ems.name = :name'.format(
+                columns)),
+            name=self.name).first()
+        if result is None:
+            return {stat: 0 for stat in stats}
+        return {stat: int(count) for stat, count in zip(stats, result)}
+
     def _do_stats_match(self, client, stats_to_match=None, refresh_timer=None, ui=False):
         """ A private function to match a set of statistics, with a Provider.
 
@@ -681,9 +771,15 @@ class BaseProvider(Taggable, Updateable, Navigatable, BaseEntity):
                 self.refresh_provider_relationships()
                 refresh_timer.reset()
 
+        # stats with a database query are fetched at once, the others one by one
+        db_stats = {} if ui else self._db_stats(
+            [stat for stat in stats_to_match if stat in self.STATS_DB_QUERIES])
         for stat in stats_to_match:
             try:
-                cfme_stat = getattr(self, stat)(method=method)
+                if stat in db_stats:
+                    cfme_stat = db_stats[stat]
+                else:
+                    cfme_stat = getattr(self, stat)(method=method)
                 success, value = tol_check(host_stats[stat],
                                            cfme_stat,
                                            min_error=0.05,
@@ -494,6 +494,7 @@ class ServerInformation(Updateable, Pretty):
                 logger.warning('No values was changed')
         elif updated_result:
             view.save.click()
+            self.appliance.config_cache.invalidate()
             view.flash.assert_no_error()
         else:
             logger.info('Settings were not changed')
@@ -21,7 +21,8 @@ from cfme.base.credential import TokenCredential
 from cfme.base.login import BaseLoggedInPage
 from cfme.common import TagPageView, PolicyProfileAssignable
 from cfme.common.candu_views import OptionForm
-from cfme.common.provider import BaseProvider, DefaultEndpoint, DefaultEndpointForm, provider_types
+from cfme.common.provider import (
+    BaseProvider, DefaultEndpoint, DefaultEndpointForm, ems_count_query, provider_types)
 from cfme.common.provider_views import (
     BeforeFillMixin, ContainerProviderAddView, ContainerProvidersView,
     ContainerProviderEditView, ContainerProviderEditViewUpdated, ProvidersView,
@@ -193,6 +194,16 @@ class ContainersProvider(BaseProvider, Pretty, PolicyProfileAssignable):
         'num_node',
         'num_image_registry',
         'num_container']
+    STATS_DB_QUERIES = dict(
+        BaseProvider.STATS_DB_QUERIES,
+        num_project=ems_count_query('container_projects'),
+        num_service=ems_count_query('container_services'),
+        num_replication_controller=ems_count_query('container_replicators'),
+        num_container_group=ems_count_query('container_groups'),
+        num_pod=ems_count_query('container_groups'),
+        num_node=ems_count_query('container_nodes'),
+        num_image=ems_count_query('container_images'),
+        num_image_registry=ems_count_query('container_image_registries'))
     # TODO add 'num_volume'
     string_name = "Containers"
     detail_page_suffix = 'provider_detail'
@@ -4,7 +4,7 @@ from os import path
 
 from wrapanapi.containers.providers.rhopenshift import Openshift
 
-from cfme.common.provider import DefaultEndpoint
+from cfme.common.provider import DefaultEndpoint, ems_count_query
 from cfme.control.explorer.alert_profiles import ProviderAlertProfile, NodeAlertProfile
 from cfme.utils import ssh
 from cfme.utils.log import logger
@@ -82,6 +82,10 @@ class AlertsEndpoint(ServiceBasedEndpoint):
 class OpenshiftProvider(ContainersProvider):
     num_route = ['num_route']
     STATS_TO_MATCH = ContainersProvider.STATS_TO_MATCH + num_route
+    STATS_DB_QUERIES = dict(
+        ContainersProvider.STATS_DB_QUERIES,
+        num_route=ems_count_query('container_routes'),
+        num_template=ems_count_query('container_templates'))
     type_name = "openshift"
     mgmt_class = Openshift
     db_types = ["Openshift::ContainerManager"]
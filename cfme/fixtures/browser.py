@@ -116,7 +116,25 @@ def pytest_exception_interact(node, call, report):
         failed_test_tracking['total_failed'] += 1
 
 
+def pytest_sessionstart(session):
+    from cfme.utils.appliance.implementations.ui import MiqBrowserPlugin
+    MiqBrowserPlugin.reset_settle_stats()
+
+
+def pytest_terminal_summary(terminalreporter):
+    from cfme.utils.appliance.implementations.ui import MiqBrowserPlugin
+    summary = MiqBrowserPlugin.settle_stats_summary()
+    if summary:
+        terminalreporter.write_line(summary)
+
+
 def pytest_sessionfinish(session, exitstatus):
+    from cfme.utils.appliance.implementations.ui import MiqBrowserPlugin
+    summary = MiqBrowserPlugin.settle_stats_summary()
+    if summary:
+        # slaves have no terminal summary, their waits are in the log
+        logger.info(summary)
+
     failed_tests_template = template_env.get_template('failed_browser_tests.html')
     outfile = log_path.join('failed_browser_tests.html')
 
@@ -1,6 +1,7 @@
 import os
 import re
 import base64
+import json
 from textwrap import dedent
 from types import FunctionType
 
@@ -15,6 +16,13 @@ from cfme.utils.log import get_rel_path, logger
 
 config = Config(napoleon_use_param=True, napoleon_use_rtype=True)
 
+#: pytest cache key of parsed docstring metadata of one test module
+CACHE_KEY = 'miq-nelson/{}'
+#: parsed docstring metadata per test module, loaded from/saved to the pytest cache
+_module_cache = {}
+_dirty_modules = set()
+_cache_stats = {'hits': 0, 'misses': 0}
+
 
 def get_meta(obj):
     doc = getattr(obj, '__doc__') or ''
@@ -22,7 +30,78 @@ def get_meta(obj):
     return p.metadata
 
 
-def pytest_collection_modifyitems(items):
+def get_cached_meta(collector, name, obj):
+    """Returns docstring metadata of a test function, parsing it only if its module changed
+
+    Metadata of a module are kept in the pytest cache together with the module's mtime and size
+    and thrown away as a whole when either of these changes. Without the pytest cache (``-p
+    no:cacheprovider``) the docstrings are parsed on every collection.
+    """
+    module_path = get_rel_path(collector.fspath)
+    module = _module_cache.get(module_path)
+    if module is None:
+        stat = collector.fspath.stat()
+        stamp = [stat.mtime, stat.size]
+        cache = getattr(collector.config, 'cache', None)
+        module = cache.get(CACHE_KEY.format(module_path), None) if cache is not None else None
+        if not module or module.get('stamp') != stamp:
+            module = {'stamp': stamp, 'docs': {}}
+        _module_cache[module_path] = module
+
+    key = '{}::{}'.format(collector.nodeid, name)
+    if key in module['docs']:
+        _cache_stats['hits'] += 1
+        return module['docs'][key]
+
+    _cache_stats['misses'] += 1
+    metadata = module['docs'][key] = get_meta(obj)
+    _dirty_modules.add(module_path)
+    return metadata
+
+
+def cacheable(module):
+    """Returns the module cache entry without the metadata JSON can't store as they are
+
+    Metadata with values JSON has no type for (dates) or changes (tuples, keys that aren't
+    strings) are left out, they are parsed on every collection rather than served changed.
+    """
+    docs = {}
+    for key, metadata in module['docs'].items():
+        try:
+            if json.loads(json.dumps(metadata)) == metadata:
+                docs[key] = metadata
+        except (TypeError, ValueError):
+            pass
+    return {'stamp': module['stamp'], 'docs': docs}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('cfme')
+    group.addoption('--doc-data', action='store_true', default=False, dest='doc_data',
+                    help='Dump docstrings and docstring metadata of collected tests '
+                         'to doc_data.yaml')
+
+
+def pytest_collection_finish(session):
+    """Saves docstring metadata parsed during collection to the pytest cache"""
+    from cfme.fixtures.pytest_store import store
+
+    logger.debug('Docstring metadata cache: {hits} hits, {misses} misses'.format(**_cache_stats))
+    # slaves collect the same modules as master
+    cache = getattr(session.config, 'cache', None)
+    if store.parallelizer_role == 'slave' or cache is None:
+        _dirty_modules.clear()
+        return
+    while _dirty_modules:
+        module_path = _dirty_modules.pop()
+        cache.set(
+            CACHE_KEY.format(module_path), cacheable(_module_cache[module_path]))
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption('doc_data'):
+        return
+
     output = {}
     for item in items:
         item_class = item.location[0]
@@ -58,7 +137,7 @@ def pytest_pycollect_makeitem(collector, name, obj):
         return
 
     # __doc__ can be empty or nonexistent, make sure it's an empty string in that case
-    metadata = get_meta(obj)
+    metadata = get_cached_meta(collector, name, obj)
 
     if not hasattr(obj.meta, 'kwargs'):
         obj.meta.kwargs = dict()
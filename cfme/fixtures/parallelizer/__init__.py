@@ -153,6 +153,8 @@ class ParallelSession(object):
         self.used_prov = set()
 
         self.failed_slave_test_groups = deque()
+        # (slave, slave process, test group, error) of the finished appliance cleanses
+        self.cleansed = deque()
         self.slave_spawn_count = 0
         self.appliances = appliances
 
@@ -347,6 +349,12 @@ class ParallelSession(object):
             tests = list(self.failed_slave_test_groups.popleft())
         except IndexError:
             tests = self.get(slave)
+            if tests is None:
+                # the appliance is being cleansed, see send_cleansed
+                return []
+        return self._send_tests(slave, tests)
+
+    def _send_tests(self, slave, tests):
         self.send(slave, tests)
         slave.tests.update(tests)
         collect_len = len(self.collection)
@@ -406,6 +414,7 @@ class ParallelSession(object):
             while True:
                 # spawn/kill/replace slaves if needed
                 self._slave_audit()
+                self.send_cleansed()
 
                 if not self.slaves:
                     # All slaves are killed or errored, we're done with tests
@@ -569,21 +578,50 @@ class ParallelSession(object):
             if provs:
                 prov = provs[0]
                 # Already too many slaves with provider
-                app = slave.appliance
-                self.print_message(
-                    'cleansing appliance', slave, purple=True)
-                try:
-                    app.delete_all_providers()
-                except Exception as e:
-                    self.print_message(
-                        'cloud not cleanse', slave, red=True)
-                    self.print_message('error:', e, red=True)
+                slave.provider_allocation = [prov]
+                self._pool.remove(test_group)
+                self.cleanse(slave, test_group)
+                return None
             slave.provider_allocation = [prov]
             self._pool.remove(test_group)
             return test_group
         assert not self._pool, self._pool
         return []
 
+    def cleanse(self, slave, test_group):
+        """Deletes all the providers of the slave's appliance before sending it ``test_group``
+
+        The deletion runs in its own thread so that the master keeps dispatching tests to the
+        other slaves, the tests are sent by :py:meth:`send_cleansed` once it's done.
+        """
+        self.print_message('cleansing appliance', slave, purple=True)
+        process = slave.process
+
+        def _cleanse_t():
+            error = None
+            try:
+                slave.appliance.delete_all_providers(wait=True)
+            except Exception as e:
+                error = e
+            self.cleansed.append((slave, process, test_group, error))
+
+        cleanse_thread = Thread(target=_cleanse_t)
+        cleanse_thread.daemon = True
+        cleanse_thread.start()
+
+    def send_cleansed(self):
+        """Send tests to the slaves whose appliances have been cleansed"""
+        while self.cleansed:
+            slave, process, test_group, error = self.cleansed.popleft()
+            if error is not None:
+                self.print_message('could not cleanse', slave, red=True)
+                self.print_message('error:', error, red=True)
+            if slave.id in self.slaves and slave.process is process:
+                self._send_tests(slave, test_group)
+            else:
+                # the slave died while waiting, somebody else will run the tests
+                self.failed_slave_test_groups.append(test_group)
+
 
 def report_collection_diff(slaveid, from_collection, to_collection):
     """Report differences, if any exist, between master and a slave collection
@@ -104,13 +104,7 @@ def _setup_provider_verbose(request, provider, appliance=None):
                 store.terminalreporter.write_line(
                     'Removing extra providers: {}'.format(', '.join(
                         [p.key for p in providers_to_remove])))
-                for p in providers_to_remove:
-                    logger.info('removing provider %r', p.key)
-                    p.delete_rest()
-                # Decoupled wait for better performance
-                for p in providers_to_remove:
-                    logger.info('waiting for provider %r to disappear', p.key)
-                    p.wait_for_delete()
+                appliance.delete_providers(names=[p.name for p in providers_to_remove])
         store.terminalreporter.write_line(
             "Trying to set up provider {}\n".format(provider.key), green=True)
         enable_provider_regions(provider)
@@ -0,0 +1,123 @@
+"""Per-test span profile
+
+Records the spans of :py:mod:`cfme.utils.spans` (``wait_for``, SSH commands, REST requests,
+navigation, database queries) together with the setup of the fixtures and the phases of every test,
+and writes the tree of spans of each test as a line of JSON::
+
+    {"test": node id, "start": epoch, "dropped": spans over the limit, "spans": root span}
+
+to ``log/spans/<slave id>.jsonl`` (``master.jsonl`` when not running in parallel).
+
+Usage:
+
+.. code-block:: bash
+
+    pytest --span-profile cfme/tests/infrastructure/test_providers.py
+    python scripts/span_summary.py log/spans/*.jsonl
+"""
+import json
+
+import pytest
+
+from cfme.fixtures.pytest_store import store
+from cfme.utils import spans
+from cfme.utils.path import log_path
+
+PLUGIN_KEY = 'span-profile'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('cfme')
+    group.addoption(
+        '--span-profile', dest='span_profile', action='store_true', default=False,
+        help='Record where the time of every test goes to log/spans/')
+    group.addoption(
+        '--span-profile-max', dest='span_profile_max', type=int, default=spans.MAX_SPANS,
+        help='Spans recorded per test at most (default: %(default)s)')
+
+
+def location(item):
+    path, line, _ = item.location
+    return '{}:{}'.format(path, line + 1 if line is not None else None)
+
+
+class SpanProfile(object):
+    """Records and writes the tree of spans of every test
+
+    Args:
+        max_spans: Spans recorded per test at most
+        path: File the trees are written to, by default the one of this process in log/spans/
+    """
+    def __init__(self, max_spans=spans.MAX_SPANS, path=None):
+        self.path = path
+        self.recorder = spans.SpanRecorder(max_spans=max_spans)
+        self._file = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.recorder.start_tree(item.nodeid, location(item))
+        try:
+            yield
+        finally:
+            root, dropped = self.recorder.finish_tree()
+            self.write(item.nodeid, root, dropped)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        span = self.recorder.start('setup', site=location(item))
+        yield
+        self.recorder.finish(span)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        span = self.recorder.start('call', site=location(item))
+        yield
+        self.recorder.finish(span)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        span = self.recorder.start('teardown', site=location(item))
+        yield
+        self.recorder.finish(span)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        span = self.recorder.start('fixture {}'.format(fixturedef.argname),
+                                   site=spans.function_site(fixturedef.func))
+        yield
+        self.recorder.finish(span)
+
+    def write(self, test, root, dropped):
+        if root is None:
+            return
+        if self._file is None:
+            if self.path is None:
+                # the slave id is known once the slave runs tests
+                self.path = log_path.join('spans', '{}.jsonl'.format(store.slaveid or 'master'))
+            self.path.dirpath().ensure(dir=True)
+            self._file = self.path.open('w')
+        self._file.write(json.dumps(
+            {'test': test, 'start': root.start, 'dropped': dropped,
+             'spans': root.serialize(root.start)}, separators=(',', ':')))
+        self._file.write('\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def pytest_configure(config):
+    if not config.getoption('span_profile'):
+        return
+    profile = SpanProfile(config.getoption('span_profile_max'))
+    config.pluginmanager.register(profile, PLUGIN_KEY)
+    spans.enable(profile.recorder)
+
+
+def pytest_unconfigure(config):
+    profile = config.pluginmanager.get_plugin(PLUGIN_KEY)
+    if profile is not None:
+        spans.disable()
+        profile.close()
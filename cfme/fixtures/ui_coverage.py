@@ -64,7 +64,7 @@ from py.path import local
 
 from cfme.fixtures.pytest_store import store
 from cfme.exceptions import ApplianceVersionException
-from cfme.utils import conf, version
+from cfme.utils import conf, simplecov, version
 from cfme.utils.conf import cfme_data
 from cfme.utils.log import create_sublogger
 from cfme.utils.path import conf_path, log_path, scripts_data_path
@@ -162,13 +162,12 @@ class CoverageManager(object):
         try:
             self._retrieve_coverage_reports()
             # If the appliance runs out of memory, these can take *days* to complete,
-            # so for now we'll just collect the raw coverage data and figure the merging
-            # out later
-            # Edit, 10-Feb-2016:
-            # Currently, the reports are merged using the {stream}-reports job
-            # which utilizes the 'jjb/scripts/stream_reporter.sh' script instead
+            # so the raw coverage data is merged locally instead. The HTML report is still
+            # generated by the {stream}-reports job, which utilizes the
+            # 'jjb/scripts/stream_reporter.sh' script
             # self._merge_coverage_reports()
             # self._retrieve_merged_reports()
+            self._merge_coverage_reports_locally()
         except Exception as exc:
             self.log.error('Error merging coverage reports')
             self.log.exception(exc)
@@ -285,6 +284,17 @@ gpgcheck={gpgcheck}
         ssh_client = self.collection_appliance.ssh_client
         ssh_client.run_rails_command(coverage_merger.basename)
 
+    def _merge_coverage_reports_locally(self):
+        # merge the raw results into log/coverage/merged/.resultset.json, no appliance needed
+        subprocess.Popen(['/usr/bin/env', 'tar', '-xaf', coverage_results_archive.strpath,
+            '-C', coverage_output_dir.strpath]).wait()
+        coverage, timestamp, skipped = simplecov.merge_resultsets(
+            simplecov.find_resultsets(coverage_output_dir.join('coverage').strpath))
+        for resultset in skipped:
+            self.log.error('Skipped invalid resultset %s', resultset)
+        simplecov.write_resultset(
+            coverage_output_dir.join('merged', '.resultset.json').strpath, coverage, timestamp)
+
     def _retrieve_merged_reports(self):
         # Now bring the report back (tar it, get it, untar it)
         ssh_client = self.collection_appliance.ssh_client
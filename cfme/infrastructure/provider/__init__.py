@@ -8,7 +8,7 @@ from widgetastic.utils import Fillable
 
 from cfme.base.ui import Server
 from cfme.common import TagPageView
-from cfme.common.provider import CloudInfraProvider, provider_types
+from cfme.common.provider import CloudInfraProvider, ems_count_query, provider_types
 from cfme.common.provider_views import (InfraProviderAddView,
                                         InfraProviderEditView,
                                         InfraProviderDetailsView,
@@ -70,6 +70,14 @@ class InfraProvider(Pretty, CloudInfraProvider, Fillable):
     category = "infra"
     pretty_attrs = ['name', 'key', 'zone']
     STATS_TO_MATCH = ['num_template', 'num_vm', 'num_datastore', 'num_host', 'num_cluster']
+    STATS_DB_QUERIES = dict(
+        CloudInfraProvider.STATS_DB_QUERIES,
+        num_datastore='SELECT count(DISTINCT st.name) '
+                      'FROM hosts, storages st, host_storages hst '
+                      'WHERE hosts.id = hst.host_id AND st.id = hst.storage_id '
+                      'AND hosts.ems_id = ems.id',
+        num_host=ems_count_query('hosts'),
+        num_cluster=ems_count_query('ems_clusters'))
     string_name = "Infrastructure"
     templates_destination_name = "Templates"
     template_name = "Templates"
@@ -158,7 +158,7 @@ class ReportDetailsView(CloudIntelReportsView):
 
 class SavedReportDetailsView(CloudIntelReportsView):
     title = Text("#explorer_title_text")
-    table = VanillaTable(".//div[@id='report_html_div']/table")
+    table = Table(".//div[@id='report_html_div']/table")
     # PaginationPane() is not working on Report Details page
     paginator = View.nested(NonJSPaginationPane)
     view_selector = View.nested(ReportToolBarViewSelector)
@@ -416,15 +416,10 @@ class SavedReport(Updateable, BaseEntity):
             headers = tuple([hdr.encode("utf-8") for hdr in view.table.headers])
             body = []
             for _ in view.paginator.pages():
-                for row in view.table.rows():
-                    if not all([c[1].is_displayed for c in row]):
-                        # This is a temporary workaround for cases we have row span
-                        # greater that 1 column (e.g. in case of "Totals: ddd" column).
-                        # TODO: Support this functionality in widgetastic. Issue:
-                        # https://github.com/RedHatQE/widgetastic.core/issues/26
-                        continue
-                    row_data = tuple([row[header].text.encode("utf-8") for header in headers])
-                    body.append(row_data)
+                # Rows with cells spanning more than 1 column (e.g. in case of "Totals: ddd"
+                # column) are skipped as partially displayed.
+                for row in view.table.rows_as_tuples():
+                    body.append(tuple([cell.encode("utf-8") for cell in row]))
         except NoSuchElementException:
             # No data found
             return SavedReportData([], [])
@@ -52,12 +52,15 @@ Note:
 
 """
 import inspect
+import time
+from collections import Counter
 
 import pytest
 
 from cfme.utils.log import logger
 
 MARKDECORATOR_TYPE = type(pytest.mark.skip)
+NO_REASON = 'No reason given'
 
 
 # work around https://github.com/pytest-dev/pytest/issues/2400
@@ -68,61 +71,165 @@ def get_uncollect_function(marker_or_markdecorator):
         return list(marker_or_markdecorator)[0].args[0]
 
 
-def uncollectif(item):
-    """ Evaluates if an item should be uncollected
+class IdentityKey(object):
+    """Cache key of a value by its identity, it holds the value so that its id isn't reused"""
+    __slots__ = ('value',)
 
-    Tests markers against a supplied lambda from the markers object to determine
-    if the item should be uncollected or not.
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, IdentityKey) and other.value is self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def value_key(value):
+    """Cache key of a fixture value, by identity if the value isn't hashable"""
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), IdentityKey(value)
+    return type(value), value
+
+
+class UncollectCondition(object):
+    """The condition of an ``uncollectif`` marker, introspected once
+
+    Args:
+        condition: The first argument of the marker, a callable or a constant
     """
-    from cfme.utils.appliance import find_appliance
-
-    from cfme.utils.pytest_shortcuts import extract_fixtures_values
-    markers = item.get_marker('uncollectif')
-    if not markers:
-        return False, None
-    for mark in markers:
-        log_msg = 'Trying uncollecting {}: {}'.format(
-            item.name,
-            mark.kwargs.get('reason', 'No reason given'))
-        logger.debug(log_msg)
+    def __init__(self, condition):
+        self.condition = condition
         try:
-            arg_names = inspect.getargspec(get_uncollect_function(mark)).args
+            self.arg_names = tuple(inspect.getargspec(condition).args)
         except TypeError:
-            logger.debug(log_msg)
-            return not bool(mark.args[0]), mark.kwargs.get('reason', 'No reason given')
+            # not a function, the marker holds a constant
+            self.arg_names = None
+        # {tuple of the value keys of the arguments: result}
+        self.results = {}
 
-        app = find_appliance(item, require=False)
-        if app:
-            global_vars = {'appliance': app}
-        else:
-            logger.info("while uncollecting %s - appliance not known", item)
-            global_vars = {}
 
+class UncollectEngine(object):
+    """Evaluates the ``uncollectif`` markers of the collected items
+
+    Every condition is introspected once and its results are cached by the values of its
+    arguments, so a condition is called once per unique combination of the fixture values of the
+    parametrized items. Values that aren't hashable (provider data dicts) are told apart by
+    identity, the items of one parametrization share them.
+    """
+    def __init__(self):
+        # {id of the condition: UncollectCondition}, the markers hold on to the conditions
+        self._conditions = {}
+        self.stats = Counter()
+        self.elapsed = 0
+
+    def compile(self, condition):
+        compiled = self._conditions.get(id(condition))
+        if compiled is None or compiled.condition is not condition:
+            compiled = self._conditions[id(condition)] = UncollectCondition(condition)
+            self.stats['conditions'] += 1
+        return compiled
+
+    def evaluate(self, item):
+        """Evaluates if an item should be uncollected, see :py:func:`uncollectif`"""
+        started = time.time()
         try:
+            return self._evaluate(item)
+        finally:
+            self.elapsed += time.time() - started
+
+    def _evaluate(self, item):
+        from cfme.utils.appliance import find_appliance
+
+        from cfme.utils.pytest_shortcuts import extract_fixtures_values
+        markers = item.get_marker('uncollectif')
+        if not markers:
+            return False, None
+        self.stats['items'] += 1
+        for mark in markers:
+            reason = mark.kwargs.get('reason', NO_REASON)
+            logger.debug('Trying uncollecting %s: %s', item.name, reason)
+            compiled = self.compile(get_uncollect_function(mark))
+            if compiled.arg_names is None:
+                return not bool(mark.args[0]), reason
+
+            app = find_appliance(item, require=False)
             values = extract_fixtures_values(item)
-            values.update(global_vars)
+            if app:
+                values['appliance'] = app
+            else:
+                logger.info("while uncollecting %s - appliance not known", item)
             # The test has already been uncollected
-            if arg_names and not values:
+            if compiled.arg_names and not values:
                 return True, None
-            args = [values[arg] for arg in arg_names]
-        except KeyError:
-            missing_argnames = list(set(arg_names) - set(item._request.funcargnames))
-            func_name = item.name
-            if missing_argnames:
-                raise Exception("You asked for a fixture which wasn't in the function {} "
-                                "prototype {}".format(func_name, missing_argnames))
+            try:
+                args = [values[arg] for arg in compiled.arg_names]
+            except KeyError:
+                missing_argnames = list(set(compiled.arg_names) - set(item._request.funcargnames))
+                func_name = item.name
+                if missing_argnames:
+                    raise Exception("You asked for a fixture which wasn't in the function {} "
+                                    "prototype {}".format(func_name, missing_argnames))
+                else:
+                    raise Exception("Failed to uncollect {}, best guess a fixture wasn't "
+                                    "ready".format(func_name))
+
+            key = tuple(value_key(arg) for arg in args)
+            try:
+                retval = compiled.results[key]
+                self.stats['hits'] += 1
+            except KeyError:
+                retval = compiled.results[key] = compiled.condition(*args)
+                self.stats['calls'] += 1
+            if retval:
+                # shortcut
+                return retval, reason
             else:
-                raise Exception("Failed to uncollect {}, best guess a fixture wasn't "
-                                "ready".format(func_name))
-        retval = mark.args[0](*args)
-        if retval:
-            # shortcut
-            return retval, mark.kwargs.get('reason', "No reason given")
+                return False, None
+
         else:
             return False, None
 
-    else:
-        return False, None
+    def summary(self):
+        """Lines of the ``--uncollect-stats`` summary"""
+        evaluated = self.stats['hits'] + self.stats['calls']
+        return [
+            'items with uncollectif: {}'.format(self.stats['items']),
+            'conditions introspected: {}'.format(self.stats['conditions']),
+            'conditions evaluated: {}, called: {}, served from cache: {} ({:.0%})'.format(
+                evaluated, self.stats['calls'], self.stats['hits'],
+                float(self.stats['hits']) / evaluated if evaluated else 0),
+            'time spent: {:.3f}s'.format(self.elapsed),
+        ]
+
+
+engine = UncollectEngine()
+
+
+def uncollectif(item):
+    """ Evaluates if an item should be uncollected
+
+    Tests markers against a supplied lambda from the markers object to determine
+    if the item should be uncollected or not. The lambdas are evaluated once per unique
+    combination of their arguments, see :py:class:`UncollectEngine`.
+    """
+    return engine.evaluate(item)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--uncollect-stats', action='store_true', default=False,
+                     help='Prints how many uncollectif conditions were evaluated and in what time')
+
+
+def pytest_sessionstart(session):
+    # a new engine per session, pytest.main can run more than once in a process
+    global engine
+    engine = UncollectEngine()
 
 
 def pytest_collection_modifyitems(session, config, items):
@@ -137,7 +244,7 @@ def pytest_collection_modifyitems(session, config, items):
             # First filter out all items who have the uncollect mark
             uncollect_marker = item.get_marker('uncollect')
             if uncollect_marker:
-                uncollect_reason = uncollect_marker.kwargs.get('reason', "No reason given")
+                uncollect_reason = uncollect_marker.kwargs.get('reason', NO_REASON)
                 f.write("{} - {}\n".format(item.name, uncollect_reason))
             else:
                 uncollectif_result, uncollectif_reason = uncollectif(item)
@@ -151,3 +258,8 @@ def pytest_collection_modifyitems(session, config, items):
     len_filtered = len(items)
     filtered_count = len_collected - len_filtered
     store.uncollection_stats['uncollectif'] = filtered_count
+
+    if config.getoption('uncollect_stats'):
+        store.terminalreporter.write('Uncollectif Stats:\n', bold=True)
+        for line in engine.summary():
+            store.terminalreporter.write(' {}\n'.format(line), bold=True)
@@ -16,7 +16,7 @@ from cfme.utils.log import logger
 from cfme.modeling.base import BaseCollection, BaseEntity
 from cfme.utils.appliance.implementations.ui import navigator, CFMENavigateStep, navigate_to
 from cfme.utils.varmeth import variable
-from cfme.utils.wait import wait_for
+from cfme.utils.wait import TimedOutError, wait_for
 
 
 @attr.s
@@ -37,11 +37,32 @@ class Request(BaseEntity):
 
     # TODO Replace varmeth with Sentaku one day
     @variable(alias='rest')
-    def wait_for_request(self, num_sec=1800, delay=20):
+    def wait_for_request(self, num_sec=1800, delay=20, watch=False):
+        """Waits for the request to finish
+
+        Args:
+            num_sec: Timeout in seconds
+            delay: Seconds between checks of the request
+            watch: Wait through ``appliance.watcher`` instead of polling the request on its own,
+                ``delay`` is ignored then
+        """
+        def _is_finished(request):
+            return (request.request_state.title() in self.REQUEST_FINISHED_STATES and
+                    'Retry' not in request.message)
+
+        if watch:
+            try:
+                self.appliance.watcher.wait_for(
+                    self.rest, lambda request: request is not None and _is_finished(request),
+                    num_sec=num_sec, message="Request finished")
+            except TimedOutError:
+                logger.info("Last Request message: '{}'".format(self.rest.message))
+                raise
+            return
+
         def _finished():
             self.rest.reload()
-            return (self.rest.request_state.title() in self.REQUEST_FINISHED_STATES and
-                    'Retry' not in self.rest.message)
+            return _is_finished(self.rest)
 
         def last_message():
             logger.info("Last Request message: '{}'".format(self.rest.message))
@@ -3,9 +3,18 @@
 
 If active, then when each test ends, the browser gets killed. That ensures that whatever way the
 browser session could be tainted after a test, the next test should not be affected.
+
+With ``--browser-pool-size``, spare browsers of the appliance are started and logged in in the
+background, and the next test takes one of them instead of starting a new browser, see
+:py:mod:`cfme.utils.browser_pool`.
 """
+from functools import partial
+
 import pytest
+from cfme.utils import at_exit
 from cfme.utils.appliance import find_appliance
+from cfme.utils.browser import manager
+from cfme.utils.browser_pool import BrowserPool
 
 
 def pytest_addoption(parser):
@@ -17,6 +26,38 @@ def pytest_addoption(parser):
             'Isolate browser sessions for each test. That makes sure that whatever state the '
             'browser is in after a test, it will be killed so the next test will have to check out '
             'a fresh browser session.'))
+    parser.addoption(
+        '--browser-pool-size',
+        type=int,
+        default=0,
+        help=(
+            'With --browser-isolation, keep this many spare browsers logged in to the appliance '
+            'to replace the killed ones.'))
+
+
+def pytest_configure(config):
+    if config.getoption('browser_isolation') and config.getoption('browser_pool_size') > 0:
+        manager.pool = BrowserPool(manager.factory, size=config.getoption('browser_pool_size'))
+        at_exit(manager.pool.close)
+
+
+def pytest_unconfigure(config):
+    if manager.pool is not None:
+        manager.pool.close()
+        manager.pool = None
+
+
+@pytest.mark.tryfirst
+def pytest_runtest_setup(item):
+    if manager.pool is not None:
+        appliance = find_appliance(item, require=False)
+        if appliance is not None:
+            from cfme.base.ui import log_in_spare_browser, spare_browser_logged_in
+            # the url_key the browser manager opens the appliance by, without a REST query
+            manager.pool.prepare(
+                appliance.url,
+                log_in=partial(log_in_spare_browser, appliance),
+                logged_in=partial(spare_browser_logged_in, appliance))
 
 
 @pytest.mark.hookwrapper(trylast=True)
@@ -78,6 +78,7 @@ pytest_plugins = (
     'cfme.fixtures.screenshots',
     'cfme.fixtures.skip_not_implemented',
     'cfme.fixtures.soft_assert',
+    'cfme.fixtures.span_profile',
     'cfme.fixtures.ssh_client',
     'cfme.fixtures.templateloader',
     'cfme.fixtures.terminalreporter',
@@ -4,6 +4,7 @@ from cfme.utils.conf import cfme_performance
 from cfme.utils.grafana import get_scenario_dashboard_urls
 from cfme.utils.log import logger
 from cfme.utils.providers import get_crud
+from cfme.utils.rest_workload import bulk_action, pool_rest_session, run_open_loop
 from cfme.utils.smem_memory_monitor import add_workload_quantifiers, SmemMemoryMonitor
 from cfme.utils.workloads import get_refresh_vms_scenarios
 from itertools import cycle
@@ -74,34 +75,17 @@ def test_refresh_vms(appliance, request, scenario):
 
     # Variable amount of time for refresh workload
     total_time = scenario['total_time']
-    starttime = time.time()
     time_between_refresh = scenario['time_between_refresh']
-    total_refreshed_vms = 0
+    vms_collection = appliance.rest_api.collections.vms
+    pool_rest_session(appliance.rest_api)
 
-    while ((time.time() - starttime) < total_time):
-        start_refresh_time = time.time()
+    def refresh_vms(tick):
         refresh_list = [next(vms_iter) for x in range(refresh_size)]
-        for vm in refresh_list:
-            vm.action.reload()
-        total_refreshed_vms += len(refresh_list)
-        iteration_time = time.time()
-
-        refresh_time = round(iteration_time - start_refresh_time, 2)
-        elapsed_time = iteration_time - starttime
-        logger.debug('Time to Queue VM Refreshes: {}'.format(refresh_time))
-        logger.info('Time elapsed: {}/{}'.format(round(elapsed_time, 2), total_time))
-
-        if refresh_time < time_between_refresh:
-            wait_diff = time_between_refresh - refresh_time
-            time_remaining = total_time - elapsed_time
-            if (time_remaining > 0 and time_remaining < time_between_refresh):
-                time.sleep(time_remaining)
-            elif time_remaining > 0:
-                time.sleep(wait_diff)
-        else:
-            logger.warn('Time to Queue VM Refreshes ({}) exceeded time between '
-                '({})'.format(refresh_time, time_between_refresh))
-
-    quantifiers['Elapsed_Time'] = round(time.time() - starttime, 2)
-    quantifiers['Queued_VM_Refreshes'] = total_refreshed_vms
+        return bulk_action(vms_collection, 'refresh', refresh_list)
+
+    stats = run_open_loop(refresh_vms, time_between_refresh, total_time)
+
+    quantifiers['Elapsed_Time'] = round(stats.elapsed, 2)
+    quantifiers['Queued_VM_Refreshes'] = stats.queued
+    quantifiers.update(stats.quantifiers())
     logger.info('Test Ending...')
@@ -4,6 +4,7 @@ from cfme.utils.conf import cfme_performance
 from cfme.utils.grafana import get_scenario_dashboard_urls
 from cfme.utils.log import logger
 from cfme.utils.providers import get_crud
+from cfme.utils.rest_workload import bulk_action, pool_rest_session, run_open_loop
 from cfme.utils.smem_memory_monitor import add_workload_quantifiers, SmemMemoryMonitor
 from cfme.utils.workloads import get_smartstate_analysis_scenarios
 from cfme.utils import conf
@@ -77,34 +78,16 @@ def test_workload_smartstate_analysis(appliance, request, scenario):
 
     # Variable amount of time for SmartState Analysis workload
     total_time = scenario['total_time']
-    starttime = time.time()
     time_between_analyses = scenario['time_between_analyses']
-    total_scanned_vms = 0
+    vms_collection = appliance.rest_api.collections.vms
+    vms_to_scan = [vms_collection.get(name=vm) for vm in scenario['vms_to_scan'].values()[0]]
+    pool_rest_session(appliance.rest_api)
 
-    while ((time.time() - starttime) < total_time):
-        start_ssa_time = time.time()
-        for vm in scenario['vms_to_scan'].values()[0]:
-            vm_api = appliance.rest_api.collections.vms.get(name=vm)
-            vm_api.action.scan()
-            total_scanned_vms += 1
-        iteration_time = time.time()
+    stats = run_open_loop(
+        lambda tick: bulk_action(vms_collection, 'scan', vms_to_scan),
+        time_between_analyses, total_time)
 
-        ssa_time = round(iteration_time - start_ssa_time, 2)
-        elapsed_time = iteration_time - starttime
-        logger.debug('Time to Queue SmartState Analyses: {}'.format(ssa_time))
-        logger.info('Time elapsed: {}/{}'.format(round(elapsed_time, 2), total_time))
-
-        if ssa_time < time_between_analyses:
-            wait_diff = time_between_analyses - ssa_time
-            time_remaining = total_time - elapsed_time
-            if (time_remaining > 0 and time_remaining < time_between_analyses):
-                time.sleep(time_remaining)
-            elif time_remaining > 0:
-                time.sleep(wait_diff)
-        else:
-            logger.warn('Time to Queue SmartState Analyses ({}) exceeded time between '
-                '({})'.format(ssa_time, time_between_analyses))
-
-    quantifiers['Elapsed_Time'] = round(time.time() - starttime, 2)
-    quantifiers['Queued_VM_Scans'] = total_scanned_vms
+    quantifiers['Elapsed_Time'] = round(stats.elapsed, 2)
+    quantifiers['Queued_VM_Scans'] = stats.queued
+    quantifiers.update(stats.quantifiers())
     logger.info('Test Ending...')
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Fetching all the pages of a paginated API result, like the ones of trackerbot.
+
+A page of a (tastypie) API result holds some ``objects`` and the ``meta`` of the result: the
+``limit`` of objects per page, the ``offset`` of the page, the ``total_count`` of objects and the
+URL of the ``next`` page. Following ``next`` takes one round trip per page, one after another. When
+the first page tells the ``total_count`` and ``limit``, the offsets of all the other pages are
+known up front and :py:class:`PageFetcher` fetches them by a pool of workers, retrying the pages
+that failed. Results not telling their counts are followed page by page as before.
+
+Usage:
+
+.. code-block:: python
+
+    api = trackerbot.api()
+    objects = PageFetcher(api, workers=8).depaginate(api.template.get())['objects']
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import six.moves.urllib.parse
+import slumber
+from requests.exceptions import RequestException
+
+from cfme.utils.log import logger
+
+#: Pages fetched at the same time at most
+PAGE_WORKERS = 4
+#: Attempts to fetch a page before giving up
+PAGE_ATTEMPTS = 3
+#: Errors a page is fetched again for, client errors (4xx) won't go away by retrying
+RETRIED_ERRORS = (slumber.exceptions.HttpServerError, RequestException)
+
+
+def parse_next(next_url):
+    """Returns the endpoint name and the query parameters of the ``next`` URL of a page"""
+    url = six.moves.urllib.parse.urlparse(next_url)
+    # the endpoint is the last part of the path, e.g. template of /api/template/
+    endpoint = url.path.strip('/').split('/')[-1]
+    params = {k: v[0] for k, v in six.moves.urllib.parse.parse_qs(url.query).items()}
+    return endpoint, params
+
+
+def page_offsets(meta, params):
+    """Offsets of the pages after the first one, None if the result doesn't tell its counts
+
+    Args:
+        meta: ``meta`` of the first page
+        params: Query parameters of its ``next`` URL
+    """
+    try:
+        total_count = int(meta['total_count'])
+        # the server may cap the limit asked for, the next URL holds the one it used
+        limit = int(params.get('limit', meta['limit']))
+        offset = int(params['offset'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if limit <= 0:
+        return None
+    return list(range(offset, total_count, limit))
+
+
+class PageFetcher(object):
+    """Fetches the pages of paginated results of an API, see the module docs
+
+    Args:
+        api: :py:class:`slumber.API` the results come from
+        workers: Pages fetched at the same time at most
+        attempts: Attempts to fetch a page before its error is raised
+        retry_delay: Seconds before fetching a failed page again
+    """
+    def __init__(self, api, workers=PAGE_WORKERS, attempts=PAGE_ATTEMPTS, retry_delay=1):
+        self.api = api
+        self.workers = workers
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+
+    def fetch(self, endpoint, params):
+        """Returns one page, fetched again on server and connection errors"""
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return getattr(self.api, endpoint).get(**params)
+            except RETRIED_ERRORS as e:
+                if attempt == self.attempts:
+                    raise
+                logger.warning('Fetching %s %s failed (attempt %s of %s): %r',
+                               endpoint, params, attempt, self.attempts, e)
+                time.sleep(self.retry_delay)
+
+    def depaginate(self, result):
+        """Returns the whole result of which ``result`` is the first (or only) page
+
+        The objects are in the order of the pages, the ``meta`` is fixed up to tell the truth
+        about the whole result.
+        """
+        meta = result['meta']
+        if meta['next'] is None:
+            # No pages means we're done
+            return result
+
+        # copies that are returned, the first page is left alone
+        ret_meta = meta.copy()
+        ret_objects = list(result['objects'])
+        endpoint, params = parse_next(meta['next'])
+        offsets = page_offsets(meta, params)
+        if offsets is None or self.workers <= 1:
+            logger.debug('Fetching the pages of %s one by one', endpoint)
+        else:
+            logger.debug('Fetching %s pages of %s by %s workers',
+                         len(offsets), endpoint, self.workers)
+            pages = [dict(params, offset=offset) for offset in offsets]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                # map keeps the order of the pages
+                results = list(executor.map(lambda page: self.fetch(endpoint, page), pages))
+            for result in results:
+                ret_objects.extend(result['objects'])
+            meta = results[-1]['meta'] if results else {'next': None}
+
+        # follow the pages one by one, for all of them if the counts are not known, or for the
+        # objects added to the result while the pages were being fetched
+        while meta['next']:
+            endpoint, params = parse_next(meta['next'])
+            result = self.fetch(endpoint, params)
+            ret_objects.extend(result['objects'])
+            meta = result['meta']
+
+        # fix meta up to not tell lies
+        ret_meta['total_count'] = len(ret_objects)
+        ret_meta['next'] = None
+        ret_meta['limit'] = ret_meta['total_count']
+        return {
+            'meta': ret_meta,
+            'objects': ret_objects
+        }
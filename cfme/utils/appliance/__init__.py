@@ -23,22 +23,24 @@ from manageiq_client.api import APIException, ManageIQClient as VanillaMiqApi
 from six.moves.urllib.parse import urlparse
 from werkzeug.local import LocalStack, LocalProxy
 
-from cfme.utils import clear_property_cache
 from cfme.utils import conf, ssh, ports
 from cfme.utils.datafile import load_data_file
 from cfme.utils.log import logger, create_sublogger, logger_wrap
 from cfme.utils.net import net_check
 from cfme.utils.path import data_path, patches_path, scripts_path, conf_path
+from cfme.utils.spans import traced
 from cfme.utils.ssh import SSHTail
 from cfme.utils.version import Version, get_stream, pick
 from cfme.utils.wait import wait_for, TimedOutError
 from cfme.fixtures import ui_coverage
 from cfme.fixtures.pytest_store import store
+from .config_cache import ApplianceConfigCache
 from .db import ApplianceDB
 from .implementations.rest import ViaREST
 from .implementations.ssui import ViaSSUI
 from .implementations.ui import ViaUI
 from .services import SystemdService
+from .watcher import ApplianceWatcher
 
 RUNNING_UNDER_SPROUT = os.environ.get("RUNNING_UNDER_SPROUT", "false") != "false"
 # EMS types recognized by IP or credentials
@@ -79,6 +81,10 @@ class MiqApi(VanillaMiqApi):
             raise ValueError('Subcollections not supported! ({})'.format(parsed.path))
         return entity
 
+    @traced('rest')
+    def _sending_request(self, func, retries=2):
+        return super(MiqApi, self)._sending_request(func, retries=retries)
+
 
 class ApplianceException(Exception):
     pass
@@ -237,6 +243,8 @@ class IPAppliance(object):
     httpd = SystemdService.declare(unit_name='httpd')
     sssd = SystemdService.declare(unit_name='sssd')
     db = ApplianceDB.declare()
+    watcher = ApplianceWatcher.declare()
+    config_cache = ApplianceConfigCache.declare()
 
     CONFIG_MAPPING = {
         'hostname': 'hostname',
@@ -1438,6 +1446,7 @@ class IPAppliance(object):
     def start_evm_service(self, log_callback=None):
         """Starts the ``evmserverd`` service on this appliance
         """
+        self.config_cache.invalidate()
         self._evm_service_command('start', expected_exit_code=0, log_callback=log_callback)
 
     @logger_wrap("Stop EVM Service: {}")
@@ -1451,6 +1460,7 @@ class IPAppliance(object):
         """Restarts the ``evmserverd`` service on this appliance
         """
         store.terminalreporter.write_line('evmserverd is being restarted, be patient please')
+        self.config_cache.invalidate()
         with self.ssh_client as ssh:
             if rude:
                 self.evmserverd.stop()
@@ -1489,6 +1499,7 @@ class IPAppliance(object):
     @logger_wrap("Rebooting Appliance: {}")
     def reboot(self, wait_for_web_ui=True, log_callback=None):
         log_callback('Rebooting appliance')
+        self.config_cache.invalidate()
         client = self.ssh_client
 
         old_uptime = client.uptime()
@@ -1645,7 +1656,6 @@ class IPAppliance(object):
             else:
                 log_callback(
                     'Appliance must be restarted before the netapp functionality can be used.')
-        clear_property_cache(self, 'is_storage_enabled')
 
     @logger_wrap('Updating appliance UUID: {}')
     def update_guid(self, log_callback=None):
@@ -1883,31 +1893,8 @@ class IPAppliance(object):
 
     @property
     def server_roles(self):
-        """Return a dictionary of server roles from database"""
-        asr = self.db.client['assigned_server_roles']
-        sr = self.db.client['server_roles']
-        all_role_names = {row[0] for row in self.db.client.session.query(sr.name)}
-        # Query all active server roles assigned to this server
-        query = self.db.client.session\
-            .query(sr.name)\
-            .join(asr, asr.server_role_id == sr.id)\
-            .filter(asr.miq_server_id == self.evm_id)\
-            .filter(asr.active == True)  # noqa
-        active_roles = {row[0] for row in query}
-        roles = {role_name: role_name in active_roles for role_name in all_role_names}
-        dead_keys = ['database_owner', 'vdi_inventory']
-        for key in roles:
-            if not self.is_storage_enabled:
-                if key.startswith('storage'):
-                    dead_keys.append(key)
-                if key == 'vmdb_storage_bridge':
-                    dead_keys.append(key)
-        for key in dead_keys:
-            try:
-                del roles[key]
-            except KeyError:
-                pass
-        return roles
+        """Return a dictionary of server roles from database, see :py:attr:`config_cache`"""
+        return self.config_cache.server_roles()
 
     @server_roles.setter
     def server_roles(self, roles):
@@ -1964,7 +1951,7 @@ class IPAppliance(object):
         return "{} Region: Region {} [{}]".format(
             self.product_name, r, r)
 
-    @cached_property
+    @property
     def company_name(self):
         return self.advanced_settings["server"]["company"]
 
@@ -1979,34 +1966,17 @@ class IPAppliance(object):
         else:
             return None
 
-    @cached_property
+    @property
     def is_storage_enabled(self):
         return 'storage' in self.advanced_settings.get('product', {})
 
     @property
     def advanced_settings(self):
-        """Get settings from the base api/settings endpoint for appliance"""
-        if self.version > '5.9':
-            return self.rest_api.get(self.rest_api.collections.settings._href)
-        else:
-            writeout = self.ssh_client.run_rails_command(
-                '"File.open(\'/tmp/yam_dump.yaml\', \'w\') '
-                '{|f| f.write(Settings.to_hash.deep_stringify_keys.to_yaml) }"'
-            )
-            if writeout.rc:
-                logger.error("Config couldn't be found")
-                logger.error(writeout.output)
-                raise Exception('Error obtaining config')
-            base_data = self.ssh_client.run_command('cat /tmp/yam_dump.yaml')
-            if base_data.rc:
-                logger.error("Config couldn't be found")
-                logger.error(base_data.output)
-                raise Exception('Error obtaining config')
-            try:
-                return yaml.load(base_data.output)
-            except Exception:
-                logger.debug(base_data.output)
-                raise
+        """Get settings from the base api/settings endpoint for appliance
+
+        Served from :py:attr:`config_cache`, every access returns a copy of the settings.
+        """
+        return self.config_cache.advanced_settings()
 
     def update_advanced_settings(self, settings_dict):
         """PATCH settings from the master server's api/server/:id/settings endpoint
@@ -2042,6 +2012,7 @@ class IPAppliance(object):
 
             # Run it
             result = self.ssh_client.run_rails_command(dest_ruby)
+            self.config_cache.invalidate()
             if not result:
                 raise Exception('Unable to set config: {!r}:{!r}'.format(result.rc, result.output))
         else:
@@ -2067,10 +2038,41 @@ class IPAppliance(object):
             if not quiet:
                 raise
 
-    def delete_all_providers(self):
+    def delete_providers(self, names=None, wait=True, num_sec=1000):
+        """Deletes providers by a single REST action on the providers collection
+
+        Args:
+            names: Names of the providers to delete, all of them if ``None``
+            wait: Whether to wait for all the deleted providers to disappear
+            num_sec: Timeout of the wait
+        Returns:
+            List of the deleted REST provider entities
+        """
+        collection = self.rest_api.collections.providers
+        providers = [
+            provider
+            for provider in collection.query_string(expand='resources', attributes='name')
+            if names is None or provider.name in names]
+        if not providers:
+            return []
+        logger.info('Deleting providers: %s', ', '.join(p.name for p in providers))
+        collection.action.delete(*providers)
+        results = self.rest_api.response.json().get('results', [])
+        deleted = []
+        for provider, result in zip(providers, results):
+            if result.get('success', True):
+                deleted.append(provider)
+            else:
+                logger.warning('Provider %s was not deleted: %s',
+                               provider.name, result.get('message'))
+        if wait:
+            self.watcher.wait_all_not_exist(
+                deleted, num_sec=num_sec, message='providers to disappear')
+        return deleted
+
+    def delete_all_providers(self, wait=False, num_sec=1000):
         logger.info('Destroying all appliance providers')
-        for prov in self.rest_api.collections.providers:
-            prov.action.delete()
+        return self.delete_providers(wait=wait, num_sec=num_sec)
 
     def reset_automate_model(self):
         with self.ssh_client as ssh_client:
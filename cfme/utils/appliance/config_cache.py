@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Cache of the appliance configuration.
+
+:py:attr:`IPAppliance.advanced_settings <cfme.utils.appliance.IPAppliance.advanced_settings>`
+fetched the whole settings on every access (by REST, by a rails runner before 5.9), while tests
+and fixtures read them over and over. The cache keeps a snapshot of them and serves the snapshot
+until it is invalidated.
+
+:py:attr:`IPAppliance.server_roles <cfme.utils.appliance.IPAppliance.server_roles>` is not
+snapshotted, the server activates the roles and fails them over on its own, so waits polling them
+have to see the database. They are read by a single query on every access.
+
+Writes done by the framework invalidate the snapshots: ``update_advanced_settings`` of the
+appliance, its server, zone and region, the ``server_roles`` setter and the saves of the server
+settings in the UI. So do the restarts of evmserverd, the reboots and the replacements of the
+database (restores, checkpoints, drops and creates, migrations). Changes done in other ways (by
+another process, on the appliance itself) are only noticed with ``check_db`` enabled, the
+snapshots are then also invalidated when the ``settings_changes`` of the database changed since
+they were taken, at the cost of one query per access.
+
+Every invalidation bumps the ``generation`` of the cache, the snapshots taken before it are not
+served anymore.
+
+Usage:
+
+.. code-block:: python
+
+    appliance.config_cache.check_db = True
+    appliance.advanced_settings['server']['company']
+    appliance.config_cache.invalidate('advanced_settings')
+    appliance.config_cache.stats()  # {'advanced_settings': {'hits': 1, 'misses': 1}}
+"""
+from collections import Counter
+from copy import deepcopy
+from threading import RLock
+
+import attr
+import yaml
+from sqlalchemy import func
+
+from .plugin import AppliancePlugin, AppliancePluginException
+
+# Roles of the database that can't be set on a server
+DEAD_ROLES = ('database_owner', 'vdi_inventory')
+
+
+@attr.s
+class Snapshot(object):
+    """A cached value, ``stamp`` of the database and ``generation`` of the cache it was taken at"""
+    value = attr.ib()
+    stamp = attr.ib()
+    generation = attr.ib()
+
+
+@attr.s
+class ApplianceConfigCache(AppliancePlugin):
+    """Serves the configuration of the appliance from snapshots, see the module docs
+
+    Args:
+        check_db: Whether to invalidate the snapshots when the settings in the database change
+    """
+    check_db = attr.ib(default=False)
+    generation = attr.ib(default=0, init=False)
+    hits = attr.ib(default=attr.Factory(Counter), init=False, repr=False)
+    misses = attr.ib(default=attr.Factory(Counter), init=False, repr=False)
+    _snapshots = attr.ib(default=attr.Factory(dict), init=False, repr=False)
+    _lock = attr.ib(default=attr.Factory(RLock), init=False, repr=False)
+
+    def get(self, name, fetch, stamp=None):
+        """Returns the snapshot of ``name``, taken by ``fetch()`` if there's no valid one
+
+        Args:
+            name: Name of the snapshot
+            fetch: Called without arguments to get the value
+            stamp: Called without arguments when ``check_db`` is enabled, the snapshot is only
+                valid as long as it returns the same value
+        """
+        with self._lock:
+            current_stamp = self._stamp(stamp) if self.check_db and stamp else None
+            snapshot = self._snapshots.get(name)
+            if (snapshot is not None and snapshot.generation == self.generation and
+                    snapshot.stamp == current_stamp):
+                self.hits[name] += 1
+                return snapshot.value
+            self.misses[name] += 1
+            value = fetch()
+            self._snapshots[name] = Snapshot(value, current_stamp, self.generation)
+            return value
+
+    def invalidate(self, *names):
+        """Drops the snapshots of ``names``, all of them if none are given"""
+        with self._lock:
+            self.generation += 1
+            if names:
+                for name in names:
+                    self._snapshots.pop(name, None)
+            else:
+                self._snapshots.clear()
+
+    def stats(self):
+        """Returns the hits and misses of every snapshot"""
+        return {name: {'hits': self.hits[name], 'misses': self.misses[name]}
+                for name in set(self.hits) | set(self.misses)}
+
+    def _stamp(self, stamp):
+        try:
+            return stamp()
+        except Exception as e:
+            # a stamp never equal to another one, the snapshot is fetched again
+            self.logger.warning('Could not check the configuration in the database: %r', e)
+            return object()
+
+    def advanced_settings(self):
+        """Returns a copy of the advanced settings, it can be modified freely"""
+        return deepcopy(self.get(
+            'advanced_settings', self._fetch_advanced_settings, self.settings_stamp))
+
+    def server_roles(self):
+        """Returns the server roles of the appliance, ``{role name: active}``, not snapshotted"""
+        return self._fetch_server_roles()
+
+    def settings_stamp(self):
+        """Number and the last update of the settings changes of the database"""
+        client = self.appliance.db.client
+        changes = client['settings_changes']
+        return tuple(client.session.query(
+            func.count(changes.id), func.max(changes.updated_at)).one())
+
+    def _fetch_advanced_settings(self):
+        appliance = self.appliance
+        if appliance.version > '5.9':
+            return appliance.rest_api.get(appliance.rest_api.collections.settings._href)
+        writeout = appliance.ssh_client.run_rails_command(
+            '"File.open(\'/tmp/yam_dump.yaml\', \'w\') '
+            '{|f| f.write(Settings.to_hash.deep_stringify_keys.to_yaml) }"'
+        )
+        if writeout.rc:
+            self.logger.error("Config couldn't be found")
+            self.logger.error(writeout.output)
+            raise AppliancePluginException('Error obtaining config')
+        base_data = appliance.ssh_client.run_command('cat /tmp/yam_dump.yaml')
+        if base_data.rc:
+            self.logger.error("Config couldn't be found")
+            self.logger.error(base_data.output)
+            raise AppliancePluginException('Error obtaining config')
+        try:
+            return yaml.load(base_data.output)
+        except Exception:
+            self.logger.debug(base_data.output)
+            raise
+
+    def _fetch_server_roles(self):
+        client = self.appliance.db.client
+        asr = client['assigned_server_roles']
+        sr = client['server_roles']
+        # all the roles and whether they are active on this server, by one query
+        assigned = ((asr.server_role_id == sr.id) &
+                    (asr.miq_server_id == self.appliance.evm_id) &
+                    (asr.active == True))  # noqa
+        query = client.session.query(sr.name, func.count(asr.id)).outerjoin(
+            asr, assigned).group_by(sr.name)
+        roles = {name: bool(active) for name, active in query}
+        storage_enabled = 'storage' in self.get(
+            'advanced_settings', self._fetch_advanced_settings,
+            self.settings_stamp).get('product', {})
+        for key in list(roles):
+            if key in DEAD_ROLES or (not storage_enabled and (
+                    key.startswith('storage') or key == 'vmdb_storage_bridge')):
+                del roles[key]
+        return roles
@@ -1,3 +1,5 @@
+import re
+from contextlib import contextmanager
 from textwrap import dedent
 
 import attr
@@ -24,6 +26,8 @@ class ApplianceDB(AppliancePlugin):
     # Until this needs a version pick, make it an attr
     postgres_version = 'rh-postgresql95'
     service_name = '{}-postgresql'.format(postgres_version)
+    # Databases of checkpoints are named <prefix><checkpoint name>
+    CHECKPOINT_PREFIX = 'vmdb_checkpoint_'
 
     @cached_property
     def client(self):
@@ -90,6 +94,7 @@ class ApplianceDB(AppliancePlugin):
                 "psql -l | grep vmdb_production | wc -l", timeout=15)
             return result.success
         wait_for(_db_dropped, delay=5, timeout=60, message="drop the vmdb_production DB")
+        self.appliance.config_cache.invalidate()
 
     def create(self):
         """ Creates new vmdb_production database
@@ -97,12 +102,14 @@ class ApplianceDB(AppliancePlugin):
             Note: EVM service has to be stopped for this to work.
         """
         result = self.appliance.ssh_client.run_command('createdb vmdb_production', timeout=30)
+        self.appliance.config_cache.invalidate()
         assert result.success, "Failed to create clean database: {}".format(result.output)
 
     def migrate(self):
         """migrates a given database and updates REGION/GUID files"""
         ssh = self.ssh_client
         result = ssh.run_rake_command("db:migrate", timeout=300)
+        self.appliance.config_cache.invalidate()
         assert result.success, "Failed to migrate new database: {}".format(result.output)
         result = ssh.run_rake_command(
             'db:migrate:status 2>/dev/null | grep "^\s*down"', timeout=30)
@@ -182,6 +189,7 @@ class ApplianceDB(AppliancePlugin):
         self.logger.info('Restoring database')
         result = self.appliance.ssh_client.run_rake_command(
             'evm:db:restore:local --trace -- --local-file "{}"'.format(database_path))
+        self.appliance.config_cache.invalidate()
         if result.failed:
             msg = 'Failed to restore database on appl {}, output is {}'.format(self.address,
                 result.output)
@@ -194,6 +202,122 @@ class ApplianceDB(AppliancePlugin):
                 self.logger.error("Failed to change invalid db password: {}"
                                   .format(result.output))
 
+    def _run_psql(self, sql, timeout=60):
+        """Runs a SQL statement against the ``postgres`` maintenance database, returns its output"""
+        result = self.ssh_client.run_command(
+            'psql -d postgres -t -A -c "{}"'.format(sql), timeout=timeout)
+        if result.failed:
+            raise ApplianceDBException('Failed to run "{}": {}'.format(sql, result.output))
+        return result.output
+
+    def _checkpoint_name(self, name):
+        if not re.match(r'^\w+$', name):
+            raise ApplianceDBException(
+                'Checkpoint name may only contain letters, digits and underscores: {!r}'
+                .format(name))
+        return '{}{}'.format(self.CHECKPOINT_PREFIX, name)
+
+    def _disconnect(self, database):
+        """Closes our connections and terminates all other sessions of the database"""
+        if 'client' in self.__dict__:
+            self.client.engine.dispose()
+            clear_property_cache(self, 'client')
+        self._run_psql(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE datname = '{}' AND pid <> pg_backend_pid()".format(database))
+
+    @contextmanager
+    def _evm_stopped(self):
+        """Stops evmserverd for the block, starts it and waits for the web UI afterwards"""
+        self.appliance.evmserverd.stop()
+        try:
+            yield
+        finally:
+            self.appliance.evmserverd.start()
+            self.appliance.wait_for_web_ui()
+
+    @property
+    def checkpoints(self):
+        """Names of the existing checkpoints, see :py:meth:`create_checkpoint`"""
+        output = self._run_psql('SELECT datname FROM pg_database')
+        return sorted(
+            line.strip()[len(self.CHECKPOINT_PREFIX):] for line in output.splitlines()
+            if line.strip().startswith(self.CHECKPOINT_PREFIX))
+
+    def create_checkpoint(self, name, overwrite=False):
+        """Snapshots vmdb_production as a checkpoint
+
+        The checkpoint is a PostgreSQL database created with vmdb_production as its template,
+        which is a file level copy, so it takes seconds even for big databases. evmserverd is
+        stopped while the copy is made, as the template must not have any sessions.
+
+        Args:
+            name: Name of the checkpoint, letters, digits and underscores only
+            overwrite: Replace the checkpoint if it exists, raise otherwise
+        """
+        checkpoint_db = self._checkpoint_name(name)
+        if name in self.checkpoints:
+            if not overwrite:
+                raise ApplianceDBException('Checkpoint {!r} already exists'.format(name))
+            self.drop_checkpoint(name)
+        self.logger.info('Creating database checkpoint %s', name)
+        with self._evm_stopped():
+            self._disconnect('vmdb_production')
+            self._run_psql(
+                'CREATE DATABASE {} TEMPLATE vmdb_production'.format(checkpoint_db), timeout=900)
+
+    def restore_checkpoint(self, name):
+        """Replaces vmdb_production with a copy of the checkpoint
+
+        The checkpoint is kept, so it can be restored again. evmserverd is restarted and the web UI
+        is waited for.
+
+        Args:
+            name: Name of the checkpoint
+        """
+        checkpoint_db = self._checkpoint_name(name)
+        if name not in self.checkpoints:
+            raise ApplianceDBException('Checkpoint {!r} does not exist'.format(name))
+        self.logger.info('Restoring database checkpoint %s', name)
+        with self._evm_stopped():
+            self._disconnect('vmdb_production')
+            self._run_psql('DROP DATABASE vmdb_production')
+            self.appliance.config_cache.invalidate()
+            self._run_psql(
+                'CREATE DATABASE vmdb_production TEMPLATE {}'.format(checkpoint_db), timeout=900)
+
+    def drop_checkpoint(self, name):
+        """Drops the checkpoint if it exists"""
+        self.logger.info('Dropping database checkpoint %s', name)
+        self._run_psql('DROP DATABASE IF EXISTS {}'.format(self._checkpoint_name(name)))
+
+    @contextmanager
+    def checkpoint(self, name, keep=True):
+        """Rolls back any changes to vmdb_production made in the block
+
+        Creates the checkpoint unless it exists already, so a module can start from a baseline
+        checkpoint created by an earlier one, e.g. with providers already added and refreshed.
+
+        Usage:
+
+        .. code-block:: python
+
+            with appliance.db.checkpoint('providers_added'):
+                run_destructive_scenario()
+
+        Args:
+            name: Name of the checkpoint
+            keep: Keep the checkpoint for later restores, drop it after the block otherwise
+        """
+        if name not in self.checkpoints:
+            self.create_checkpoint(name)
+        try:
+            yield
+        finally:
+            self.restore_checkpoint(name)
+            if not keep:
+                self.drop_checkpoint(name)
+
     def setup(self, **kwargs):
         """Configure database
 
@@ -524,6 +648,7 @@ class ApplianceDB(AppliancePlugin):
             client.run_command('rm {}'.format(remote_file))
 
         self.logger.info('Output from appliance db configuration: %s', result.output)
+        self.appliance.config_cache.invalidate()
 
         return result.rc, result.output
 
@@ -545,6 +670,7 @@ class ApplianceDB(AppliancePlugin):
         # reset the db address and clear the cached db object if we have one
         self.address = db_address
         clear_property_cache(self, 'client')
+        self.appliance.config_cache.invalidate()
 
         # default
         db_name = db_name or 'vmdb_production'
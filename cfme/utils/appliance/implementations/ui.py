@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 import json
+import re
 import time
+from datetime import timedelta
 from inspect import isclass
 from time import sleep
 
 import os
+import six
 from cached_property import cached_property
+from six.moves.urllib.parse import urljoin, urlsplit, urlunsplit
 from jsmin import jsmin
 from navmazing import Navigate, NavigateStep
 from selenium.common.exceptions import (
@@ -19,9 +23,11 @@ from widgetastic.widget import Text, View
 from cfme import exceptions
 from cfme.utils.browser import manager
 from cfme.utils.log import logger, create_sublogger
+from cfme.utils.spans import traced
 from cfme.utils.version import Version
 from cfme.utils.wait import wait_for
 from cfme.fixtures.pytest_store import store
+from widgetastic_manageiq import invalidate_summary_snapshot
 from . import Implementation
 
 VersionPick.VERSION_CLASS = Version
@@ -104,12 +110,101 @@ class MiqBrowserPlugin(DefaultPlugin):
         }
         ''')
 
+    # Asynchronous version of ENSURE_PAGE_SAFE. It waits in the page until the page is safe and
+    # its DOM tree did not change for the quiet period, so the whole wait is one round trip.
+    # Pages that never stop changing their DOM tree (pollers, spinners, auto-refreshed lists)
+    # count as settled once they stayed safe for the quiet window.
+    # Resolves [settled, tracked] where tracked means that the page tracks its in-flight requests
+    # and debounced inputs in ManageIQ.qe, so a settled page is provably idle.
+    SETTLE_PAGE = jsmin('''\
+        var timeout = arguments[0];
+        var quietPeriod = arguments[1];
+        var quietWindow = arguments[2];
+        var done = arguments[arguments.length - 1];
+        var isSafe = function() {%s};
+
+        if (!window.__miqqeSettleMonitor) {
+            var monitor = {lastMutation: Date.now()};
+            try {
+                new MutationObserver(function() {
+                    monitor.lastMutation = Date.now();
+                }).observe(document, {childList: true, subtree: true});
+            } catch(err) {
+            }
+            window.__miqqeSettleMonitor = monitor;
+        }
+        var monitor = window.__miqqeSettleMonitor;
+        var tracked = (typeof ManageIQ !== "undefined" && !!ManageIQ.qe &&
+                       typeof ManageIQ.qe.anythingInFlight === "function");
+        var start = Date.now();
+        var safeSince = null;
+
+        new Promise(function(resolve) {
+            function check() {
+                var now = Date.now();
+                var safe = false;
+                try {
+                    safe = !!isSafe();
+                } catch(err) {
+                }
+                if (!safe) {
+                    safeSince = null;
+                } else if (safeSince === null) {
+                    safeSince = now;
+                }
+                if (safe && (now - monitor.lastMutation >= quietPeriod ||
+                             now - safeSince >= quietWindow)) {
+                    resolve(true);
+                } else if (now - start >= timeout) {
+                    resolve(false);
+                } else {
+                    setTimeout(check, 50);
+                }
+            }
+            check();
+        }).then(function(settled) {
+            done([settled, tracked]);
+        });
+        ''' % ENSURE_PAGE_SAFE)
+
     OBSERVED_FIELD_MARKERS = (
         'data-miq_observe',
         'data-miq_observe_date',
         'data-miq_observe_checkbox',
     )
     DEFAULT_WAIT = .8
+    # how long the DOM tree must stay unchanged for the page to be settled
+    SETTLE_QUIET_PERIOD = .15
+    # how long a safe page may keep changing its DOM tree before it counts as settled anyway
+    SETTLE_QUIET_WINDOW = 1
+    # extra time selenium waits for the settle script on top of the page-side timeout
+    SCRIPT_TIMEOUT_MARGIN = 5
+    TIMEOUT_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+    #: Page settle waits of all browsers of this process, to measure per-interaction latency,
+    #: reset and reported per session by :py:mod:`cfme.fixtures.browser`
+    settle_stats = {'count': 0, 'total': 0.0, 'max': 0.0, 'fallbacks': 0, 'timeouts': 0}
+
+    def __init__(self, *args, **kwargs):
+        super(MiqBrowserPlugin, self).__init__(*args, **kwargs)
+        self._script_timeout = None
+        # whether the last wait proved the page idle, and nothing was done on it since
+        self._proven_idle = False
+
+    @classmethod
+    def reset_settle_stats(cls):
+        cls.settle_stats.update(count=0, total=0.0, max=0.0, fallbacks=0, timeouts=0)
+
+    @classmethod
+    def settle_stats_summary(cls):
+        """Returns a line describing :py:attr:`settle_stats`, ``None`` if there were no waits"""
+        stats = cls.settle_stats
+        if not stats['count']:
+            return None
+        return (
+            'page settle waits: {count}, {total:.1f}s in total, {mean:.3f}s mean, {max:.3f}s max, '
+            '{fallbacks} fallbacks to polling, {timeouts} timeouts'.format(
+                mean=stats['total'] / stats['count'], **stats))
 
     @property
     def page_has_changes(self):
@@ -157,19 +252,74 @@ class MiqBrowserPlugin(DefaultPlugin):
             self.browser.selenium.switch_to.window(win)
             self.logger.debug('Switched back to the original window')
 
+    def _timeout_secs(self, timeout):
+        """Converts timeouts like ``'20s'`` or ``'5m'`` to seconds."""
+        if isinstance(timeout, timedelta):
+            return timeout.total_seconds()
+        if isinstance(timeout, six.string_types) and timeout[-1:] in self.TIMEOUT_UNITS:
+            return float(timeout[:-1]) * self.TIMEOUT_UNITS[timeout[-1]]
+        return float(timeout)
+
+    def _settle(self, timeout):
+        """Waits for the page to settle using :py:attr:`SETTLE_PAGE`.
+
+        Returns:
+            ``(settled, tracked)`` tuple, see :py:attr:`SETTLE_PAGE`, or ``None`` if the script
+            could not finish, e.g. because the page was reloaded meanwhile.
+        """
+        selenium = self.browser.selenium
+        script_timeout = timeout + self.SCRIPT_TIMEOUT_MARGIN
+        try:
+            if self._script_timeout != script_timeout:
+                selenium.set_script_timeout(script_timeout)
+                self._script_timeout = script_timeout
+            settled, tracked = selenium.execute_async_script(
+                self.SETTLE_PAGE, int(timeout * 1000), int(self.SETTLE_QUIET_PERIOD * 1000),
+                int(self.SETTLE_QUIET_WINDOW * 1000))
+        except WebDriverException as e:
+            self.logger.debug('page settle script failed: %s', e)
+            return None
+        return bool(settled), bool(tracked)
+
+    def wait_for_idle(self, timeout='20s'):
+        """Waits for the page to settle.
+
+        Returns:
+            ``True`` if the page settled and it tracks its in-flight requests and debounced
+            inputs, so it is provably idle, ``False`` otherwise.
+        """
+        timeout = self._timeout_secs(timeout)
+        stats = self.settle_stats
+        start = time.time()
+        result = self._settle(timeout)
+        if result is None:
+            stats['fallbacks'] += 1
+
+            def _check():
+                result = self.browser.execute_script(self.ENSURE_PAGE_SAFE, silent=True)
+                # TODO: Logging
+                return bool(result)
+            wait_for(_check, timeout=timeout, delay=0.2, silent_failure=True, very_quiet=True)
+        elif not result[0]:
+            stats['timeouts'] += 1
+        elapsed = time.time() - start
+        stats['count'] += 1
+        stats['total'] += elapsed
+        stats['max'] = max(stats['max'], elapsed)
+        self._proven_idle = result is not None and all(result)
+        return self._proven_idle
+
     def ensure_page_safe(self, timeout='20s'):
         # THIS ONE SHOULD ALWAYS USE JAVASCRIPT ONLY, NO OTHER SELENIUM INTERACTION
         if (self.browser.page_dirty and self.browser.alert_present and
                 self.browser.get_alert().text == 'Abandon changes?'):
             self.browser.handle_alert()
-
-        def _check():
-            result = self.browser.execute_script(self.ENSURE_PAGE_SAFE, silent=True)
-            # TODO: Logging
-            return bool(result)
-        wait_for(_check, timeout=timeout, delay=0.2, silent_failure=True, very_quiet=True)
+        self.wait_for_idle(timeout)
 
     def after_keyboard_input(self, element, keyboard_input):
+        self._proven_idle = False
+        # the input could have changed the page without reloading it, observed field or not
+        invalidate_summary_snapshot(self.browser)
         observed_field_attr = None
         for attr in self.OBSERVED_FIELD_MARKERS:
             observed_field_attr = self.browser.get_attribute(attr, element)
@@ -178,6 +328,12 @@ class MiqBrowserPlugin(DefaultPlugin):
         else:
             return
 
+        # Observed fields fire their request after a debounce interval. Pages tracking their
+        # debounced inputs in ManageIQ.qe are only idle once the request is done, no need to pause
+        if self.wait_for_idle():
+            self.make_document_focused()
+            return
+
         try:
             attr_dict = json.loads(observed_field_attr)
             interval = float(attr_dict.get('interval', self.DEFAULT_WAIT))
@@ -200,10 +356,14 @@ class MiqBrowserPlugin(DefaultPlugin):
         # there is an issue in different dialogs
         # when cfme doesn't see that some input fields have been updated
         # this is temporary fix until we figure out real reason and fix it
-        sleep(0.3)
+        # the pause is skipped if the wait after the previous interaction proved the page idle
+        if not self._proven_idle:
+            sleep(0.3)
+        self._proven_idle = False
         self.make_document_focused()
 
     def before_click(self, element):
+        self._proven_idle = False
         # this is necessary in order to handle unexpected alerts like "Abandon Changes"
         self.browser.page_dirty = self.page_has_changes
 
@@ -211,6 +371,8 @@ class MiqBrowserPlugin(DefaultPlugin):
         # page_dirty is set to None because otherwise if it was true, all next ensure_page_safe
         # calls would check alert presence which is enormously slow in selenium.
         self.browser.page_dirty = None
+        # the click could have changed the page without reloading it
+        invalidate_summary_snapshot(self.browser)
 
 
 class MiqBrowser(Browser):
@@ -245,12 +407,30 @@ class MiqBrowser(Browser):
         return self.appliance.version
 
 
+class DetachedMiqBrowser(MiqBrowser):
+    """:py:class:`MiqBrowser` of a selenium other than the current browser of the appliance
+
+    Its views are created on itself instead of on the appliance's browser.
+    """
+    def create_view(self, view_class, additional_context=None):
+        return view_class(self, additional_context=additional_context or {}, logger=logger)
+
+
 def can_skip_badness_test(fn):
     """Decorator for setting a noop"""
     fn._can_skip_badness_test = True
     return fn
 
 
+# Direct URLs of navigation destinations learned from successful navigations, see
+# :py:meth:`CFMENavigateStep.learn_direct_url`. Keyed by (appliance version, object class name,
+# destination name), values are URL paths with ``{id}`` in place of the entity id or ``None``
+# for destinations that can't be reached by URL.
+_direct_urls = {}
+# A number in an URL, most likely id of something
+_URL_NUMBER = re.compile(r'(?<![\w.])\d+(?![\w.])')
+
+
 class CFMENavigateStep(NavigateStep):
     VIEW = None
 
@@ -495,15 +675,82 @@ class CFMENavigateStep(NavigateStep):
         str_msg = "[UI-NAV/{}/{}]: {}".format(class_name, self._name, msg)
         getattr(logger, level)(str_msg)
 
-    def construct_message(self, here, resetter, view, duration, waited):
+    def construct_message(self, here, resetter, view, duration, waited, direct=False):
         str_here = "Already Here" if here else "Needed Navigation"
+        str_direct = "Direct URL" if direct else "Click Path"
         str_resetter = "Resetter Used" if resetter else "No Resetter"
         str_view = "View Returned" if view else "No View Available"
         str_waited = "Waited on View" if waited else "No Wait on View"
-        return "{}/{}/{}/{} (elapsed {}ms)".format(
-            str_here, str_resetter, str_view, str_waited, duration
+        return "{}/{}/{}/{}/{} (elapsed {}ms)".format(
+            str_here, str_direct, str_resetter, str_view, str_waited, duration
         )
 
+    @property
+    def _direct_url_key(self):
+        obj_class = self.obj if isclass(self.obj) else self.obj.__class__
+        return self.appliance.version, obj_class.__name__, self._name
+
+    def _entity_id(self):
+        """Returns id of the navigated entity or ``None`` if it has none."""
+        if isclass(self.obj):
+            return None
+        try:
+            entity_id = getattr(self.obj, 'id', None)
+        except Exception as e:
+            self.log_message('Could not get entity id: {}'.format(e), level="debug")
+            return None
+        return None if entity_id is None else str(entity_id)
+
+    def learn_direct_url(self):
+        """Remembers the current URL as the direct URL of this destination.
+
+        Only URLs which identify the destination are remembered, explorer pages show whatever
+        is selected in their tree and URLs with numbers other than the entity id refer to
+        something we can't parametrize.
+        """
+        key = self._direct_url_key
+        if key in _direct_urls:
+            return
+        url = urlsplit(self.appliance.browser.widgetastic.selenium.current_url)
+        path = urlunsplit(('', '', url.path, url.query, url.fragment))
+        entity_id = self._entity_id() if _URL_NUMBER.search(path) else None
+        if entity_id is not None:
+            path = re.sub(r'(?<![\w.]){}(?![\w.])'.format(re.escape(entity_id)), '{id}', path)
+        if url.path.rstrip('/').endswith('explorer') or _URL_NUMBER.search(path):
+            self.log_message("Destination can't be reached by URL: {}".format(path))
+            _direct_urls[key] = None
+        else:
+            self.log_message("Learned direct URL: {}".format(path))
+            _direct_urls[key] = path
+
+    def go_direct(self):
+        """Navigates straight to the learned URL of this destination.
+
+        Returns:
+            ``True`` if the destination view is displayed after loading the URL. The URL is
+            forgotten if it is not, so the next navigation uses the click path again.
+        """
+        key = self._direct_url_key
+        path = _direct_urls.get(key)
+        if path is None:
+            return False
+        if '{id}' in path:
+            entity_id = self._entity_id()
+            if entity_id is None:
+                return False
+            path = path.replace('{id}', entity_id)
+        self.log_message("Navigating directly to {}".format(path))
+        br = self.appliance.browser.widgetastic
+        br.selenium.get(urljoin(self.appliance.server.address(), path))
+        br.plugin.ensure_page_safe()
+        if self.am_i_here():
+            return True
+        self.log_message("Direct URL {} did not lead to the view, forgetting it".format(path))
+        _direct_urls[key] = None
+        return False
+
+    @traced('navigate', detail=lambda step, *args, **kwargs: '{}.{}'.format(
+        type(step.obj).__name__, step._name))
     def go(self, _tries=0, *args, **kwargs):
         nav_args = {'use_resetter': True, 'wait_for_view': False}
         self.log_message("Beginning Navigation...", level="info")
@@ -527,7 +774,18 @@ class CFMENavigateStep(NavigateStep):
         except Exception as e:
             self.log_message(
                 "Exception raised [{}] whilst checking if already here".format(e), level="error")
-        if not here:
+        # Destinations with navigation arguments can't be told apart by URL
+        can_go_direct = (
+            self.VIEW is not None and not args and not kwargs and
+            not os.environ.get('DISABLE_DIRECT_NAVIGATION', False))
+        direct = False
+        if not here and can_go_direct:
+            try:
+                direct = self.check_for_badness(self.go_direct, _tries, nav_args)
+            except Exception as e:
+                self.log_message(
+                    "Exception raised [{}] whilst navigating directly".format(e), level="error")
+        if not here and not direct:
             self.log_message("Prerequisite Needed")
             self.prerequisite_view = self.prerequisite()
             try:
@@ -552,8 +810,12 @@ class CFMENavigateStep(NavigateStep):
                 lambda: view.is_displayed, num_sec=10,
                 message="Waiting for view [{}] to display".format(view.__class__.__name__)
             )
+        if not here and not direct and can_go_direct and self._direct_url_key not in _direct_urls:
+            if self.am_i_here():
+                self.learn_direct_url()
         self.log_message(
-            self.construct_message(here, resetter_used, view, duration, waited), level="info"
+            self.construct_message(here, resetter_used, view, duration, waited, direct),
+            level="info"
         )
         return view
 
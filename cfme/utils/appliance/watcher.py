@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Appliance-wide watcher of REST resources.
+
+Many waits poll the same appliance at once, each of them fetching its own resource on its own
+fixed delay. The watcher serves all of them from one background thread: every tick, the watched
+resources of one collection are fetched by a single query and each waiter is woken up as soon as
+its predicate holds for the fresh resource.
+
+Usage:
+
+.. code-block:: python
+
+    request = appliance.rest_api.collections.requests.get(id=request_id)
+    appliance.watcher.wait_for(
+        request, lambda r: r.request_state == 'finished', num_sec=1800,
+        message='request finished')
+
+    vm = appliance.rest_api.collections.vms.get(name=vm_name)
+    appliance.watcher.wait_not_exists(vm, num_sec=600)
+
+    appliance.watcher.wait_all_not_exist(appliance.rest_api.collections.providers.all)
+"""
+import time
+from collections import defaultdict
+from threading import Event, Lock, Thread, current_thread
+
+import attr
+
+from cfme.utils.wait import TimedOutError
+from .plugin import AppliancePlugin
+
+
+@attr.s(cmp=False)
+class Watch(object):
+    """One registered wait, see :py:meth:`ApplianceWatcher.wait_for`"""
+    collection = attr.ib()
+    resource_id = attr.ib(converter=str)
+    predicate = attr.ib()
+    done = attr.ib(default=attr.Factory(Event), init=False)
+    resource = attr.ib(default=None, init=False)
+    error = attr.ib(default=None, init=False)
+
+
+@attr.s
+class ApplianceWatcher(AppliancePlugin):
+    """Multiplexes waits on REST resources of one appliance into batched collection queries
+
+    Args:
+        tick: Seconds between two rounds of queries
+        batch_size: Most resources fetched by one query
+    """
+    tick = attr.ib(default=2)
+    batch_size = attr.ib(default=50)
+    _watches = attr.ib(default=attr.Factory(lambda: defaultdict(list)), init=False, repr=False)
+    _lock = attr.ib(default=attr.Factory(Lock), init=False, repr=False)
+    _thread = attr.ib(default=None, init=False, repr=False)
+
+    def _add(self, *watches):
+        with self._lock:
+            for watch in watches:
+                self._watches[watch.collection].append(watch)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name='appliance-watcher')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _remove(self, watch):
+        with self._lock:
+            watches = self._watches.get(watch.collection, [])
+            if watch in watches:
+                watches.remove(watch)
+
+    def _run(self):
+        stop = Event()
+        try:
+            while True:
+                with self._lock:
+                    watches = {name: list(collection_watches)
+                               for name, collection_watches in self._watches.items()
+                               if collection_watches}
+                    if not watches:
+                        # started again by the next wait, which can come right after the lock
+                        self._thread = None
+                        return
+                for name, collection_watches in watches.items():
+                    try:
+                        self._poll(name, collection_watches)
+                    except Exception as e:
+                        # let the waits time out if it doesn't recover
+                        self.logger.warning('Watcher could not query %s: %r', name, e)
+                stop.wait(self.tick)
+        except BaseException:
+            with self._lock:
+                if self._thread is current_thread():
+                    self._thread = None
+            raise
+
+    def _fetch(self, name, resource_ids):
+        """Fetches resources of one collection by ids, returns a dict of id to resource"""
+        collection = getattr(self.appliance.rest_api.collections, name)
+        resources = {}
+        for i in range(0, len(resource_ids), self.batch_size):
+            batch = resource_ids[i:i + self.batch_size]
+            filters = ['id={}'.format(batch[0])] + ['or id={}'.format(id_) for id_ in batch[1:]]
+            result = collection.query_string(**{'filter[]': filters, 'expand': 'resources'})
+            resources.update((str(resource.id), resource) for resource in result)
+        return resources
+
+    def _poll(self, name, watches):
+        resources = self._fetch(name, sorted({watch.resource_id for watch in watches}))
+        for watch in watches:
+            resource = resources.get(watch.resource_id)
+            try:
+                if not watch.predicate(resource):
+                    continue
+            except Exception as e:
+                watch.error = e
+            watch.resource = resource
+            self._remove(watch)
+            watch.done.set()
+
+    def wait_for(self, entity, predicate, num_sec=600, message=None):
+        """Waits until ``predicate`` holds for the entity
+
+        Args:
+            entity: REST entity to watch
+            predicate: Called with the fresh entity, or with ``None`` once it no longer exists,
+                the wait ends when it returns true
+            num_sec: Timeout in seconds
+            message: Description of the wait for the logs
+        Returns:
+            The entity for which the predicate held, ``None`` if it didn't exist at that time
+        Raises:
+            :py:class:`cfme.utils.wait.TimedOutError` on timeout, exceptions raised by the predicate
+        """
+        message = message or 'watch {} {}'.format(entity.collection.name, entity.id)
+        watch = Watch(entity.collection.name, entity.id, predicate)
+        self.logger.info('Waiting for %s', message)
+        self._add(watch)
+        if not watch.done.wait(num_sec):
+            self._remove(watch)
+            raise TimedOutError("Could not do '{}' in time".format(message))
+        if watch.error is not None:
+            raise watch.error
+        return watch.resource
+
+    def wait_not_exists(self, entity, num_sec=600, message=None):
+        """Waits until the entity is deleted, see :py:meth:`wait_for`"""
+        self.wait_for(
+            entity, lambda resource: resource is None, num_sec=num_sec,
+            message=message or '{} {} to disappear'.format(entity.collection.name, entity.id))
+
+    def wait_all_not_exist(self, entities, num_sec=600, message=None):
+        """Waits until all the entities are deleted
+
+        The entities are watched together, so one query per collection and tick checks all of
+        them, unlike calling :py:meth:`wait_not_exists` on them one after another.
+
+        Raises:
+            :py:class:`cfme.utils.wait.TimedOutError` if any of them still exists after ``num_sec``
+        """
+        watches = [Watch(entity.collection.name, entity.id, lambda resource: resource is None)
+                   for entity in entities]
+        message = message or '{} resources to disappear'.format(len(watches))
+        self.logger.info('Waiting for %s', message)
+        deadline = time.time() + num_sec
+        self._add(*watches)
+        try:
+            for watch in watches:
+                if not watch.done.wait(max(deadline - time.time(), 0)):
+                    raise TimedOutError("Could not do '{}' in time".format(message))
+        finally:
+            for watch in watches:
+                self._remove(watch)
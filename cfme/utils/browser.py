@@ -138,6 +138,10 @@ class BrowserFactory(object):
     def _firefox_profile(self):
         return _load_firefox_profile()
 
+    def spawn(self):
+        """Returns a factory of the same browsers, which can run next to this one's"""
+        return type(self)(self.webdriver_class, dict(self.browser_kwargs))
+
     def processed_browser_args(self):
         self._add_missing_options()
 
@@ -191,6 +195,11 @@ class WharfFactory(BrowserFactory):
                 co['args'].append(arg)
             browser_kwargs['desired_capabilities']['chromeOptions'] = co
 
+    def spawn(self):
+        # every browser needs its own container, checked in by close()
+        wharf = Wharf(self.wharf.wharf_url)
+        return type(self)(self.webdriver_class, dict(self.browser_kwargs), wharf)
+
     def processed_browser_args(self):
         command_executor = self.wharf.config['webdriver_url']
         view_msg = 'tests can be viewed via vnc on display {}'.format(
@@ -230,6 +239,10 @@ class BrowserManager(object):
         self.factory = browser_factory
         self.browser = None
         self._browser_renew_thread = None
+        # BrowserPool of spare browsers, see cfme.test_framework.browser_isolation
+        self.pool = None
+        # factory of the current browser if it came from the pool
+        self._browser_factory = None
 
     def coerce_url_key(self, key):
         return key or store.current_appliance.url  # TODO: don't rely on store.current_appliance
@@ -291,12 +304,13 @@ class BrowserManager(object):
         # TODO: figure if we want to log the url key here
         self._consume_cleanups()
         try:
-            self.factory.close(self.browser)
+            (self._browser_factory or self.factory).close(self.browser)
         except Exception as e:
             log.error('An exception happened during browser shutdown:')
             log.exception(e)
         finally:
             self.browser = None
+            self._browser_factory = None
 
     def start(self, url_key=None):
         log.info('starting browser')
@@ -310,6 +324,16 @@ class BrowserManager(object):
         log.info('starting browser for %r', url_key)
         assert self.browser is None
 
+        while self.pool is not None:
+            spare = self.pool.take(url_key)
+            if spare is None:
+                break
+            self._browser_factory, self.browser = spare
+            if self._is_alive():
+                log.info('took a spare browser from the pool')
+                return self.browser
+            self.quit()
+
         self.browser = self.factory.create(url_key=url_key)
         return self.browser
 
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Pool of spare browsers, started and logged in ahead of time.
+
+With ``--browser-isolation`` the browser is killed after every test, and the next test waits for
+a new webdriver (and wharf container), the browser start and a login. The pool keeps ``size``
+spare browsers per URL ready in background threads, so that
+:py:meth:`cfme.utils.browser.BrowserManager.open_fresh` only takes one of them.
+
+Spares are logged in by the ``log_in`` callable given to :py:meth:`BrowserPool.prepare`, each of
+them into its own session, so that no session state (edits in progress, tree and search
+selections, page settings) is carried over from one test to the next. ``logged_in`` is checked
+again when a spare logged in more than ``recheck_interval`` ago is taken, spares logged out
+meanwhile are dropped.
+
+With ``replay_cookies``, the cookies of the last login are replayed to the next spares of the same
+URL instead and the login form is only submitted again when ``logged_in`` says that the replayed
+session isn't valid anymore. It saves the logins, but the spares share one session.
+"""
+import time
+from collections import defaultdict, deque
+from threading import Lock, Thread
+
+from cfme.utils.log import logger
+
+
+class BrowserPool(object):
+    """Keeps spare browsers of prepared URLs ready
+
+    Args:
+        factory: :py:class:`cfme.utils.browser.BrowserFactory`, every spare is created by its own
+            ``factory.spawn()`` so that it can be closed independently of the others
+        size: Number of spares kept ready per URL
+        replay_cookies: Whether to log spares in by the cookies of the previous login, they share
+            the session of the login then
+        recheck_interval: Seconds after its login a spare is checked to be still logged in when
+            it is taken
+    """
+    def __init__(self, factory, size=1, replay_cookies=False, recheck_interval=60):
+        self.factory = factory
+        self.size = size
+        self.replay_cookies = replay_cookies
+        self.recheck_interval = recheck_interval
+        self._lock = Lock()
+        # url_key: deque of (factory, browser, time of the login)
+        self._spares = defaultdict(deque)
+        # url_key: number of spares being started
+        self._starting = defaultdict(int)
+        # url_key: (log_in, logged_in)
+        self._log_ins = {}
+        # url_key: cookies of the last login
+        self._cookies = {}
+
+    def prepare(self, url_key, log_in=None, logged_in=None):
+        """Starts keeping spares of ``url_key`` ready, can be called repeatedly
+
+        Args:
+            url_key: URL the spares are opened at
+            log_in: Called with a fresh spare browser to log it in
+            logged_in: Called with a spare browser after replaying cookies or when it is taken,
+                returns whether it is logged in
+        """
+        with self._lock:
+            self._log_ins[url_key] = (log_in, logged_in)
+        self._fill(url_key)
+
+    def take(self, url_key):
+        """Returns ``(factory, browser)`` of a ready spare of ``url_key``, ``None`` if there's none
+
+        The browser is closed by ``factory.close(browser)``. A replacement of the taken spare is
+        started right away.
+        """
+        while True:
+            with self._lock:
+                spares = self._spares.get(url_key)
+                spare = spares.popleft() if spares else None
+                logged_in = self._log_ins.get(url_key, (None, None))[1]
+            if url_key in self._log_ins:
+                self._fill(url_key)
+            if spare is None:
+                return None
+            factory, browser, logged_in_at = spare
+            if (time.time() - logged_in_at < self.recheck_interval or
+                    self._still_logged_in(url_key, browser, logged_in)):
+                return factory, browser
+            logger.info('Spare browser for %s was logged out meanwhile, dropping it', url_key)
+            self._close(factory, browser)
+
+    def _still_logged_in(self, url_key, browser, logged_in):
+        if logged_in is None:
+            return True
+        try:
+            browser.get(url_key)
+            return logged_in(browser)
+        except Exception as e:
+            logger.warning('Could not check a spare browser for %s: %s', url_key, e)
+            return False
+
+    def close(self):
+        """Closes all the spares, the pool can be prepared again afterwards"""
+        with self._lock:
+            self._log_ins.clear()
+            spares = [spare for url_spares in self._spares.values() for spare in url_spares]
+            self._spares.clear()
+        for factory, browser, _ in spares:
+            self._close(factory, browser)
+
+    def _fill(self, url_key):
+        with self._lock:
+            missing = self.size - len(self._spares[url_key]) - self._starting[url_key]
+            self._starting[url_key] += max(missing, 0)
+        for _ in range(missing):
+            thread = Thread(target=self._start_spare, args=(url_key,), name='browser-pool')
+            thread.daemon = True
+            thread.start()
+
+    def _start_spare(self, url_key):
+        factory = self.factory.spawn()
+        browser = None
+        try:
+            browser = factory.create(url_key=url_key)
+            self._log_in(url_key, browser)
+        except Exception as e:
+            logger.exception('Could not start a spare browser for %s: %s', url_key, e)
+            # checks in the container of the factory even without a browser
+            self._close(factory, browser)
+            browser = None
+        with self._lock:
+            self._starting[url_key] -= 1
+            keep = browser is not None and url_key in self._log_ins
+            if keep:
+                self._spares[url_key].append((factory, browser, time.time()))
+        if browser is not None and not keep:
+            # the pool was closed meanwhile
+            self._close(factory, browser)
+
+    def _log_in(self, url_key, browser):
+        log_in, logged_in = self._log_ins.get(url_key, (None, None))
+        if log_in is None:
+            return
+        cookies = self._cookies.get(url_key)
+        if self.replay_cookies and cookies and logged_in is not None:
+            for cookie in cookies:
+                browser.add_cookie(cookie)
+            browser.get(url_key)
+            if logged_in(browser):
+                logger.info('Spare browser for %s logged in by cookies', url_key)
+                return
+            browser.delete_all_cookies()
+            browser.get(url_key)
+        log_in(browser)
+        self._cookies[url_key] = browser.get_cookies()
+        logger.info('Spare browser for %s logged in', url_key)
+
+    def _close(self, factory, browser):
+        try:
+            factory.close(browser)
+        except Exception as e:
+            logger.error('An exception happened during spare browser shutdown: %s', e)
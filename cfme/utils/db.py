@@ -3,6 +3,7 @@ from contextlib import contextmanager
 
 from cached_property import cached_property
 from sqlalchemy import MetaData, create_engine, event, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import ArgumentError, DisconnectionError, InvalidRequestError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -11,6 +12,7 @@ from sqlalchemy.pool import Pool
 from cfme.fixtures.pytest_store import store
 from cfme.utils import conf
 from cfme.utils.log import logger
+from cfme.utils.spans import finish_span, start_span
 
 
 @event.listens_for(Pool, "checkout")
@@ -30,6 +32,29 @@ def ping_connection(dbapi_connection, connection_record, connection_proxy):
     cursor.close()
 
 
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_span(conn, cursor, statement, parameters, context, executemany):
+    """Opens a span of the query while spans are recorded, see :py:mod:`cfme.utils.spans`"""
+    token = start_span('sql', 2)
+    if token is not None:
+        conn.info.setdefault('query_spans', []).append(token)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def finish_query_span(conn, cursor, statement, parameters, context, executemany):
+    query_spans = conn.info.get('query_spans')
+    if query_spans:
+        finish_span(query_spans.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def finish_failed_query_span(exception_context):
+    connection = exception_context.connection
+    query_spans = connection.info.get('query_spans') if connection is not None else None
+    if query_spans:
+        finish_span(query_spans.pop())
+
+
 class Db(Mapping):
     """Helper class for interacting with a CFME database using SQLAlchemy
 
@@ -4,7 +4,7 @@
 
 """
 
-from time import sleep
+from collections import defaultdict
 from threading import Thread, Event as ThreadEvent
 
 from cfme.utils.log import create_sublogger
@@ -93,8 +93,8 @@ class Event(object):
                 self.event_attrs['target_id'] = EventAttr(**{'target_id': o[0].id})
 
             except ValueError:
-                # Target isn't added yet. Need to wait
-                sleep(1)
+                # Target isn't added yet. It is resolved again on the next listener tick
+                pass
 
     def matches(self, evt):
         """ Compares common attributes of expected event and passed event."""
@@ -122,15 +122,28 @@ class RestEventListener(Thread):
     """ EventListener accepts "expected" events, listens to db events and compares matched events
     with expected events. Runs callback function if expected events have it.
 
+    All expected events are served by one ``event_streams`` query per listener tick. The query
+    asks only for events newer than the last processed one and only for the attributes the
+    expected events compare. Received events are dispatched to the expected events through an
+    index keyed on ``(event_type, target_type)``, so each one is matched against a few candidates.
+
     :var FILTER_ATTRS: List of filters used in REST API call
+    :var INDEX_ATTRS: Attributes used as the dispatch index key
+    :var POLL_INTERVAL_MIN: Poll interval used while events keep coming (seconds)
+    :var POLL_INTERVAL_MAX: Upper bound of the poll interval when nothing happens (seconds)
     """
     FILTER_ATTRS = ['event_type', 'target_type', 'target_id', 'source']
+    INDEX_ATTRS = ('event_type', 'target_type')
+    POLL_INTERVAL_MIN = 0.5
+    POLL_INTERVAL_MAX = 5
 
     def __init__(self, appliance):
         super(RestEventListener, self).__init__()
         self._appliance = appliance
         self._events_to_listen = []
+        self._dispatch_index = defaultdict(list)
         self._last_processed_id = 0  # this is used to filter out old or processed events
+        self._poll_interval = self.POLL_INTERVAL_MIN
         self._stop_event = ThreadEvent()
 
         self.event_streams = appliance.rest_api.collections.event_streams
@@ -185,10 +198,39 @@ class RestEventListener(Thread):
                              'matched_events': [],
                              'first_event': first_event}
                 self._events_to_listen.append(exp_event)
+                self._dispatch_index[self._index_key(evt)].append(exp_event)
                 logger.info("event {} is added to listening queue.".format(evt))
             else:
                 raise ValueError("one of events doesn't belong to Event class")
 
+    def _index_key(self, evt):
+        """ Returns dispatch index key of an expected event.
+
+        Attributes which are absent or compared by a custom function can't be looked up by value,
+        so they are stored as a wildcard (None).
+        """
+        key = []
+        for name in self.INDEX_ATTRS:
+            attr = evt.event_attrs.get(name)
+            key.append(attr.value if attr and attr.value and not attr.cmp_func else None)
+        return tuple(key)
+
+    def _candidates(self, got_event):
+        """ Returns expected events which may match received event, using the dispatch index."""
+        event_type, target_type = [
+            got_event.event_attrs[name].value if name in got_event.event_attrs else None
+            for name in self.INDEX_ATTRS]
+        for key in {(event_type, target_type), (event_type, None),
+                    (None, target_type), (None, None)}:
+            for exp_event in self._dispatch_index.get(key, []):
+                yield exp_event
+
+    @property
+    def _pending_events(self):
+        """ Expected events which still have to be processed."""
+        return [exp_event for exp_event in self._events_to_listen
+                if not (exp_event['first_event'] and exp_event['matched_events'])]
+
     def start(self):
         self.set_last_record()
         self._stop_event.clear()
@@ -210,51 +252,87 @@ class RestEventListener(Thread):
     def process_events(self):
         """ Processes all new events and compares them with expected events.
 
-        Processed events are ignored next time.
+        Processed events are ignored next time. Poll interval shrinks to
+        :py:attr:`POLL_INTERVAL_MIN` when new events come and grows up to
+        :py:attr:`POLL_INTERVAL_MAX` while event_streams stays quiet.
         """
-        while not self._stop_event.is_set():
-            sleep(1)
-            for exp_event in self._events_to_listen:
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                got_events = self.process_next_portion()
+            except Exception:
+                logger.exception("An exception during matching events occurred.")
+                got_events = 0
 
-                # Skip if event has occurred
-                if exp_event['first_event'] and len(exp_event['matched_events']):
-                    continue
+            if got_events:
+                self._poll_interval = self.POLL_INTERVAL_MIN
+            else:
+                self._poll_interval = min(self._poll_interval * 2, self.POLL_INTERVAL_MAX)
 
-                matched_events = self.get_next_portion(exp_event['event'])
+    def process_next_portion(self):
+        """ Fetches next portion of events and dispatches them to expected events.
 
-                if not matched_events:
+        Returns number of received events.
+        """
+        pending_events = self._pending_events
+        if not pending_events:
+            return 0
+
+        event_entities = self.get_next_portion([exp_event['event']
+                                                for exp_event in pending_events])
+        if not event_entities:
+            return 0
+
+        for event_entity in event_entities:
+            got_event = Event(self._appliance).build_from_entity(event_entity)
+            for exp_event in self._candidates(got_event):
+                if exp_event['first_event'] and exp_event['matched_events']:
                     continue
 
-                # Match events
-                try:
-                    for event_entity in matched_events:
-                            got_event = Event(self._appliance).build_from_entity(event_entity)
-                            if exp_event['event'].matches(got_event):
-                                if exp_event['callback']:
-                                    exp_event['callback'](exp_event=exp_event['event'],
-                                                          got_event=got_event)
-                                exp_event['matched_events'].append(got_event)
-                    self._last_processed_id = got_event.event_attrs['id'].value
-                except Exception:
-                    logger.exception("An exception during matching events occurred.")
-
-                if self._stop_event.is_set():
-                    break
+                if exp_event['event'].matches(got_event):
+                    if exp_event['callback']:
+                        exp_event['callback'](exp_event=exp_event['event'],
+                                              got_event=got_event)
+                    exp_event['matched_events'].append(got_event)
+            self._last_processed_id = got_event.event_attrs['id'].value
+
+            if self._stop_event.is_set():
+                break
+        return len(event_entities)
 
-    def get_next_portion(self, evt):
-        """ Returns list with one or more events matched with expected event.
+    def get_next_portion(self, evts):
+        """ Returns list with new events which may match any of expected events.
 
-        Returns None if there is no matched events."""
-        evt.process_id()
+        Filters shared by all the expected events are applied on the appliance side, the rest is
+        left for :py:meth:`Event.matches`. Only attributes compared by expected events are
+        requested.
+
+        Returns None if there are no new events."""
+        for evt in evts:
+            evt.process_id()
 
         q = Q('id', '>', self._last_processed_id)  # ensure we get only new events
 
-        used_filters = set(self.FILTER_ATTRS).intersection(set(evt.event_attrs))
-        for filter_attr in used_filters:
-            evt_attr = evt.event_attrs[filter_attr]
-            if evt_attr.value:
-                q &= Q(filter_attr, '=', evt_attr.value)
-        result = self.event_streams.filter(q)
+        for filter_attr in self.FILTER_ATTRS:
+            values = set()
+            for evt in evts:
+                evt_attr = evt.event_attrs.get(filter_attr)
+                if not evt_attr or not evt_attr.value or evt_attr.cmp_func:
+                    break
+                values.add(evt_attr.value)
+            else:
+                if len(values) == 1:
+                    q &= Q(filter_attr, '=', values.pop())
+
+        attributes = {'id'}.union(self.FILTER_ATTRS)
+        for evt in evts:
+            attributes.update(evt.event_attrs)
+        attributes.discard('target_name')
+
+        result = self.event_streams.query_string(**{'filter[]': q.as_filters,
+                                                    'attributes': ','.join(sorted(attributes)),
+                                                    'sort_by': 'id',
+                                                    'sort_order': 'asc',
+                                                    'expand': 'resources'})
 
         if len(result):
             return result
@@ -268,6 +346,7 @@ class RestEventListener(Thread):
 
     def reset_events(self):
         self._events_to_listen = []
+        self._dispatch_index.clear()
 
     def check_expected_events(self):
         """ Checks that all expected events has arrived."""
@@ -5,11 +5,11 @@
 
 from cached_property import cached_property
 from contextlib import contextmanager
-from collections import Iterable
+from collections import Iterable, defaultdict
 from datetime import datetime
 from numbers import Number
 from sqlalchemy.sql.expression import func
-from time import sleep
+from time import sleep, time
 from threading import Thread, Event as ThreadEvent
 
 from cfme.utils.log import create_sublogger
@@ -210,18 +210,20 @@ class Event(object):
 
     def _parse_raw_event(self, evt):
         for attr in self._default_attrs:
-            default_type = self._default_attrs[attr].type
-            evt_value = getattr(evt, attr)
-            evt_type = type(evt_value)
-            # weird thing happens here. getattr sometimes takes value not equal to python_type
-            # so, force type conversion has to be done
-            if evt_value and evt_type is not default_type:
-                if evt_type is unicode:
-                    evt_value = evt_value.encode('utf8')
-                else:
-                    evt_value = default_type(evt_value)
+            self._add_raw_value(attr, getattr(evt, attr))
+
+    def _add_raw_value(self, attr, evt_value):
+        default_type = self._default_attrs[attr].type
+        evt_type = type(evt_value)
+        # weird thing happens here. getattr sometimes takes value not equal to python_type
+        # so, force type conversion has to be done
+        if evt_value and evt_type is not default_type:
+            if evt_type is unicode:
+                evt_value = evt_value.encode('utf8')
+            else:
+                evt_value = default_type(evt_value)
 
-            self.add_attrs(EventAttr(**{attr: evt_value}))
+        self.add_attrs(EventAttr(**{attr: evt_value}))
 
     def _is_raw_event(self, evt):
         return evt.__tablename__ == 'event_streams'
@@ -280,34 +282,52 @@ class Event(object):
             self._parse_raw_event(evt)
         return self
 
+    def build_from_row(self, row):
+        """
+        helper method which takes a row with some of event_streams columns and prepares event object
+        """
+        for attr, value in zip(row.keys(), row):
+            if attr in self._default_attrs:
+                self._add_raw_value(attr, value)
+        return self
+
 
 class DbEventListener(Thread):
     """
      accepts "expected" events, listens to db events and compares showed up events with expected
      events. Runs callback function if expected events have it.
+
+     new events are streamed from event_streams in id order, :py:attr:`BATCH_SIZE` rows at a time,
+     and only columns compared by expected events are selected. every row is matched only against
+     expected events found in the (event_type, target_type) index.
+
+    :var BATCH_SIZE: Max number of event_streams rows fetched by one query
+    :var INDEX_ATTRS: Attributes used as the dispatch index key
     """
+    BATCH_SIZE = 500
+    INDEX_ATTRS = ('event_type', 'target_type')
+
     def __init__(self, appliance):
         super(DbEventListener, self).__init__()
         self._appliance = appliance
         self._tool = EventTool(self._appliance)
 
         self._events_to_listen = []
+        self._dispatch_index = defaultdict(list)
         # last_id is used to ignore already arrived messages the database
         # When database is "cleared" the id of the last event is placed here. That is then used
         # in queries to prevent events of this id and earlier to get in.
         self._last_processed_id = None
+        self._last_timestamp = None
         self._stop_event = ThreadEvent()
+        self.reset_stats()
 
     def set_last_record(self, evt=None):
         if evt:
             self._last_processed_id = evt.event_attrs['id'].value
         else:
-            try:
-                self._last_processed_id = self._tool.query(
-                    func.max(self._tool.event_streams.id)).one()
-            except IndexError:
-                # No events yet, so do nothing
-                pass
+            self._last_processed_id = self._tool.query(
+                func.max(self._tool.event_streams.id)).scalar() or 0
 
     def new_event(self, *attrs, **kwattrs):
         """
@@ -356,15 +376,40 @@ class DbEventListener(Thread):
             for evt in evts:
                 if isinstance(evt, Event):
                     logger.info("event {} is added to listening queue".format(evt))
-                    self._events_to_listen.append({'event': evt,
-                                                   'callback': callback,
-                                                   'matched_events': [],
-                                                   'first_event': first_event})
+                    exp_event = {'event': evt,
+                                 'callback': callback,
+                                 'matched_events': [],
+                                 'first_event': first_event}
+                    self._events_to_listen.append(exp_event)
+                    self._dispatch_index[self._index_key(evt)].append(exp_event)
                 else:
                     raise ValueError("one of events doesn't belong to Event class")
         else:
             raise ValueError('incorrect is passed')
 
+    def _index_key(self, evt):
+        """
+        returns dispatch index key of expected event.
+        attributes which are absent or compared by cmp_func are stored as a wildcard (None)
+        """
+        key = []
+        for name in self.INDEX_ATTRS:
+            attr = evt.event_attrs.get(name)
+            key.append(attr.value if attr and attr.value and not attr.cmp_func else None)
+        return tuple(key)
+
+    def _candidates(self, got_event):
+        """
+        returns expected events which may match got event
+        """
+        event_type, target_type = [
+            got_event.event_attrs[name].value if name in got_event.event_attrs else None
+            for name in self.INDEX_ATTRS]
+        for key in {(event_type, target_type), (event_type, None),
+                    (None, target_type), (None, None)}:
+            for exp_event in self._dispatch_index.get(key, []):
+                yield exp_event
+
     def start(self):
         logger.info('Event Listener has been started')
         self.set_last_record()
@@ -387,15 +432,16 @@ class DbEventListener(Thread):
         processes all new db events and compares them with expected events.
         processed events are ignored next time
         """
+        self._stats['started'] = time()
         while not self._stop_event.is_set():
             events = self.get_next_portion()
             if len(events) == 0:
                 sleep(0.2)
                 continue
-            for got_event in events:
-                logger.debug("processing event id {}".format(got_event.id))
-                got_event = Event(event_tool=self._tool).build_from_raw_event(got_event)
-                for exp_event in self._events_to_listen:
+            for row in events:
+                logger.debug("processing event id {}".format(row.id))
+                got_event = Event(event_tool=self._tool).build_from_row(row)
+                for exp_event in self._candidates(got_event):
                     if exp_event['first_event'] and len(exp_event['matched_events']) > 0:
                         continue
 
@@ -403,7 +449,10 @@ class DbEventListener(Thread):
                         if exp_event['callback']:
                             exp_event['callback'](exp_event=exp_event['event'], got_event=got_event)
                         exp_event['matched_events'].append(got_event)
+                        self._stats['matched'] += 1
                 self.set_last_record(got_event)
+                self._last_timestamp = row.timestamp
+                self._stats['processed'] += 1
 
                 if self._stop_event.is_set():
                     break
@@ -423,12 +472,55 @@ class DbEventListener(Thread):
 
     def reset_events(self):
         self._events_to_listen = []
+        self._dispatch_index.clear()
+
+    def reset_stats(self):
+        self._stats = {'started': time(), 'processed': 0, 'matched': 0, 'queries': 0}
+
+    @property
+    def stats(self):
+        """
+        returns listener counters:
+            processed: number of event_streams rows processed since listener start
+            matched: number of rows matched to expected events
+            queries: number of event_streams queries issued
+            throughput: processed rows per second
+            lag: seconds between now and timestamp of the last processed event (utc)
+        """
+        stats = dict(self._stats)
+        elapsed = time() - stats.pop('started')
+        stats['throughput'] = stats['processed'] / elapsed if elapsed > 0 else 0.0
+        if self._last_timestamp:
+            stats['lag'] = (datetime.utcnow() - self._last_timestamp).total_seconds()
+        else:
+            stats['lag'] = None
+        return stats
+
+    @property
+    def _columns(self):
+        """
+        event_streams columns which are used by expected events
+        """
+        names = {'id', 'timestamp'}.union(self.INDEX_ATTRS)
+        for exp_event in self._events_to_listen:
+            names.update(exp_event['event'].event_attrs)
+            if 'target_name' in exp_event['event'].event_attrs:
+                names.add('target_id')
+        names.discard('target_name')
+        table = self._tool.event_streams
+        return [getattr(table, name) for name in sorted(names) if hasattr(table, name)]
 
     def get_next_portion(self):
+        """
+        returns next batch of new events ordered by id.
+        keyset pagination is used, so every query is an index range scan starting at last
+        processed id and returning at most :py:attr:`BATCH_SIZE` rows
+        """
         logger.debug("obtaining next portion of events")
-        return self._tool.query(self._tool.event_streams)\
+        self._stats['queries'] += 1
+        return self._tool.query(*self._columns)\
             .filter(self._tool.event_streams.id > self._last_processed_id)\
-            .order_by(self._tool.event_streams.id).yield_per(100).all()
+            .order_by(self._tool.event_streams.id).limit(self.BATCH_SIZE).all()
 
     def check_expected_events(self):
         return all([len(event['matched_events']) for event in self.got_events])
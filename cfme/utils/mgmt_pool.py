@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Pool of the ``wrapanapi`` clients returned by :py:func:`cfme.utils.providers.get_mgmt`.
+
+Clients are kept per provider and hash of its data and credentials, so other credentials
+connect their own client rather than getting one logged in by other ones, and the clients of the
+variants of a provider are kept side by side. Callers get a :py:class:`PooledMgmt` proxy of the
+pooled client, it takes the current client of the pool on every use:
+
+* a client older than ``ttl`` is replaced by a new one,
+* a client not checked for ``check_interval`` is checked by ``health_check`` and replaced if
+  the check fails,
+* a call failing with an authentication error (the session expired) replaces the client and is
+  retried once,
+* ``disconnect()`` of the proxy drops the client, the next use connects a new one,
+* a proxy whose client was dropped from the pool (``clear()``) connects a new one as well.
+
+The proxy passes ``isinstance`` checks of the class of its client. Attributes set on the proxy
+are kept by the pool and set again on every new client.
+
+Clients hold sockets and sessions, they can't be shared by the processes of a run. To keep the
+slaves of a run from logging in to a provider all at once, the connects to one provider are
+limited to ``max_connects`` at a time across the processes sharing ``lock_dir``.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+import attr
+
+from cfme.utils.log import logger
+
+# Names of the exceptions the providers raise on expired sessions or invalid credentials
+AUTH_ERROR_NAMES = ('Unauthorized', 'NotAuthenticated', 'AuthError', 'AuthenticationError',
+                    'InvalidLogin', 'Forbidden')
+
+
+def default_health_check(client):
+    """Calls ``info()`` of the client if it has one, raising marks the client unhealthy"""
+    info = getattr(client, 'info', None)
+    if callable(info):
+        info()
+
+
+def default_is_auth_error(exc):
+    """Whether ``exc`` says that the client is not logged in (anymore)"""
+    if any(name in type(exc).__name__ for name in AUTH_ERROR_NAMES):
+        return True
+    response = getattr(exc, 'response', None)
+    for status in (getattr(exc, 'status', None), getattr(exc, 'status_code', None),
+                   getattr(response, 'status_code', None)):
+        if status in (401, 403):
+            return True
+    return False
+
+
+def credentials_hash(provider_kwargs):
+    """Hash of the provider data and credentials a client is connected with"""
+    data = {key: value for key, value in provider_kwargs.items() if key != 'logger'}
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+@attr.s
+class PoolEntry(object):
+    """Pooled client and when it was connected and checked"""
+    connect = attr.ib()
+    client = attr.ib(default=None)
+    connected = attr.ib(default=0)
+    checked = attr.ib(default=0)
+    # set through the proxy, set again on every new client
+    attributes = attr.ib(default=attr.Factory(dict))
+    lock = attr.ib(default=attr.Factory(Lock), repr=False)
+
+
+class PooledMgmt(object):
+    """Proxy of the pooled client of one provider, see the module docs"""
+    def __init__(self, pool, key, connect):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_connect', connect)
+
+    @property
+    def client(self):
+        """The current pooled client"""
+        return self._pool.client(self._key, self._connect)
+
+    @property
+    def __class__(self):
+        # isinstance checks of the client class, e.g. IPAppliance.is_on_rhev
+        return type(self.client)
+
+    def disconnect(self):
+        self._pool.invalidate(self._key)
+
+    def __getattr__(self, name):
+        value = getattr(self.client, name)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            try:
+                return value(*args, **kwargs)
+            except Exception as e:
+                if not self._pool.is_auth_error(e):
+                    raise
+                logger.warning('%s of %s failed with %r, reconnecting', name, self._key[0], e)
+                self._pool.invalidate(self._key)
+                return getattr(self.client, name)(*args, **kwargs)
+        call.__name__ = name
+        call.__doc__ = getattr(value, '__doc__', None)
+        return call
+
+    def __setattr__(self, name, value):
+        self._pool.set_attribute(self._key, name, value, self._connect)
+
+    def __repr__(self):
+        return '<PooledMgmt {!r} of {!r}>'.format(self._key[0], self._pool)
+
+
+class MgmtPool(object):
+    """Keeps one connected client per provider and credentials
+
+    Args:
+        ttl: Seconds after which a client is replaced by a new one
+        check_interval: Seconds between two health checks of a client
+        health_check: Called with a client, a client it raises for is replaced
+        is_auth_error: Called with an exception of a client call, whether the client has to log
+            in again
+        max_connects: Most clients connecting to one provider at a time
+        lock_dir: Directory of the lock files limiting the connects across processes, without
+            it only the clients of one provider and credentials connect one at a time
+    """
+    def __init__(self, ttl=3600, check_interval=300, health_check=default_health_check,
+                 is_auth_error=default_is_auth_error, max_connects=2, lock_dir=None):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.health_check = health_check
+        self.is_auth_error = is_auth_error
+        self.max_connects = max_connects
+        self.lock_dir = lock_dir
+        self._lock = Lock()
+        # (provider, credentials hash): PoolEntry
+        self._entries = {}
+
+    def get(self, provider, provider_kwargs, connect):
+        """Returns the :py:class:`PooledMgmt` of a provider
+
+        Args:
+            provider: Key or name of the provider
+            provider_kwargs: Provider data and credentials the client is connected with
+            connect: Called without arguments to connect a new client
+        """
+        key = (provider, credentials_hash(provider_kwargs))
+        self._entry(key, connect)
+        return PooledMgmt(self, key, connect)
+
+    def _entry(self, key, connect):
+        """Returns the entry of ``key``, adding it if it is not in the pool"""
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = PoolEntry(connect)
+            return self._entries[key]
+
+    def client(self, key, connect):
+        """Returns the connected client of ``key``, (re)connecting it by ``connect`` if needed"""
+        entry = self._entry(key, connect)
+        with entry.lock:
+            now = time.time()
+            if entry.client is not None and now - entry.connected > self.ttl:
+                logger.info('Client of %s is older than %ss, reconnecting', key[0], self.ttl)
+                self._disconnect(entry)
+            elif entry.client is not None and now - entry.checked > self.check_interval:
+                try:
+                    self.health_check(entry.client)
+                    entry.checked = now
+                except Exception as e:
+                    logger.warning('Client of %s failed the health check: %r', key[0], e)
+                    self._disconnect(entry)
+            if entry.client is None:
+                with self._connect_slot(key[0]):
+                    logger.debug('Connecting a client of %s', key[0])
+                    entry.client = entry.connect()
+                for name, value in entry.attributes.items():
+                    setattr(entry.client, name, value)
+                entry.connected = entry.checked = time.time()
+            return entry.client
+
+    def set_attribute(self, key, name, value, connect):
+        """Sets an attribute of the client of ``key``, and of the clients replacing it"""
+        entry = self._entry(key, connect)
+        with entry.lock:
+            entry.attributes[name] = value
+            if entry.client is not None:
+                setattr(entry.client, name, value)
+
+    def invalidate(self, key):
+        """Disconnects the client of ``key``, the next use connects a new one"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            with entry.lock:
+                self._disconnect(entry)
+
+    def clear(self):
+        """Disconnects and drops all the clients"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            with entry.lock:
+                self._disconnect(entry)
+
+    def _disconnect(self, entry):
+        client, entry.client = entry.client, None
+        if client is None:
+            return
+        try:
+            client.disconnect()
+        except Exception as e:
+            logger.warning('Could not disconnect a provider client: %r', e)
+
+    @contextmanager
+    def _connect_slot(self, provider):
+        """Holds one of the ``max_connects`` connect locks of the provider"""
+        if not self.lock_dir:
+            yield
+            return
+        if not os.path.isdir(self.lock_dir):
+            try:
+                os.makedirs(self.lock_dir)
+            except OSError:
+                # made by another process meanwhile
+                pass
+        digest = hashlib.sha256(str(provider).encode('utf-8')).hexdigest()[:16]
+        while True:
+            for slot in range(self.max_connects):
+                lock_file = open(
+                    os.path.join(self.lock_dir, '{}.{}.lock'.format(digest, slot)), 'a')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except IOError:
+                    lock_file.close()
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+                return
+            time.sleep(0.1)
@@ -12,20 +12,23 @@ import operator
 import six
 from collections import Mapping, OrderedDict
 from copy import copy
+from functools import partial
 
 from cfme.common.provider import all_types
 
 from cfme.exceptions import UnknownProviderType
 from cfme.utils import conf
 from cfme.utils.log import logger
+from cfme.utils.mgmt_pool import MgmtPool
+from cfme.utils.path import log_path
 
 providers_data = conf.cfme_data.get("management_systems", {})
 # Dict of active provider filters {name: ProviderFilter}
 global_filters = {}
 
-# Store instances of provider mgmt classes that we have instantiated before,
-# so that we don't re-generate mgmt classes for the same exact provider
-PROVIDER_MGMT_CACHE = {}
+# Connected instances of provider mgmt classes, so that we don't re-generate mgmt classes for the
+# same exact provider and credentials, see cfme.utils.mgmt_pool
+mgmt_pool = MgmtPool(lock_dir=log_path.join('mgmt_connects').strpath)
 
 
 def load_setuptools_entrypoints():
@@ -349,8 +352,8 @@ def get_mgmt(provider_key, providers=None, credentials=None):
             locations. Expects a dict.
         credentials: A set of credentials in the same format as the ``credentials`` yamls files.
             If ``None`` then credentials are loaded from the default locations. Expects a dict.
-    Return: A provider instance of the appropriate ``wrapanapi.WrapanapiAPIBase``
-        subclass
+    Return: A :py:class:`cfme.utils.mgmt_pool.PooledMgmt` of a provider instance of the
+        appropriate ``wrapanapi.WrapanapiAPIBase`` subclass
     """
     if providers is None:
         providers = providers_data
@@ -386,12 +389,17 @@ def get_mgmt(provider_key, providers=None, credentials=None):
         provider_kwargs['provider_key'] = provider_key
     provider_kwargs['logger'] = logger
 
-    if provider_key not in PROVIDER_MGMT_CACHE:
-        mgmt_instance = get_class_from_type(provider_data['type']).mgmt_class(**provider_kwargs)
-        PROVIDER_MGMT_CACHE[provider_key] = mgmt_instance
+    if isinstance(provider_key, six.string_types):
+        pool_name = provider_key
     else:
-        logger.debug("returning cached mgmt class for '%s'", provider_key)
-    return PROVIDER_MGMT_CACHE[provider_key]
+        # data of providers not in the yamls often has no name, the clients of the same
+        # provider still share the connect locks
+        pool_name = (provider_data.get('name') or provider_data.get('hostname') or
+                     provider_data['type'])
+    return mgmt_pool.get(
+        pool_name,
+        provider_kwargs,
+        partial(get_class_from_type(provider_data['type']).mgmt_class, **provider_kwargs))
 
 
 class UnknownProvider(Exception):
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Open-loop driver of REST API workloads.
+
+Perf workloads queue a batch of actions every ``time_between_*`` seconds. Issuing the batch
+entity by entity and then sleeping for what is left of the period makes the real load depend on
+how fast the appliance answers. The driver instead schedules batch ``i`` at ``start + i *
+interval``, issues it on a worker of a pool so that a slow batch never delays the next one, and
+records how late every batch was issued (the drift) for the workload quantifiers.
+
+Usage:
+
+.. code-block:: python
+
+    vms = appliance.rest_api.collections.vms
+    pool_rest_session(appliance.rest_api)
+    stats = run_open_loop(
+        lambda tick: bulk_action(vms, 'refresh', next_batch()),
+        interval=scenario['time_between_refresh'], total_time=scenario['total_time'])
+    quantifiers.update(stats.quantifiers())
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import attr
+from requests.adapters import HTTPAdapter
+
+from cfme.utils.log import logger
+
+#: Workers issuing the batches, and connections kept open to the appliance
+POOL_SIZE = 10
+
+
+def pool_rest_session(rest_api, pool_size=POOL_SIZE):
+    """Lets the REST API client keep ``pool_size`` connections open to the appliance
+
+    The client shares one session between all the workers, by default its pool keeps fewer
+    connections than there are workers and the extra ones are reopened on every request.
+    """
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    for prefix in ('http://', 'https://'):
+        rest_api._session.mount(prefix, adapter)
+
+
+def bulk_action(collection, action, resources):
+    """Runs ``action`` on all the ``resources`` of ``collection`` by a single request
+
+    Returns:
+        Number of the resources the action was queued for
+    """
+    resources = list(resources)
+    if resources:
+        getattr(collection.action, action)(*resources)
+    return len(resources)
+
+
+@attr.s
+class IssueStats(object):
+    """Timings of the batches issued by :py:func:`run_open_loop`
+
+    Args:
+        interval: Seconds between two scheduled batches
+    """
+    interval = attr.ib()
+    drifts = attr.ib(default=attr.Factory(list), init=False)
+    durations = attr.ib(default=attr.Factory(list), init=False)
+    queued = attr.ib(default=0, init=False)
+    failed = attr.ib(default=0, init=False)
+    elapsed = attr.ib(default=0, init=False)
+    _lock = attr.ib(default=attr.Factory(Lock), init=False, repr=False, cmp=False)
+
+    def record(self, drift, duration, queued=0, failed=False):
+        with self._lock:
+            self.drifts.append(drift)
+            self.durations.append(duration)
+            self.queued += queued or 0
+            self.failed += bool(failed)
+
+    @property
+    def late(self):
+        """Batches issued later than one interval after their schedule"""
+        return sum(1 for drift in self.drifts if drift > self.interval)
+
+    def quantifiers(self):
+        def avg(values):
+            return sum(values) / len(values) if values else 0
+        return {
+            'Issued_Batches': len(self.drifts),
+            'Failed_Batches': self.failed,
+            'Late_Batches': self.late,
+            'Issue_Drift_Avg': round(avg(self.drifts), 4),
+            'Issue_Drift_Max': round(max(self.drifts or [0]), 4),
+            'Issue_Time_Avg': round(avg(self.durations), 4),
+            'Issue_Time_Max': round(max(self.durations or [0]), 4),
+        }
+
+
+def _issue(issue, tick, scheduled, stats):
+    started = time.time()
+    queued, failed = 0, False
+    try:
+        queued = issue(tick)
+    except Exception as e:
+        # the workload goes on, the failures end up in the quantifiers
+        logger.exception('Batch %s failed: %s', tick, e)
+        failed = True
+    stats.record(started - scheduled, time.time() - started, queued, failed)
+
+
+def run_open_loop(issue, interval, total_time, workers=POOL_SIZE):
+    """Calls ``issue`` every ``interval`` seconds for ``total_time`` seconds
+
+    Batch ``tick`` is scheduled at ``start + tick * interval`` no matter how long the previous
+    batches take to issue, so the rate asked for by the scenario is kept unless all the
+    ``workers`` are busy.
+
+    Args:
+        issue: Called with the number of the batch, returns the number of queued actions
+        interval: Seconds between two batches
+        total_time: Seconds for which the batches are scheduled
+        workers: Batches issued at the same time at most
+    Returns:
+        :py:class:`IssueStats` of the batches
+    """
+    stats = IssueStats(interval)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    start = time.time()
+    tick = 0
+    try:
+        while tick * interval < total_time:
+            scheduled = start + tick * interval
+            delay = scheduled - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(_issue, issue, tick, scheduled, stats)
+            tick += 1
+            logger.info('Time elapsed: %s/%s', round(time.time() - start, 2), total_time)
+    finally:
+        executor.shutdown(wait=True)
+    stats.elapsed = time.time() - start
+    if stats.late:
+        logger.warning('%s of %s batches were issued more than %ss late',
+                       stats.late, tick, interval)
+    return stats
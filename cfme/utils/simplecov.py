@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Local merger of simplecov ``.resultset.json`` files.
+
+Python counterpart of the merging part of ``scripts/data/coverage/coverage_merger.rb``. It merges
+coverage data of all the appliance processes without uploading them to an appliance.
+
+The coverage hook writes one resultset per appliance process, laid out as
+``<coverage_root>/<ip>/<pid>/.resultset.json``. Each of them looks like:
+
+.. code-block:: text
+
+    {"<ip>-<pid>": {"coverage": {"<source file>": [<line hits>, ...], ...},
+                    "timestamp": 1518751298}}
+
+Line hits are ``0`` (not covered), a positive number (times covered) or ``null`` (not coverable).
+Merging adds the hits of the same file line by line. The merged resultset uses the same format
+under the ``merged_data`` key, so simplecov and sonar-scanner accept it as any other resultset.
+
+Resultsets are read one at a time and the work is split across worker processes, each merging
+its share of resultsets into a partial result which are merged together at the end.
+
+Usage:
+
+.. code-block:: python
+
+    from cfme.utils import simplecov
+
+    coverage, timestamp, skipped = simplecov.merge_resultsets(
+        simplecov.find_resultsets('/path/to/coverage'))
+    simplecov.write_resultset('/path/to/coverage/merged/.resultset.json', coverage, timestamp)
+"""
+import json
+import os
+from glob import glob
+from multiprocessing import Pool, cpu_count
+
+from cfme.utils.log import logger
+
+#: Top level key of the merged resultset, same as coverage_merger.rb uses
+MERGED_KEY = 'merged_data'
+#: Resultsets merged by one worker at least, smaller jobs are merged in-process
+MIN_RESULTSETS_PER_WORKER = 4
+
+
+def find_resultsets(coverage_root, depth=2):
+    """Returns sorted list of resultset files under ``coverage_root``.
+
+    Args:
+        coverage_root: Coverage directory
+        depth: Number of directory levels between coverage_root and resultsets,
+            2 for the ``<ip>/<pid>`` layout of the coverage hook.
+    """
+    pattern = os.path.join(*([coverage_root] + ['*'] * depth + ['.resultset.json']))
+    return sorted(glob(pattern))
+
+
+def read_resultset(path):
+    """Reads one resultset file.
+
+    As coverage_merger.rb does, only the first top level entry is used.
+
+    Returns:
+        ``(coverage, timestamp)`` tuple.
+    Raises:
+        :py:class:`ValueError` if the file is not valid JSON.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    for value in data.values():
+        return value['coverage'], value.get('timestamp', 0)
+    return {}, 0
+
+
+def merge_line_hits(hits1, hits2):
+    """Merges line hits of one source file.
+
+    Returns:
+        New list with hits summed line by line, ``None`` where neither line is coverable.
+    Raises:
+        :py:class:`ValueError` if the files differ in length or coverable lines.
+    """
+    if len(hits1) != len(hits2):
+        raise ValueError('Both files are not the same length!')
+    try:
+        return [None if hit1 is None and hit2 is None else hit1 + hit2
+                for hit1, hit2 in zip(hits1, hits2)]
+    except TypeError:
+        raise ValueError('Coverage data should be either null or a number in both files!')
+
+
+def merge_coverage(merged, coverage):
+    """Merges ``coverage`` of one resultset into ``merged`` coverage dict in place."""
+    for filename, hits in coverage.items():
+        if filename in merged:
+            merged[filename] = merge_line_hits(merged[filename], hits)
+        else:
+            merged[filename] = hits
+    return merged
+
+
+def _merge_resultset_files(paths):
+    coverage, timestamp, skipped = {}, 0, []
+    for path in paths:
+        try:
+            file_coverage, file_timestamp = read_resultset(path)
+        except ValueError as e:
+            logger.error('Skipping %s, no valid JSON: %s', path, e)
+            skipped.append(path)
+            continue
+        merge_coverage(coverage, file_coverage)
+        timestamp = max(timestamp, file_timestamp)
+    return coverage, timestamp, skipped
+
+
+def merge_resultsets(paths, coverage=None, processes=None):
+    """Merges resultset files.
+
+    Args:
+        paths: Resultset files to merge
+        coverage: Already merged coverage dict to merge the resultsets into
+        processes: Number of worker processes, defaults to number of CPUs
+    Returns:
+        ``(coverage, timestamp, skipped)`` tuple with merged coverage dict, the latest timestamp
+        and list of resultset files skipped because of invalid JSON.
+    """
+    paths = list(paths)
+    processes = min(processes or cpu_count(), len(paths) // MIN_RESULTSETS_PER_WORKER)
+    if processes > 1:
+        chunks = [paths[i::processes] for i in range(processes)]
+        pool = Pool(processes)
+        try:
+            results = pool.map(_merge_resultset_files, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_merge_resultset_files(paths)]
+
+    coverage = {} if coverage is None else coverage
+    timestamp, skipped = 0, []
+    for chunk_coverage, chunk_timestamp, chunk_skipped in results:
+        merge_coverage(coverage, chunk_coverage)
+        timestamp = max(timestamp, chunk_timestamp)
+        skipped.extend(chunk_skipped)
+    logger.info('Merged %d resultsets covering %d files', len(paths) - len(skipped),
+                len(coverage))
+    return coverage, timestamp, skipped
+
+
+def write_resultset(path, coverage, timestamp):
+    """Writes merged coverage as a resultset file, creating its directory if needed."""
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    with open(path, 'w') as f:
+        json.dump({MERGED_KEY: {'coverage': coverage, 'timestamp': timestamp}}, f)
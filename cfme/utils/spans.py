@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Lightweight spans telling where the time of a test goes.
+
+The choke points of the framework (``wait_for``, SSH commands, REST requests, navigation, database
+queries) are wrapped in spans. While recording is off, which is the default, a span costs a check
+of a global flag. While it's on (see :py:mod:`cfme.fixtures.span_profile`) every span records its
+name, the call site it was opened from and its timing into the tree of spans of the test.
+
+A span is serialized as a compact list ``[name, site, start, duration, children]``, ``start`` in
+seconds since the start of the root span, ``children`` a list of spans. At most ``max_spans``
+spans are recorded per tree, the spans past it are only counted.
+
+Usage:
+
+.. code-block:: python
+
+    @traced('ssh')
+    def run_command(self, command):
+        ...
+
+    with span('upload'):
+        ...
+
+    token = start_span('sql')
+    ...
+    finish_span(token)
+"""
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+#: Spans recorded per tree at most
+MAX_SPANS = 20000
+
+# Frames of these files are skipped when looking for the call site of a span
+_SKIPPED_FILES = ('spans.py', 'contextlib.py', 'functools.py')
+_SKIPPED_DIRS = tuple('{0}{1}{0}'.format(os.sep, name)
+                      for name in ('sqlalchemy', 'wait_for', 'pluggy', '_pytest'))
+
+_recorder = None
+
+
+class Span(object):
+    """One timed call, in the tree of spans"""
+    __slots__ = ('name', 'site', 'start', 'duration', 'children')
+
+    def __init__(self, name, site, start):
+        self.name = name
+        self.site = site
+        self.start = start
+        self.duration = None
+        self.children = []
+
+    def serialize(self, origin):
+        return [self.name, self.site, round(self.start - origin, 6),
+                None if self.duration is None else round(self.duration, 6),
+                [child.serialize(origin) for child in self.children]]
+
+
+class SpanRecorder(object):
+    """Records the spans opened by all the threads into one tree
+
+    Args:
+        max_spans: Spans recorded per tree at most
+        call_sites: Whether to look up the call sites of the spans
+    """
+    def __init__(self, max_spans=MAX_SPANS, call_sites=True):
+        self.max_spans = max_spans
+        self.call_sites = call_sites
+        self.root = None
+        self.count = 0
+        self.dropped = 0
+        self._local = threading.local()
+
+    def start_tree(self, name, site=None):
+        """Starts a new tree, spans of the threads without an open span go under its root"""
+        self.root = Span(name, site, time.time())
+        self.count = self.dropped = 0
+        self._local = threading.local()
+        return self.root
+
+    def finish_tree(self):
+        """Closes the root and returns it, with the number of dropped spans"""
+        root, self.root = self.root, None
+        if root is not None and root.duration is None:
+            root.duration = time.time() - root.start
+        return root, self.dropped
+
+    def start(self, name, depth=1, site=None):
+        """Opens a span under the last open span of the thread, returns it or None if dropped
+
+        Args:
+            name: Name of the span
+            depth: Frames up from the caller to look for the call site from
+            site: Call site of the span, looked up if not given
+        """
+        root = self.root
+        if root is None:
+            return None
+        if self.count >= self.max_spans:
+            self.dropped += 1
+            return None
+        self.count += 1
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if site is None and self.call_sites:
+            site = call_site(depth)
+        new = Span(name, site, time.time())
+        (stack[-1] if stack else root).children.append(new)
+        stack.append(new)
+        return new
+
+    def finish(self, span):
+        if span is None:
+            return
+        span.duration = time.time() - span.start
+        stack = getattr(self._local, 'stack', [])
+        # spans left open by an exception are closed with their parent
+        while stack:
+            if stack.pop() is span:
+                break
+
+
+def call_site(depth=1):
+    """``file:line`` of the first frame from ``depth`` frames up outside the span machinery"""
+    try:
+        frame = sys._getframe(depth + 1)
+    except ValueError:
+        return None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (os.path.basename(filename) not in _SKIPPED_FILES and
+                not any(part in filename for part in _SKIPPED_DIRS)):
+            return '{}:{}'.format(_relative(filename), frame.f_lineno)
+        frame = frame.f_back
+    return None
+
+
+def function_site(func):
+    """``file:line`` where ``func`` is defined"""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return None
+    return '{}:{}'.format(_relative(code.co_filename), code.co_firstlineno)
+
+
+_cwd = os.getcwd()
+
+
+def _relative(filename):
+    if filename.startswith(_cwd):
+        return filename[len(_cwd):].lstrip(os.sep)
+    return filename
+
+
+def enable(recorder):
+    """Records the spans into ``recorder`` from now on"""
+    global _recorder
+    _recorder = recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def recording():
+    return _recorder is not None
+
+
+def start_span(name, depth=1):
+    """Opens a span, returns the token to finish it with, None while not recording"""
+    recorder = _recorder
+    if recorder is None:
+        return None
+    return recorder, recorder.start(name, depth + 1)
+
+
+def finish_span(token):
+    if token is not None:
+        recorder, span = token
+        recorder.finish(span)
+
+
+class span(object):  # noqa
+    """Context manager recording its block as a span"""
+    __slots__ = ('name', 'token')
+
+    def __init__(self, name):
+        self.name = name
+        self.token = None
+
+    def __enter__(self):
+        if _recorder is not None:
+            self.token = start_span(self.name, 2)
+        return self
+
+    def __exit__(self, *exc_info):
+        finish_span(self.token)
+
+
+def traced(name, detail=None):
+    """Decorator recording the calls of a function as spans
+
+    Args:
+        name: Name of the spans
+        detail: Called with the arguments of the call, returns what is appended to the name
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            span_name = name if detail is None else '{} {}'.format(name, detail(*args, **kwargs))
+            new = recorder.start(span_name, 2)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.finish(new)
+        return wrapper
+    return decorator
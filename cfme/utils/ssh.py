@@ -18,6 +18,7 @@ from cfme.utils.log import logger
 from cfme.utils.net import net_check
 from cfme.utils.path import project_path
 from cfme.utils.quote import quote
+from cfme.utils.spans import traced
 from cfme.utils.timeutil import parsetime
 from cfme.utils.version import Version
 from cfme.fixtures.pytest_store import store
@@ -259,6 +260,7 @@ class SSHClient(paramiko.SSHClient):
             self.connect()
         return super(SSHClient, self).get_transport(*args, **kwargs)
 
+    @traced('ssh')
     def run_command(
             self, command, timeout=RUNCMD_TIMEOUT, reraise=False, ensure_host=False,
             ensure_user=False, container=None):
@@ -9,6 +9,7 @@ from cfme.utils.conf import cfme_data, credentials
 from cfme.utils.log import logger
 from cfme.utils.providers import get_mgmt
 from cfme.utils.ssh import SSHClient
+from cfme.utils.template.image_cache import image_cache
 from cfme.utils.wait import wait_for
 
 NUM_OF_TRIES = 3
@@ -136,6 +137,14 @@ class ProviderTemplateUpload(object):
         """
         return self.image_url.split("/")[-1]
 
+    @property
+    def local_image(self):
+        """ Returns local path to the image, downloaded through the shared image cache.
+
+        Uploaders of one stream share a single verified download.
+        """
+        return image_cache.get(self.image_url)
+
     @property
     def mgmt(self):
         """ Returns wrapanapi management system class.
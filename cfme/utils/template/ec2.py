@@ -1,9 +1,10 @@
-import os
 import re
-import urllib2
+
+from cached_property import cached_property
 
 from cfme.utils.log import logger
 from cfme.utils.template.base import ProviderTemplateUpload, log_wrap
+from cfme.utils.template.image_cache import ImageCacheException
 from cfme.utils.wait import wait_for
 
 
@@ -25,42 +26,19 @@ class EC2TemplateUpload(ProviderTemplateUpload):
     def bucket_name(self):
         return self.provider_data.get('upload_bucket_name', 'cfme-template-upload')
 
-    @property
+    @cached_property
     def file_path(self):
-        return os.path.abspath(self.image_name)
+        return self.local_image
 
     @log_wrap("download image")
     def download_image(self):
         try:
-            u = urllib2.urlopen(self.image_url)
-            meta = u.info()
-            file_size = int(meta.getheaders("Content-Length")[0])
-
-            if os.path.isfile(self.image_name):
-
-                if file_size == os.path.getsize(self.image_name):
-                    logger.info("(template-upload) [%s:%s:%s] Image %s already exists.",
-                                self.log_name, self.provider, self.template_name, self.image_name)
-                    return True
-                os.remove(self.image_name)
-
-            logger.info("(template-upload) [%s:%s:%s] Downloading %s to local directory. Bytes: %d",
+            logger.info("(template-upload) [%s:%s:%s] Image %s is available at %s.",
                         self.log_name, self.provider, self.template_name, self.image_name,
-                        file_size)
-
-            with open(self.image_name, 'wb') as image_file:
-                file_size_dl = 0
-                block_sz = 8192
-                while True:
-                    buffer_f = u.read(block_sz)
-                    if not buffer_f:
-                        break
-
-                    file_size_dl += len(buffer_f)
-                    image_file.write(buffer_f)
+                        self.file_path)
             return True
 
-        except:
+        except ImageCacheException:
             return False
 
     @log_wrap("create bucket")
@@ -130,9 +108,7 @@ class EC2TemplateUpload(ProviderTemplateUpload):
 
     @log_wrap("cleanup")
     def teardown(self):
+        # the image stays in the shared image cache for other uploads of the stream
         self.mgmt.delete_objects_from_s3_bucket(bucket_name=self.bucket_name,
                                                 object_keys=[self.template_name])
-        if os.path.exists(self.file_path):
-            os.remove(self.file_path)
-
         return True
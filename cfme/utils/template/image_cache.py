@@ -0,0 +1,180 @@
+""" Shared, checksum-keyed cache of appliance images for template uploads.
+
+All uploaders of one run share one :py:class:`ImageCache`, so an image of a stream is downloaded
+once per site no matter how many providers it is uploaded to. Images are stored under their
+published SHA256 checksum (taken from the ``SHA256SUM`` file of the build directory), interrupted
+downloads are resumed with HTTP range requests and finished downloads are verified against the
+published checksum before they are handed out.
+"""
+import hashlib
+import os
+from threading import Lock
+
+import requests
+
+from cfme.utils.conf import cfme_data
+from cfme.utils.log import logger
+from cfme.utils.path import project_path
+
+CHECKSUM_FILE = 'SHA256SUM'
+CHUNK_SIZE = 1024 * 1024
+NUM_OF_TRIES = 3
+
+
+class ImageCacheException(Exception):
+    """ Raised when an image can't be downloaded or verified"""
+    pass
+
+
+def default_cache_dir():
+    """ Returns cache directory from cfme_data.template_upload.image_cache_dir if set."""
+    return cfme_data.get('template_upload', {}).get(
+        'image_cache_dir', project_path.join('.image_cache').strpath)
+
+
+def file_checksum(file_path):
+    """ Returns SHA256 hexdigest of a file, read in chunks."""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def published_checksum(image_url):
+    """ Returns SHA256 checksum of an image published next to it in ``SHA256SUM``.
+
+    Returns None if the build directory doesn't publish checksums or the image isn't listed.
+    """
+    build_url, image_name = image_url.rsplit('/', 1)
+    try:
+        r = requests.get('/'.join([build_url, CHECKSUM_FILE]))
+    except requests.RequestException as e:
+        logger.warning('Cannot get %s for %s: %s', CHECKSUM_FILE, image_url, e)
+        return None
+    if not r.ok:
+        return None
+    for line in r.text.splitlines():
+        # <checksum> <name> or <checksum> *<name> for binary mode
+        fields = line.split()
+        if len(fields) == 2 and fields[1].lstrip('*') == image_name:
+            return fields[0].lower()
+    return None
+
+
+class ImageCache(object):
+    """ Content-addressed local cache of appliance images.
+
+    Layout: ``<cache_dir>/<sha256>/<image_name>``. Images without a published checksum are
+    stored under ``<cache_dir>/unverified/`` and are only reused if their size matches the
+    server's Content-Length.
+
+    Thread safe: concurrent :py:meth:`get` calls for one image wait for a single download.
+
+    Args:
+        cache_dir: Cache root directory, see :py:func:`default_cache_dir`
+    """
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._locks = {}
+        self._locks_lock = Lock()
+
+    def _lock(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, Lock())
+
+    def path_for(self, image_url, checksum=None):
+        """ Returns path where the image is (or will be) stored."""
+        image_name = image_url.split('/')[-1]
+        return os.path.join(self.cache_dir, checksum or 'unverified', image_name)
+
+    def get(self, image_url, checksum=None):
+        """ Returns local path to a verified copy of the image, downloading it if needed.
+
+        Args:
+            image_url: URL of the image file
+            checksum: Expected SHA256, looked up with :py:func:`published_checksum` if not given
+        Raises:
+            :py:class:`ImageCacheException` if the image can't be downloaded or verified
+        """
+        checksum = checksum or published_checksum(image_url)
+        if not checksum:
+            logger.warning('No published checksum for %s, image will not be verified', image_url)
+        image_path = self.path_for(image_url, checksum)
+
+        with self._lock(image_path):
+            if self._is_valid(image_path, image_url, checksum):
+                logger.info('Image %s found in cache: %s', image_url, image_path)
+                return image_path
+
+            for attempt in range(NUM_OF_TRIES):
+                try:
+                    self._download(image_url, image_path)
+                except (requests.RequestException, IOError) as e:
+                    # the .part file is kept, next attempt resumes it
+                    logger.error('Download of %s failed (attempt %d): %s',
+                                 image_url, attempt + 1, e)
+                    continue
+                if not checksum or file_checksum(image_path) == checksum:
+                    if checksum:
+                        self._mark_verified(image_path)
+                    return image_path
+                logger.error('Checksum mismatch of %s (attempt %d), downloading again',
+                             image_url, attempt + 1)
+                os.remove(image_path)
+            raise ImageCacheException('Cannot download verified {}'.format(image_url))
+
+    def _mark_verified(self, image_path):
+        with open('{}.verified'.format(image_path), 'w'):
+            pass
+
+    def _is_valid(self, image_path, image_url, checksum):
+        if not os.path.isfile(image_path):
+            return False
+        if checksum:
+            if os.path.isfile('{}.verified'.format(image_path)):
+                return True
+            if file_checksum(image_path) == checksum:
+                self._mark_verified(image_path)
+                return True
+            os.remove(image_path)
+            return False
+        try:
+            r = requests.head(image_url, allow_redirects=True)
+        except requests.RequestException as e:
+            # downloaded again, the download raises ImageCacheException if the server is gone
+            logger.warning('Cannot check size of %s: %s', image_url, e)
+            return False
+        return r.ok and int(r.headers.get('Content-Length', -1)) == os.path.getsize(image_path)
+
+    def _download(self, image_url, image_path):
+        """ Downloads the image to ``<image_path>.part`` and moves it to place when complete.
+
+        An existing ``.part`` file is resumed with a range request if the server supports it.
+        """
+        part_path = '{}.part'.format(image_path)
+        image_dir = os.path.dirname(image_path)
+        if not os.path.isdir(image_dir):
+            os.makedirs(image_dir)
+
+        offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+        headers = {'Range': 'bytes={}-'.format(offset)} if offset else {}
+        r = requests.get(image_url, headers=headers, stream=True)
+        if r.status_code == 416:
+            # Range not satisfiable, .part already holds the whole file
+            r.close()
+        else:
+            if not r.ok:
+                raise ImageCacheException('Cannot download {}: HTTP {}'.format(
+                    image_url, r.status_code))
+            mode = 'ab' if r.status_code == 206 else 'wb'
+            logger.info('Downloading %s to %s (%s at byte %d)', image_url, image_path,
+                        'resuming' if mode == 'ab' else 'starting', offset if mode == 'ab' else 0)
+            with open(part_path, mode) as f:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+        os.rename(part_path, image_path)
+
+
+#: Cache shared by all uploaders running in one process
+image_cache = ImageCache()
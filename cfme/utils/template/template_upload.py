@@ -1,6 +1,6 @@
 import argparse
 import sys
-from threading import Thread
+from concurrent import futures
 
 import cfme.utils.conf
 from cfme.utils import path, trackerbot
@@ -72,6 +72,9 @@ def parse_cmd_line():
     parser.add_argument(
         '--print-name-only', dest='print_name_only', action="store_true",
         help='Only print the template name that will be generated without actually running it.')
+    parser.add_argument(
+        '--max-workers', dest='max_workers', type=int, default=8,
+        help='Max number of uploads running concurrently.')
 
     return parser.parse_known_args()
 
@@ -141,7 +144,7 @@ if __name__ == '__main__':
     else:
         streams = ALL_STREAMS
 
-    thread_queue = []
+    uploaders = []
     for stream in streams:
         stream_url = ALL_STREAMS.get(stream)
         image_url = cmd_args.image_url
@@ -183,10 +186,14 @@ if __name__ == '__main__':
                         uploader.log_name, provider))
                     continue
 
-                thread = Thread(target=uploader.main)
-                thread.daemon = True
-                thread_queue.append(thread)
-                thread.start()
-
-    for thread in thread_queue:
-        thread.join()
+                uploaders.append(uploader)
+
+    # Uploaders of one stream share the image cache, so each image is downloaded only once
+    with futures.ThreadPoolExecutor(max_workers=cmd_args.max_workers) as executor:
+        upload_futures = {executor.submit(uploader.main): uploader for uploader in uploaders}
+        for future in futures.as_completed(upload_futures):
+            uploader = upload_futures[future]
+            if future.exception():
+                logger.error("(template-upload) [%s:%s:%s] Upload failed: %s",
+                             uploader.log_name, uploader.provider, uploader.template_name,
+                             future.exception())
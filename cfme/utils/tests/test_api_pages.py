@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from collections import Counter
+
+import pytest
+import slumber
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from cfme.utils.api_pages import PageFetcher
+
+TEMPLATES = [{'name': 'template-{:03d}'.format(i)} for i in range(200)]
+
+
+class FakeApiHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves ``server.objects`` at /api/template/ like tastypie, after ``server.latency``"""
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        limit = min(int(params.get('limit', 20)), server.max_limit)
+        offset = int(params.get('offset', 0))
+        with server.lock:
+            server.requests[offset] += 1
+            fail = server.requests[offset] <= server.failures.get(offset, 0)
+        time.sleep(server.latency)
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        objects = server.objects[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(server.objects):
+            next_params = dict(params, limit=limit, offset=offset + limit)
+            next_url = '/api/template/?{}'.format(
+                '&'.join('{}={}'.format(k, v) for k, v in sorted(next_params.items())))
+        meta = {'limit': limit, 'offset': offset, 'next': next_url,
+                'total_count': None if server.hide_counts else len(server.objects)}
+        body = json.dumps({'meta': meta, 'objects': objects}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeApiServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    server = FakeApiServer(('127.0.0.1', 0), FakeApiHandler)
+    server.objects = list(TEMPLATES)
+    server.latency = 0.1
+    server.max_limit = 1000
+    server.hide_counts = False
+    server.failures = {}
+    server.requests = Counter()
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(server):
+    return slumber.API('http://127.0.0.1:{}/api/'.format(server.server_address[1]))
+
+
+def depaginate(api, workers, **kwargs):
+    fetcher = PageFetcher(api, workers=workers, retry_delay=0, **kwargs)
+    started = time.time()
+    result = fetcher.depaginate(api.template.get(limit=20))
+    return result, time.time() - started
+
+
+def test_concurrent_pages(server, api):
+    sequential, sequential_time = depaginate(api, workers=1)
+    concurrent, concurrent_time = depaginate(api, workers=5)
+    assert sequential['objects'] == concurrent['objects'] == TEMPLATES
+    assert concurrent['meta']['total_count'] == 200
+    assert concurrent['meta']['next'] is None
+    # 9 pages after the first one, one after another or 5 at a time
+    assert sequential_time >= 0.9
+    assert concurrent_time < 0.5
+
+
+def test_capped_limit(server, api):
+    server.max_limit = 15
+    result, _ = depaginate(api, workers=5)
+    assert result['objects'] == TEMPLATES
+    assert server.requests[15] == 1
+
+
+def test_hidden_counts(server, api):
+    server.hide_counts = True
+    result, elapsed = depaginate(api, workers=5)
+    assert result['objects'] == TEMPLATES
+    assert elapsed >= 0.9
+
+
+def test_page_retried(server, api):
+    server.failures = {60: 1}
+    result, _ = depaginate(api, workers=5)
+    assert result['objects'] == TEMPLATES
+    assert server.requests[60] == 2
+
+    server.failures = {80: 5}
+    with pytest.raises(slumber.exceptions.HttpServerError):
+        depaginate(api, workers=5, attempts=3)
+
+
+def test_objects_added_meanwhile(server, api):
+    first = api.template.get(limit=20)
+    server.objects.extend({'name': 'template-new-{}'.format(i)} for i in range(30))
+    result = PageFetcher(api, workers=5).depaginate(first)
+    assert result['objects'] == server.objects
+
+
+def test_single_page(server, api):
+    first = api.template.get(limit=500)
+    assert PageFetcher(api).depaginate(first) is first
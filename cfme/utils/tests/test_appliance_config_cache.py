@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+from copy import deepcopy
+
+import pytest
+from cached_property import cached_property
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from cfme.utils.appliance.config_cache import ApplianceConfigCache
+from cfme.utils.db import Db
+from cfme.utils.version import Version
+
+SCHEMA = [
+    'CREATE TABLE settings_changes (id INTEGER PRIMARY KEY, key VARCHAR, value VARCHAR, '
+    'updated_at TIMESTAMP)',
+    'CREATE TABLE server_roles (id INTEGER PRIMARY KEY, name VARCHAR)',
+    'CREATE TABLE assigned_server_roles (id INTEGER PRIMARY KEY, miq_server_id INTEGER, '
+    'server_role_id INTEGER, active BOOLEAN)',
+]
+ROLES = ['automate', 'database_operations', 'database_owner', 'ems_inventory', 'storage_metrics',
+         'user_interface', 'vmdb_storage_bridge', 'web_services']
+
+
+class SqliteDb(Db):
+    """The database client of the appliance on an in-memory SQLite database"""
+    def __init__(self):
+        self._table_cache = {}
+
+    @cached_property
+    def engine(self):
+        return create_engine(
+            'sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+
+
+class StubRestApi(object):
+    """Serves a copy of ``data`` from the settings collection, records the GETs"""
+    def __init__(self, data):
+        self.data = data
+        self.gets = []
+        self.collections = self
+        self.settings = self
+        self._href = 'https://appliance/api/settings'
+
+    def get(self, url):
+        self.gets.append(url)
+        return deepcopy(self.data)
+
+
+class FakeAppliance(object):
+    version = Version('5.9.2.1')
+    evm_id = 1
+
+    def __init__(self, client, rest_api):
+        self.db = self
+        self.client = client
+        self.rest_api = rest_api
+
+
+@pytest.fixture
+def db():
+    db = SqliteDb()
+    for statement in SCHEMA:
+        db.engine.execute(statement)
+    for role_id, name in enumerate(ROLES, 1):
+        db.engine.execute('INSERT INTO server_roles VALUES (?, ?)', role_id, name)
+    # automate active on this server, ems_inventory inactive, web_services active on another one
+    db.engine.execute('INSERT INTO assigned_server_roles VALUES (1, 1, 1, 1)')
+    db.engine.execute('INSERT INTO assigned_server_roles VALUES (2, 1, 4, 0)')
+    db.engine.execute('INSERT INTO assigned_server_roles VALUES (3, 2, 8, 1)')
+    db.engine.execute(
+        "INSERT INTO settings_changes VALUES (1, '/server/company', 'ACME', '2018-05-01 10:00:00')")
+    return db
+
+
+@pytest.fixture
+def rest_api():
+    return StubRestApi({'server': {'company': 'ACME'}, 'product': {}})
+
+
+@pytest.fixture
+def fake_appliance(db, rest_api):
+    return FakeAppliance(db, rest_api)
+
+
+@pytest.fixture
+def cache(fake_appliance):
+    # the plugin only holds a weak reference to the appliance
+    return ApplianceConfigCache(fake_appliance)
+
+
+def test_advanced_settings_cached(cache, rest_api):
+    settings = cache.advanced_settings()
+    assert settings == {'server': {'company': 'ACME'}, 'product': {}}
+    # callers modify the settings they got
+    settings['server']['company'] = 'Other'
+    assert cache.advanced_settings()['server']['company'] == 'ACME'
+    assert len(rest_api.gets) == 1
+    assert cache.stats() == {'advanced_settings': {'hits': 1, 'misses': 1}}
+
+
+def test_invalidate(cache, rest_api):
+    cache.advanced_settings()
+    generation = cache.generation
+    rest_api.data = {'server': {'company': 'Other'}}
+    cache.invalidate()
+    assert cache.generation == generation + 1
+    assert cache.advanced_settings()['server']['company'] == 'Other'
+    assert len(rest_api.gets) == 2
+
+
+def test_server_roles(cache, db, rest_api):
+    assert cache.server_roles() == {
+        'automate': True, 'database_operations': False, 'ems_inventory': False,
+        'user_interface': False, 'web_services': False}
+    # the server activates the roles on its own, they are not snapshotted
+    db.engine.execute('UPDATE assigned_server_roles SET active = 1 WHERE id = 2')
+    assert cache.server_roles()['ems_inventory']
+    assert 'server_roles' not in cache.stats()
+
+    # the storage roles are there with storage enabled
+    rest_api.data['product']['storage'] = True
+    cache.invalidate('advanced_settings')
+    roles = cache.server_roles()
+    assert roles['storage_metrics'] is False
+    assert roles['vmdb_storage_bridge'] is False
+    assert 'database_owner' not in roles
+
+
+def test_check_db(cache, db, rest_api):
+    cache.advanced_settings()
+    cache.advanced_settings()
+    assert len(rest_api.gets) == 1
+
+    cache.check_db = True
+    cache.advanced_settings()
+    cache.advanced_settings()
+    assert len(rest_api.gets) == 2
+    db.engine.execute(
+        "INSERT INTO settings_changes VALUES "
+        "(2, '/session/timeout', '3600', '2018-05-02 10:00:00')")
+    cache.advanced_settings()
+    db.engine.execute("DELETE FROM settings_changes WHERE id = 2")
+    cache.advanced_settings()
+    assert len(rest_api.gets) == 4
+    assert cache.stats()['advanced_settings'] == {'hits': 2, 'misses': 4}
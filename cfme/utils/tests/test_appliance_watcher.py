@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import sys
+from threading import Lock, Thread, Timer
+
+import pytest
+
+from cfme.utils.appliance.watcher import ApplianceWatcher, Watch
+from cfme.utils.wait import TimedOutError
+
+
+class FakeEntity(object):
+    def __init__(self, collection, id, **data):
+        self.collection = collection
+        self.id = id
+        self.__dict__.update(data)
+
+
+class FakeCollection(object):
+    def __init__(self, name):
+        self.name = name
+        self.resources = {}
+        self.queries = []
+
+    def add(self, id, **data):
+        self.resources[str(id)] = FakeEntity(self, id, **data)
+        return self.resources[str(id)]
+
+    def query_string(self, **params):
+        filters = params['filter[]']
+        self.queries.append(filters)
+        ids = {f.split('=')[1] for f in filters}
+        return [resource for id_, resource in self.resources.items() if id_ in ids]
+
+
+class FakeAppliance(object):
+    def __init__(self):
+        self.rest_api = self
+        self.collections = self
+        self.requests = FakeCollection('requests')
+
+
+class ExitHookLock(object):
+    """Lock calling ``on_exit`` once the watcher thread leaves it seeing no watches"""
+    def __init__(self, watcher, on_exit):
+        self.lock = Lock()
+        self.watcher = watcher
+        self.on_exit = on_exit
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+        exiting = (sys._getframe(1).f_code.co_name == '_run' and
+                   not any(self.watcher._watches.values()))
+        if self.on_exit and exiting:
+            on_exit, self.on_exit = self.on_exit, None
+            on_exit()
+
+
+@pytest.fixture
+def fake_appliance():
+    return FakeAppliance()
+
+
+@pytest.fixture
+def watcher(fake_appliance):
+    return ApplianceWatcher(fake_appliance, tick=0.01)
+
+
+def test_wait_for_wakes_up_on_predicate(fake_appliance, watcher):
+    request = fake_appliance.requests.add(1, request_state='pending')
+    Timer(0.1, lambda: fake_appliance.requests.add(1, request_state='finished')).start()
+    result = watcher.wait_for(request, lambda r: r.request_state == 'finished', num_sec=5)
+    assert result.request_state == 'finished'
+
+
+def test_waits_share_queries(fake_appliance, watcher):
+    requests = [fake_appliance.requests.add(i, request_state='pending') for i in (1, 2)]
+    waits = [
+        Thread(target=watcher.wait_for,
+               args=(request, lambda r: r.request_state == 'finished'), kwargs={'num_sec': 5})
+        for request in requests]
+    for wait in waits:
+        wait.start()
+    Timer(0.1, lambda: [fake_appliance.requests.add(i, request_state='finished')
+                        for i in (1, 2)]).start()
+    for wait in waits:
+        wait.join()
+    assert ['id=1', 'or id=2'] in fake_appliance.requests.queries
+    assert all(len(query) <= 2 for query in fake_appliance.requests.queries)
+
+
+def test_wait_not_exists(fake_appliance, watcher):
+    request = fake_appliance.requests.add(1)
+    Timer(0.1, lambda: fake_appliance.requests.resources.clear()).start()
+    watcher.wait_not_exists(request, num_sec=5)
+
+
+def test_wait_for_timeout(fake_appliance, watcher):
+    request = fake_appliance.requests.add(1, request_state='pending')
+    with pytest.raises(TimedOutError):
+        watcher.wait_for(request, lambda r: r.request_state == 'finished', num_sec=0.1)
+    assert not watcher._watches['requests']
+
+
+def test_predicate_error_is_raised(fake_appliance, watcher):
+    request = fake_appliance.requests.add(1)
+    with pytest.raises(AttributeError):
+        watcher.wait_for(request, lambda r: r.request_state == 'finished', num_sec=5)
+
+
+def test_wait_all_not_exist(fake_appliance, watcher):
+    requests = [fake_appliance.requests.add(i) for i in (1, 2, 3)]
+    Timer(0.1, lambda: fake_appliance.requests.resources.clear()).start()
+    watcher.wait_all_not_exist(requests, num_sec=5)
+    assert all(len(query) == 3 for query in fake_appliance.requests.queries)
+
+
+def test_wait_all_not_exist_timeout(fake_appliance, watcher):
+    requests = [fake_appliance.requests.add(i) for i in (1, 2)]
+    Timer(0.1, lambda: fake_appliance.requests.resources.pop('1')).start()
+    with pytest.raises(TimedOutError):
+        watcher.wait_all_not_exist(requests, num_sec=0.3)
+    assert not watcher._watches['requests']
+
+
+def test_unexpected_error_keeps_watching(fake_appliance, watcher):
+    request = fake_appliance.requests.add(1, request_state='pending')
+    fake_appliance.requests.query_string = lambda **params: [object()]
+    with pytest.raises(TimedOutError):
+        watcher.wait_for(request, lambda r: r.request_state == 'finished', num_sec=0.1)
+    del fake_appliance.requests.query_string
+    Timer(0.1, lambda: fake_appliance.requests.add(1, request_state='finished')).start()
+    result = watcher.wait_for(request, lambda r: r.request_state == 'finished', num_sec=5)
+    assert result.request_state == 'finished'
+
+
+def test_wait_added_while_watcher_exits(fake_appliance, watcher):
+    first = fake_appliance.requests.add(1, request_state='finished')
+    fake_appliance.requests.add(2, request_state='finished')
+    second = Watch('requests', 2, lambda r: r.request_state == 'finished')
+    # added between the watcher finding no more watches and its thread ending
+    watcher._lock = ExitHookLock(watcher, lambda: watcher._add(second))
+    watcher.wait_for(first, lambda r: r.request_state == 'finished', num_sec=5)
+    assert second.done.wait(5)
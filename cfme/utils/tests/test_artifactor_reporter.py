@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import Counter
+from io import BytesIO
+
+import pytest
+from riggerlib.tools import recursive_update
+
+from artifactor.plugins import reporter
+from artifactor.plugins.reporter import Fragments, Reporter, ReportStore
+
+TESTS = [
+    ('cfme/tests/infra/test_a.py', 'test_one[rhevm]', 'passed'),
+    ('cfme/tests/infra/test_a.py', 'test_one[vsphere]', 'failed'),
+    ('cfme/tests/infra/test_a.py', 'test_two[rhevm]', 'failed'),
+    ('cfme/tests/cloud/test_b.py', 'test_three', 'skipped'),
+]
+
+PHASES = {
+    'passed': ['passed', 'passed', 'passed'],
+    'failed': ['passed', 'failed', 'passed'],
+    'skipped': ['skipped'],
+}
+
+
+class Run(object):
+    """Fires the events of the tests at a reporter, like artifactor does"""
+    def __init__(self, log_dir, **data):
+        data.setdefault('build_interval', 0)
+        self.log_dir = log_dir.strpath
+        self.reporter = Reporter('reporter', data, None)
+        self.reporter.configure()
+        self.artifacts = {}
+
+    def fire(self, hook, *args):
+        recursive_update(self.artifacts, hook(*args)[1]['artifacts'])
+
+    def phase(self, location, name, when, outcome):
+        self.fire(self.reporter.report_test, self.artifacts, self.log_dir, location, name,
+                  False, when, outcome, 0.5)
+        self.reporter.run_report(self.artifacts, self.log_dir)
+
+    def test(self, location, name, outcome):
+        self.fire(self.reporter.start_test, location, name, 'slave01')
+        if outcome == 'skipped':
+            self.fire(self.reporter.skip_test, location, name,
+                      {'type': 'blocker', 'reason': [1000]})
+        elif outcome == 'failed':
+            self.fire(self.reporter.tb_info, location, name, 'AssertionError: x',
+                      '{}:1'.format(location), 'E assert 1 == 0')
+        for when, phase_outcome in zip(('setup', 'call', 'teardown'), PHASES[outcome]):
+            self.phase(location, name, when, phase_outcome)
+        self.fire(self.reporter.finish_test, self.artifacts, location, name, 'slave01')
+        self.reporter.run_report(self.artifacts, self.log_dir)
+
+    def finish(self):
+        self.reporter.finish_session(self.artifacts, self.log_dir)
+
+    def page(self, filename='report'):
+        with open('{}/{}.html'.format(self.log_dir, filename)) as f:
+            return f.read()
+
+
+def lines(page):
+    return Counter(line.strip() for line in page.splitlines() if line.strip())
+
+
+@pytest.fixture(autouse=True)
+def providers(monkeypatch):
+    monkeypatch.setattr(reporter, 'cfme_data', {'management_systems': {'rhevm': {}, 'vsphere': {}}})
+
+
+def full_run(tmpdir, tests, **data):
+    run = Run(tmpdir.mkdir('full'), incremental=False, **data)
+    for test in tests:
+        run.test(*test)
+    run.finish()
+    return run
+
+
+def test_fragments_copy_skips_discarded(tmpdir):
+    fragments = Fragments(tmpdir.join('fragments.html').strpath)
+    fragments.append(u'<li>one</li>')
+    span = fragments.append(u'<li>two – replaced</li>')
+    fragments.append(u'<li>three</li>')
+    fragments.discard(span)
+    fragments.append(u'<li>two</li>')
+    out = BytesIO()
+    fragments.copy_to(out)
+    assert out.getvalue() == b'<li>one</li><li>three</li><li>two</li>'
+
+
+@pytest.mark.parametrize('only_failed', [False, True])
+def test_same_as_full_report(tmpdir, only_failed):
+    run = Run(tmpdir.mkdir('incremental'), only_failed=only_failed)
+    for test in TESTS:
+        run.test(*test)
+    run.finish()
+    full = full_run(tmpdir, TESTS, only_failed=only_failed)
+    for filename in ('report', 'report_rhevm', 'report_vsphere'):
+        assert lines(run.page(filename)) == lines(full.page(filename))
+
+
+def test_replaced_across_phases(tmpdir):
+    run = Run(tmpdir.mkdir('incremental'))
+    location, name, _ = TESTS[1]
+    run.fire(run.reporter.start_test, location, name, 'slave01')
+    run.fire(run.reporter.tb_info, location, name, 'AssertionError: x',
+             '{}:1'.format(location), 'E assert 1 == 0')
+    for when, outcome in zip(('setup', 'call', 'teardown'), PHASES['failed']):
+        run.phase(location, name, when, outcome)
+        # rendered again for every phase, the previous versions are left out of the page
+        page = run.page()
+        assert page.count('<a id="{}/{}"'.format(location, name)) == 1
+        assert len(re.findall(r'<li[^>]*>.*test_one\[vsphere\]', page)) == 1
+    store = run.reporter.incremental_report.store
+    assert len(store.panels.discarded) == 2
+    run.fire(run.reporter.finish_test, run.artifacts, location, name, 'slave01')
+    run.finish()
+    full = full_run(tmpdir, [TESTS[1]])
+    assert lines(run.page()) == lines(full.page())
+
+
+def test_provider_store_filtering(tmpdir):
+    run = Run(tmpdir.mkdir('incremental'))
+    for test in TESTS:
+        run.test(*test)
+    run.finish()
+    stores = run.reporter.incremental_report.provider_stores
+    assert sorted(stores['rhevm'].tests) == [
+        'cfme/tests/infra/test_a.py/test_one[rhevm]', 'cfme/tests/infra/test_a.py/test_two[rhevm]']
+    assert sorted(stores['vsphere'].tests) == ['cfme/tests/infra/test_a.py/test_one[vsphere]']
+    page = run.page('report_rhevm')
+    assert 'test_one[rhevm]' in page
+    assert 'test_one[vsphere]' not in page
+    assert 'test_three' not in page
+
+
+def test_only_failed(tmpdir):
+    run = Run(tmpdir.mkdir('incremental'), only_failed=True)
+    for test in TESTS:
+        run.test(*test)
+    run.finish()
+    page = run.page()
+    assert '<a id="cfme/tests/infra/test_a.py/test_one[rhevm]"' not in page
+    assert '<a id="cfme/tests/infra/test_a.py/test_one[vsphere]"' in page
+    # the passed test is still in the tree
+    assert re.search(r'<li[^>]*>.*test_one\[rhevm\]', page)
+
+
+def test_counts_after_readd(tmpdir):
+    run = Run(tmpdir.mkdir('incremental'))
+    for test in TESTS:
+        run.test(*test)
+    # the same test run again, now it passes
+    location, name, _ = TESTS[1]
+    run.artifacts.pop('{}/{}'.format(location, name))
+    run.test(location, name, 'passed')
+    run.finish()
+    report = run.reporter.incremental_report
+    assert report.counts == dict(
+        passed=2, failed=1, skipped=1, error=0, xfailed=0, xpassed=0)
+    assert report.current_counts == report.counts
+    assert report.blocker_skip_count == 1
+    assert len(report.tb_errors) == 1
+    module = report.store.root['_sub']['tests']['_sub']['infra']['_sub']['test_a.py']
+    assert module['_stats']['passed'] == 2
+    assert module['_stats']['failed'] == 1
+    assert module['_duration'] == pytest.approx(sum(
+        duration for test_name, (_, _, duration, _) in report.store.tests.items()
+        if 'test_a.py' in test_name))
+    full = full_run(tmpdir, TESTS[:1] + TESTS[2:] + [(location, name, 'passed')])
+    assert lines(run.page()) == lines(full.page())
+
+
+def test_store_add_twice(tmpdir):
+    store = ReportStore(tmpdir.strpath)
+    test_data = {'name': 'cfme/tests/test_a.py/test_one', 'duration': 1.5,
+                 'outcomes': {'overall': 'failed'}}
+    store.add(test_data, u'<li>failed</li>', panel=u'<div>failed</div>')
+    store.add(dict(test_data, outcomes={'overall': 'passed'}), u'<li>passed</li>',
+              panel=u'<div>passed</div>')
+    node = store.root['_sub']['tests']['_sub']['test_a.py']
+    assert node['_stats']['passed'] == 1
+    assert node['_stats']['failed'] == 0
+    assert node['_duration'] == 1.5
+    out = BytesIO()
+    store.panels.copy_to(out)
+    assert out.getvalue() == b'<div>passed</div>'
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+from collections import Counter
+
+import pytest
+import requests
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from cfme.utils.browser_pool import BrowserPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Wharf and appliance in one, counts the checkouts and the logins"""
+    def do_GET(self):
+        counts = self.server.counts
+        cookie = self.headers.get('Cookie') or ''
+        body = ''
+        if self.path == '/checkout':
+            counts['checkout'] += 1
+            body = json.dumps({'container{}'.format(counts['checkout']): {}})
+        elif self.path.startswith('/checkin/'):
+            counts['checkin'] += 1
+        elif self.path == '/login':
+            counts['login'] += 1
+        elif self.path == '/':
+            counts['home'] += 1
+            if 'session={}'.format(self.server.session) in cookie:
+                body = 'logged in'
+        self.send_response(200)
+        if self.path == '/login':
+            self.send_header('Set-Cookie', 'session={}; Path=/'.format(self.server.session))
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = HTTPServer(('127.0.0.1', 0), StubHandler)
+    server.counts = Counter()
+    server.session = 'abc'
+    server.url = 'http://127.0.0.1:{}/'.format(server.server_port)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+class FakeWebdriver(object):
+    """Keeps cookies and the last page like a browser, talks to the stub"""
+    def __init__(self):
+        self.session = requests.Session()
+        self.page_source = None
+
+    def get(self, url):
+        self.page_source = self.session.get(url).text
+
+    def get_cookies(self):
+        return [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+                for c in self.session.cookies]
+
+    def add_cookie(self, cookie):
+        self.session.cookies.set(
+            cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+
+    def delete_all_cookies(self):
+        self.session.cookies.clear()
+
+    def quit(self):
+        self.session.close()
+
+
+class FakeFactory(object):
+    def __init__(self, stub_url, ready=None):
+        self.stub_url = stub_url
+        self.container = None
+        # browsers are created once it is set
+        if ready is None:
+            ready = threading.Event()
+            ready.set()
+        self.ready = ready
+
+    def spawn(self):
+        return FakeFactory(self.stub_url, self.ready)
+
+    def create(self, url_key):
+        self.ready.wait()
+        self.container = requests.get(self.stub_url + 'checkout').json().popitem()[0]
+        browser = FakeWebdriver()
+        browser.get(url_key)
+        browser.url_key = url_key
+        return browser
+
+    def close(self, browser):
+        browser.quit()
+        requests.get(self.stub_url + 'checkin/' + self.container)
+
+
+def log_in(browser):
+    browser.get(browser.url_key + 'login')
+    browser.get(browser.url_key)
+
+
+def logged_in(browser):
+    return browser.page_source == 'logged in'
+
+
+def wait_for_spares(pool, url_key, number):
+    for _ in range(100):
+        if len(pool._spares[url_key]) >= number:
+            return
+        time.sleep(0.05)
+    raise AssertionError('spares were not started')
+
+
+@pytest.fixture
+def pool(stub):
+    pool = BrowserPool(FakeFactory(stub.url), size=2)
+    yield pool
+    pool.close()
+
+
+def test_spares_are_logged_in(stub, pool):
+    pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+    wait_for_spares(pool, stub.url, 2)
+    assert stub.counts['checkout'] == 2
+    factory, browser = pool.take(stub.url)
+    assert logged_in(browser)
+    factory.close(browser)
+    assert stub.counts['checkin'] == 1
+
+
+def test_own_session_per_spare(stub, pool):
+    pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+    wait_for_spares(pool, stub.url, 2)
+    for _ in range(3):
+        pool.take(stub.url)
+        wait_for_spares(pool, stub.url, 2)
+    assert stub.counts['checkout'] == 5
+    assert stub.counts['login'] == 5
+
+
+def test_logged_out_spares_dropped(stub):
+    factory = FakeFactory(stub.url)
+    pool = BrowserPool(factory, size=2, recheck_interval=0)
+    try:
+        pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+        wait_for_spares(pool, stub.url, 2)
+        # the session of the spares is gone, e.g. the appliance was restarted
+        stub.session = 'def'
+        # the replacements are held back until both spares were checked
+        factory.ready.clear()
+        assert pool.take(stub.url) is None
+        assert stub.counts['checkin'] == 2
+        factory.ready.set()
+        wait_for_spares(pool, stub.url, 2)
+        _, browser = pool.take(stub.url)
+        assert logged_in(browser)
+    finally:
+        pool.close()
+
+
+def test_fresh_spare_not_checked(stub, pool):
+    pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+    wait_for_spares(pool, stub.url, 2)
+    loads = stub.counts['home']
+    stub.session = 'def'
+    # logged in less than recheck_interval ago, taken without loading a page
+    _, browser = pool.take(stub.url)
+    assert stub.counts['home'] == loads
+    assert browser.page_source == 'logged in'
+
+
+def test_cookies_replayed(stub):
+    pool = BrowserPool(FakeFactory(stub.url), size=2, replay_cookies=True)
+    try:
+        pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+        wait_for_spares(pool, stub.url, 2)
+        logins = stub.counts['login']
+        for _ in range(3):
+            pool.take(stub.url)
+            wait_for_spares(pool, stub.url, 2)
+        assert stub.counts['checkout'] == 5
+        assert stub.counts['login'] == logins
+
+        # an expired session is logged in by the form again
+        stub.session = 'def'
+        pool.take(stub.url)
+        wait_for_spares(pool, stub.url, 2)
+        assert stub.counts['login'] > logins
+        assert all(logged_in(browser) for _, browser, _ in pool._spares[stub.url])
+    finally:
+        pool.close()
+
+
+def test_take_unprepared(stub, pool):
+    assert pool.take(stub.url) is None
+    assert stub.counts['checkout'] == 0
+
+
+def test_close_checks_in(stub, pool):
+    pool.prepare(stub.url, log_in=log_in, logged_in=logged_in)
+    wait_for_spares(pool, stub.url, 2)
+    pool.close()
+    assert stub.counts['checkin'] == 2
+    assert pool.take(stub.url) is None
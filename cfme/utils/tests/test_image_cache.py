@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import pytest
+import requests
+
+from cfme.utils.template import image_cache
+from cfme.utils.template.image_cache import ImageCache, ImageCacheException
+
+IMAGE_URL = 'http://builds.example.com/5.9/cfme-rhevm-5.9.qcow2'
+
+
+def unreachable(*args, **kwargs):
+    raise requests.ConnectionError('connection refused')
+
+
+@pytest.fixture
+def cache(tmpdir, monkeypatch):
+    monkeypatch.setattr(image_cache.requests, 'head', unreachable)
+    monkeypatch.setattr(image_cache.requests, 'get', unreachable)
+    return ImageCache(tmpdir.strpath)
+
+
+def test_unverified_image_server_unreachable(cache, tmpdir):
+    tmpdir.mkdir('unverified').join('cfme-rhevm-5.9.qcow2').write('image')
+    with pytest.raises(ImageCacheException):
+        cache.get(IMAGE_URL)
+
+
+def test_verified_image_served_offline(cache, tmpdir):
+    image = tmpdir.mkdir('abc').join('cfme-rhevm-5.9.qcow2')
+    image.write('image')
+    tmpdir.join('abc', 'cfme-rhevm-5.9.qcow2.verified').write('')
+    assert cache.get(IMAGE_URL, checksum='abc') == image.strpath
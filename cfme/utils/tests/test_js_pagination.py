@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Tests of the bulk pagination of JSPaginationPane against a page mimicking the paginator of
+ManageIQ, its scripts run by node instead of a browser"""
+import json
+import subprocess
+from distutils.spawn import find_executable
+
+import pytest
+from lxml.html import document_fromstring
+from wait_for import wait_for
+from widgetastic.browser import Browser, DefaultPlugin
+
+from cfme.utils.path import data_path
+from widgetastic_manageiq import JSPaginationPane
+
+pytestmark = pytest.mark.skipif(not find_executable('node'), reason='node is not installed')
+
+# Loads the scripts of the page, then runs the scripts sent line by line as the body of a
+# function, like selenium does, and answers with their JSON result
+NODE_DRIVER = '''
+const readline = require('readline');
+const vm = require('vm');
+readline.createInterface({input: process.stdin}).on('line', (line) => {
+  const message = JSON.parse(line);
+  let reply;
+  try {
+    if (message.page) {
+      global.window = global;
+      global.document = {
+        getElementById: (id) => message.page.ids.includes(id) ? {id: id} : null,
+        getElementsByTagName: (tag) => message.page.tags.filter((t) => t === tag)
+      };
+      message.page.scripts.forEach((script) => vm.runInThisContext(script));
+      reply = {};
+    } else {
+      reply = {value: new Function(message.script).apply(null, message.args)};
+    }
+  } catch (e) {
+    reply = {error: String(e)};
+  }
+  process.stdout.write(JSON.stringify(reply) + '\\n');
+});
+'''
+
+
+class NodeSelenium(object):
+    """Runs the scripts of selenium in node against the scripts of a static page"""
+    def __init__(self, html, without_tags=()):
+        self.scripts = []
+        self.node = subprocess.Popen(['node', '-e', NODE_DRIVER], stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, universal_newlines=True)
+        document = document_fromstring(html)
+        self._send({'page': {
+            'scripts': [script.text for script in document.iter('script')],
+            'ids': [el.get('id') for el in document.iter() if el.get('id')],
+            'tags': [el.tag for el in document.iter()
+                     if isinstance(el.tag, str) and el.tag not in without_tags]}})
+
+    def _send(self, message):
+        self.node.stdin.write(json.dumps(message) + '\n')
+        self.node.stdin.flush()
+        reply = json.loads(self.node.stdout.readline())
+        if 'error' in reply:
+            raise Exception(reply['error'])
+        return reply.get('value')
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return self._send({'script': script, 'args': args})
+
+    def quit(self):
+        self.node.stdin.close()
+        self.node.wait()
+
+
+class FakePlugin(DefaultPlugin):
+    ENSURE_PAGE_SAFE = 'return ManageIQ.qe.pending === 0'
+
+    def ensure_page_safe(self, timeout='10s'):
+        wait_for(self.browser.execute_script, [self.ENSURE_PAGE_SAFE], timeout=timeout,
+                 delay=0.01, very_quiet=True)
+
+
+def calls(paginator, action):
+    return paginator.browser.execute_script(
+        'return ManageIQ.qe.calls[arguments[0]] || 0', action)
+
+
+def names(pages):
+    return [item['item']['cells']['Name'] for items in pages for item in items]
+
+
+@pytest.fixture
+def make_paginator():
+    html = data_path.join('utils', 'test_js_pagination', 'paginator.html').read()
+    seleniums = []
+
+    def _make(**kwargs):
+        selenium = NodeSelenium(html, **kwargs)
+        seleniums.append(selenium)
+        return JSPaginationPane(Browser(selenium, plugin_class=FakePlugin))
+    yield _make
+    for selenium in seleniums:
+        selenium.quit()
+
+
+@pytest.fixture
+def paginator(make_paginator):
+    return make_paginator()
+
+
+def test_bulk_pages(paginator):
+    pages = list(paginator.bulk_pages(items_per_page=20))
+    assert [len(items) for items in pages] == [20] * 6 + [17]
+    assert names(pages) == ['vm-{:03d}'.format(i) for i in range(1, 138)]
+    # one call per page
+    assert paginator.browser.selenium.scripts.count(paginator.READ_PAGE_SCRIPT) == 7
+    assert calls(paginator, 'get_all_items') == 7
+    assert calls(paginator, 'next_page') == 6
+
+
+def test_bulk_pages_fewer_calls(paginator):
+    scripts = paginator.browser.selenium.scripts
+    paginator.set_items_per_page(20)
+    del scripts[:]
+    items = []
+    for _ in paginator.pages():
+        items.extend(paginator._invoke_cmd('get_all_items'))
+    paged_calls = len(scripts)
+    del scripts[:]
+    assert names(paginator.bulk_pages(items_per_page=20)) == names([items])
+    assert len(scripts) < paged_calls / 2
+
+
+def test_most_items_per_page(paginator):
+    pages = list(paginator.bulk_pages())
+    assert len(pages) == 1
+    assert len(pages[0]) == 137
+    # set back to the items per page of the view
+    assert paginator.items_per_page == 20
+
+
+def test_items_per_page_restored_on_close(paginator):
+    pages = paginator.bulk_pages(items_per_page=50)
+    assert len(next(pages)) == 50
+    pages.close()
+    assert paginator.items_per_page == 20
+
+
+def test_starts_at_first_page(paginator):
+    paginator.set_items_per_page(20)
+    paginator.go_to_page(3)
+    assert paginator.cur_page == 3
+    assert names(paginator.bulk_pages(items_per_page=20))[0] == 'vm-001'
+
+
+def test_stop(paginator):
+    def stop(item):
+        return item['item']['cells']['Name'] == 'vm-075'
+    pages = list(paginator.bulk_pages(items_per_page=20, stop=stop))
+    assert len(pages) == 4
+    # left on the page of the item
+    assert paginator.cur_page == 4
+    assert calls(paginator, 'go_to_page') == 1
+
+
+def test_stop_restores_items_per_page(paginator):
+    def stop(item):
+        return item['item']['cells']['Name'] == 'vm-075'
+    pages = list(paginator.bulk_pages(stop=stop))
+    assert len(pages) == 1
+    assert paginator.items_per_page == 20
+    # left on the page of the item with the items per page of the view
+    assert paginator.cur_page == 4
+
+
+def test_stop_on_last_page(paginator):
+    pages = list(paginator.bulk_pages(
+        items_per_page=20, stop=lambda item: item['item']['id'] == '137'))
+    assert len(pages) == 7
+    assert paginator.cur_page == 7
+    assert calls(paginator, 'go_to_page') == 0
+
+
+def test_no_paginator(make_paginator):
+    paginator = make_paginator(without_tags=('miq-pagination',))
+    assert list(paginator.bulk_pages()) == []
+    assert calls(paginator, 'get_all_items') == 0
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from functools import partial
+
+import pytest
+from wrapanapi.base import WrapanapiAPIBase
+
+from cfme.utils import providers
+from cfme.utils.mgmt_pool import MgmtPool
+
+
+class Unauthorized(Exception):
+    pass
+
+
+class FakeSystem(WrapanapiAPIBase):
+    """In-memory provider system, counts its connects"""
+    connects = []
+    connecting = []
+    most_connecting = [0]
+
+    def __init__(self, connect_time=0, **kwargs):
+        super(FakeSystem, self).__init__(kwargs)
+        self.connecting.append(self)
+        self.most_connecting[0] = max(self.most_connecting[0], len(self.connecting))
+        time.sleep(connect_time)
+        self.connecting.remove(self)
+        self.connects.append(self)
+        self.kwargs = kwargs
+        self.connected = True
+        self.session_valid = True
+        self.healthy = True
+
+    def info(self):
+        if not self.healthy:
+            raise IOError('connection reset')
+        return 'fake 1.0'
+
+    def list_vm(self):
+        if not self.session_valid:
+            raise Unauthorized('session expired')
+        return ['vm1', 'vm2']
+
+    def start_vm(self, vm_name):
+        raise ValueError('no vm {}'.format(vm_name))
+
+    def disconnect(self):
+        self.connected = False
+
+
+@pytest.fixture
+def fake():
+    del FakeSystem.connects[:]
+    del FakeSystem.connecting[:]
+    FakeSystem.most_connecting[0] = 0
+    return FakeSystem
+
+
+def get(pool, name='vsphere', **kwargs):
+    kwargs.setdefault('username', 'admin')
+    return pool.get(name, kwargs, partial(FakeSystem, **kwargs))
+
+
+def test_one_client_per_provider(fake):
+    pool = MgmtPool()
+    mgmts = []
+
+    def use():
+        mgmt = get(pool)
+        mgmt.list_vm()
+        mgmts.append(mgmt)
+
+    threads = [threading.Thread(target=use) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fake.connects) == 1
+    assert len(set(mgmt.client for mgmt in mgmts)) == 1
+    get(pool, 'rhevm').list_vm()
+    assert len(fake.connects) == 2
+
+
+def test_credentials_changed(fake):
+    pool = MgmtPool()
+    mgmt = get(pool)
+    old = mgmt.client
+    other = get(pool, username='other')
+    assert other.client is not old
+    # e.g. a template upload with other credentials, the default client stays usable
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    assert mgmt.client is old
+    assert old.connected
+    assert get(pool).client is old
+    assert len(fake.connects) == 2
+
+
+def test_ttl(fake):
+    pool = MgmtPool(ttl=0.05)
+    mgmt = get(pool)
+    first = mgmt.client
+    assert mgmt.client is first
+    time.sleep(0.1)
+    assert mgmt.client is not first
+    assert not first.connected
+
+
+def test_health_check(fake):
+    pool = MgmtPool(check_interval=0)
+    mgmt = get(pool)
+    first = mgmt.client
+    assert mgmt.client is first
+    first.healthy = False
+    assert mgmt.client is not first
+    assert len(fake.connects) == 2
+
+
+def test_reconnect_on_auth_error(fake):
+    pool = MgmtPool(is_auth_error=lambda e: isinstance(e, Unauthorized))
+    mgmt = get(pool)
+    mgmt.client.session_valid = False
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    assert len(fake.connects) == 2
+
+    # other errors are not retried
+    with pytest.raises(ValueError):
+        mgmt.start_vm('vm3')
+    assert len(fake.connects) == 2
+
+
+def test_default_auth_error_by_name(fake):
+    pool = MgmtPool()
+    mgmt = get(pool)
+    mgmt.client.session_valid = False
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    assert len(fake.connects) == 2
+
+
+def test_disconnect(fake):
+    pool = MgmtPool()
+    mgmt = get(pool)
+    first = mgmt.client
+    mgmt.disconnect()
+    assert not first.connected
+    mgmt.list_vm()
+    assert len(fake.connects) == 2
+
+
+def test_connects_limited_across_pools(fake, tmpdir):
+    # every pool stands for the pool of one slave
+    pools = [MgmtPool(max_connects=2, lock_dir=tmpdir.strpath) for _ in range(6)]
+    threads = [threading.Thread(target=lambda pool=pool: get(pool, connect_time=0.1).list_vm())
+               for pool in pools]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fake.connects) == 6
+    assert fake.most_connecting[0] == 2
+
+
+def test_isinstance(fake):
+    mgmt = get(MgmtPool())
+    assert isinstance(mgmt, FakeSystem)
+    assert isinstance(mgmt, WrapanapiAPIBase)
+    assert not isinstance(mgmt, Unauthorized)
+
+
+def test_attributes_kept_on_reconnect(fake):
+    pool = MgmtPool()
+    mgmt = get(pool)
+    mgmt.api_version = 4
+    assert mgmt.client.api_version == 4
+    mgmt.disconnect()
+    assert mgmt.api_version == 4
+    assert len(fake.connects) == 2
+
+
+def test_proxy_reconnects_after_clear(fake):
+    pool = MgmtPool()
+    mgmt = get(pool)
+    mgmt.api_version = 4
+    first = mgmt.client
+    pool.clear()
+    assert not first.connected
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    assert mgmt.client is not first
+    mgmt.api_version = 5
+    assert mgmt.client.api_version == 5
+    assert len(fake.connects) == 2
+
+
+def test_get_mgmt_of_provider_data(fake, monkeypatch):
+    monkeypatch.setattr(providers, 'mgmt_pool', MgmtPool())
+    provider_class = type('FakeProvider', (object,), {'mgmt_class': FakeSystem})
+    monkeypatch.setattr(providers, 'get_class_from_type', lambda prov_type: provider_class)
+    # data of providers not in the yamls, e.g. passed by sprout, has no name
+    first = {'type': 'virtualcenter', 'hostname': 'vc1.example.com'}
+    second = {'type': 'virtualcenter', 'hostname': 'vc2.example.com'}
+    credentials = {'username': 'admin', 'password': 'secret'}
+    mgmt = providers.get_mgmt(first, credentials=credentials)
+    assert mgmt._key[0] == 'vc1.example.com'
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    other = providers.get_mgmt(second, credentials=credentials)
+    assert other.list_vm() == ['vm1', 'vm2']
+    assert mgmt.list_vm() == ['vm1', 'vm2']
+    assert mgmt.client.kwargs['hostname'] == 'vc1.example.com'
+    assert len(fake.connects) == 2
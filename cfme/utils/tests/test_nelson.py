@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from datetime import date
+
+import pytest
+import yaml
+
+from cfme.fixtures import nelson
+from cfme.fixtures.pytest_store import store
+
+test_module = '''
+def test_a():
+    """Test a
+
+    Metadata:
+        test_flag: provision
+        tier: 1
+    """
+
+
+def test_b():
+    """Test b"""
+'''
+
+
+class JsonCache(object):
+    """Stores the values as JSON like the pytest cache"""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default):
+        return json.loads(self.data[key]) if key in self.data else default
+
+    def set(self, key, value):
+        self.data[key] = json.dumps(value)
+
+
+class FakeConfig(object):
+    def __init__(self, cache, doc_data=False):
+        self.cache = cache
+        self.doc_data = doc_data
+
+    def getoption(self, name):
+        return getattr(self, name)
+
+
+class NoCacheConfig(object):
+    """Config of a run with ``-p no:cacheprovider``"""
+
+
+class FakeCollector(object):
+    def __init__(self, fspath, config):
+        self.fspath = fspath
+        self.config = config
+        self.nodeid = fspath.basename
+
+
+class FakeSession(object):
+    def __init__(self, config):
+        self.config = config
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(nelson, '_module_cache', {})
+    monkeypatch.setattr(nelson, '_dirty_modules', set())
+    monkeypatch.setattr(nelson, '_cache_stats', {'hits': 0, 'misses': 0})
+    monkeypatch.setattr(store, 'parallelizer_role', None)
+    return JsonCache()
+
+
+@pytest.fixture
+def module(tmpdir):
+    module = tmpdir.join('test_module.py')
+    module.write(test_module)
+    namespace = {}
+    exec(test_module, namespace)
+    return module, namespace
+
+
+def collect(module, cache):
+    """Collects the docstring metadata of the module in a new session"""
+    path, namespace = module
+    nelson._module_cache.clear()
+    config = FakeConfig(cache)
+    collector = FakeCollector(path, config)
+    metadata = {name: nelson.get_cached_meta(collector, name, namespace[name])
+                for name in ('test_a', 'test_b')}
+    nelson.pytest_collection_finish(FakeSession(config))
+    return metadata
+
+
+def test_parsed_once(module, cache):
+    first = collect(module, cache)
+    assert first['test_a'] == {'test_flag': 'provision', 'tier': 1}
+    assert first['test_b'] == {}
+    assert nelson._cache_stats == {'hits': 0, 'misses': 2}
+    assert collect(module, cache) == first
+    assert nelson._cache_stats == {'hits': 2, 'misses': 2}
+
+
+@pytest.mark.parametrize('change', ['mtime', 'size'])
+def test_changed_module_parsed_again(module, cache, change):
+    path, _ = module
+    collect(module, cache)
+    if change == 'mtime':
+        os.utime(path.strpath, (path.mtime() + 10, path.mtime() + 10))
+    else:
+        path.write(test_module + '\n')
+    collect(module, cache)
+    assert nelson._cache_stats == {'hits': 0, 'misses': 4}
+
+
+@pytest.mark.parametrize('metadata, cached', [
+    ({'tier': 1, 'test_flag': 'provision'}, True),
+    ({'caseimportance': 'high', 'assignee': None, 'requirements': ['a', 'b']}, True),
+    ({'created': date(2018, 5, 1)}, False),
+    ({1: 'key is not a string'}, False),
+])
+def test_json_round_trip(cache, monkeypatch, module, metadata, cached):
+    monkeypatch.setattr(nelson, 'get_meta', lambda obj: metadata)
+    collect(module, cache)
+    assert collect(module, cache)['test_a'] == metadata
+    assert nelson._cache_stats['hits'] == (2 if cached else 0)
+
+
+def test_unchanged_metadata_not_written(module, cache, monkeypatch):
+    collect(module, cache)
+    written = []
+    monkeypatch.setattr(cache, 'set', lambda key, value: written.append(key))
+    collect(module, cache)
+    assert not written
+
+
+def test_without_cache_plugin(module, cache):
+    path, namespace = module
+    for _ in range(2):
+        nelson._module_cache.clear()
+        collector = FakeCollector(path, NoCacheConfig())
+        assert nelson.get_cached_meta(collector, 'test_a', namespace['test_a']) == {
+            'test_flag': 'provision', 'tier': 1}
+        nelson.pytest_collection_finish(FakeSession(NoCacheConfig()))
+        assert not nelson._dirty_modules
+    assert nelson._cache_stats == {'hits': 0, 'misses': 2}
+
+
+class FakeFunction(object):
+    __doc__ = 'Test a'
+
+
+class FakeItem(object):
+    location = ('cfme/tests/test_module.py', 1, 'test_a[ec2]')
+    function = FakeFunction()
+    _metadata = {'from_docs': {'tier': 1}}
+
+
+@pytest.mark.parametrize('doc_data', [True, False])
+def test_doc_data(tmpdir, monkeypatch, doc_data):
+    monkeypatch.chdir(tmpdir)
+    nelson.pytest_collection_modifyitems(FakeConfig(None, doc_data), [FakeItem()])
+    if not doc_data:
+        assert not tmpdir.join('doc_data.yaml').check()
+        return
+    output = yaml.load(tmpdir.join('doc_data.yaml').read())
+    assert output == {'cfme.tests.test_module.test_a': {
+        'docstring': 'VGVzdCBh', 'name': 'test_a', 'metadata': {'from_docs': {'tier': 1}}}}
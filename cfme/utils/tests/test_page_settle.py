@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""Tests of the page settle wait of MiqBrowserPlugin, its script run by node instead of a
+browser"""
+import json
+import logging
+import subprocess
+from distutils.spawn import find_executable
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from cfme.utils.appliance.implementations import ui
+from cfme.utils.appliance.implementations.ui import MiqBrowserPlugin
+
+# Runs the script like selenium runs an async script, against a page whose ManageIQ.qe says
+# whether it is safe and whose DOM tree changes every ``mutate_every`` ms
+NODE_DRIVER = '''
+const config = JSON.parse(process.argv[1]);
+const observers = [];
+global.window = global;
+global.MutationObserver = function(callback) {
+  this.observe = () => observers.push(callback);
+};
+global.document = {readyState: 'complete', getElementById: (id) => null};
+global.ManageIQ = {qe: {anythingInFlight: () => !config.safe}, gtl: {loading: false}};
+if (config.mutate_every) {
+  setInterval(() => observers.forEach((callback) => callback([])), config.mutate_every).unref();
+}
+const start = Date.now();
+new Function(config.script).apply(null, config.args.concat([(result) => {
+  process.stdout.write(JSON.stringify({result: result, elapsed: Date.now() - start}));
+  process.exit(0);
+}]));
+'''
+
+node = pytest.mark.skipif(not find_executable('node'), reason='node is not installed')
+
+
+def settle(safe, mutate_every=None, timeout=1500, quiet_period=100, quiet_window=500):
+    output = subprocess.check_output(['node', '-e', NODE_DRIVER, json.dumps({
+        'script': MiqBrowserPlugin.SETTLE_PAGE, 'safe': safe, 'mutate_every': mutate_every,
+        'args': [timeout, quiet_period, quiet_window]})], universal_newlines=True)
+    output = json.loads(output)
+    return output['result'], output['elapsed']
+
+
+@node
+def test_quiet_page_settles():
+    result, elapsed = settle(safe=True)
+    assert result == [True, True]
+    assert elapsed < 500
+
+
+@node
+def test_changing_page_settles_after_quiet_window():
+    result, elapsed = settle(safe=True, mutate_every=20)
+    assert result == [True, True]
+    assert 500 <= elapsed < 1500
+
+
+@node
+def test_unsafe_page_times_out():
+    result, elapsed = settle(safe=False)
+    assert result == [False, True]
+    assert elapsed >= 1500
+
+
+class FakeSelenium(object):
+    """Answers the settle script by ``results``, an exception in them is raised"""
+    def __init__(self, *results):
+        self.results = list(results)
+        self.script_timeouts = []
+        self.calls = []
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(args)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class FakeBrowser(object):
+    browser_type = 'chrome'
+    logger = logging.getLogger('test_page_settle')
+    page_dirty = None
+
+    def __init__(self, selenium, page_safe=True):
+        self.selenium = selenium
+        self.page_safe = page_safe
+        self.safe_checks = 0
+
+    def execute_script(self, script, silent=False):
+        self.safe_checks += 1
+        return self.page_safe
+
+    def get_attribute(self, name, element):
+        return element.get(name)
+
+
+@pytest.fixture
+def stats():
+    MiqBrowserPlugin.reset_settle_stats()
+    yield MiqBrowserPlugin.settle_stats
+    MiqBrowserPlugin.reset_settle_stats()
+
+
+def test_settled(stats):
+    selenium = FakeSelenium([True, True], [True, False])
+    plugin = MiqBrowserPlugin(FakeBrowser(selenium))
+    assert plugin.wait_for_idle('20s')
+    # settled, but the page does not track its requests
+    assert not plugin.wait_for_idle('20s')
+    assert selenium.calls == [(20000, 150, 1000)] * 2
+    assert stats['count'] == 2
+    assert stats['fallbacks'] == stats['timeouts'] == 0
+
+
+def test_script_timeout_set_once(stats):
+    selenium = FakeSelenium([True, True], [True, True], [True, True])
+    plugin = MiqBrowserPlugin(FakeBrowser(selenium))
+    plugin.wait_for_idle('20s')
+    plugin.wait_for_idle('20s')
+    plugin.wait_for_idle('1m')
+    assert selenium.script_timeouts == [25, 65]
+
+
+def test_timeout_counted(stats):
+    plugin = MiqBrowserPlugin(FakeBrowser(FakeSelenium([False, True])))
+    assert not plugin.wait_for_idle('20s')
+    assert stats['timeouts'] == 1
+    assert stats['fallbacks'] == 0
+
+
+def test_fallback_to_polling(stats):
+    browser = FakeBrowser(FakeSelenium(WebDriverException('page reloaded')))
+    plugin = MiqBrowserPlugin(browser)
+    assert not plugin.wait_for_idle('20s')
+    assert browser.safe_checks == 1
+    assert stats['fallbacks'] == 1
+    assert stats['timeouts'] == 0
+    assert stats['count'] == 1
+
+
+def test_pause_before_input_unless_idle(stats, monkeypatch):
+    pauses = []
+    monkeypatch.setattr(ui, 'sleep', pauses.append)
+    selenium = FakeSelenium([True, True])
+    plugin = MiqBrowserPlugin(FakeBrowser(selenium))
+    plugin.before_keyboard_input(None, 'text')
+    assert pauses == [0.3]
+    plugin.ensure_page_safe()
+    plugin.before_keyboard_input(None, 'text')
+    assert pauses == [0.3]
+    # the input changed the page
+    plugin.before_keyboard_input(None, 'text')
+    assert pauses == [0.3, 0.3]
+    # no settle waits of its own
+    assert len(selenium.calls) == 1
+
+
+def test_stats_summary(stats):
+    assert MiqBrowserPlugin.settle_stats_summary() is None
+    plugin = MiqBrowserPlugin(FakeBrowser(FakeSelenium([True, True], [False, True])))
+    plugin.wait_for_idle('20s')
+    plugin.wait_for_idle('20s')
+    summary = MiqBrowserPlugin.settle_stats_summary()
+    assert summary.startswith('page settle waits: 2,')
+    assert '1 timeouts' in summary
+
+
+@pytest.mark.parametrize('element', [{}, {'data-miq_observe': '{"interval": "0.5"}'}],
+                         ids=['plain', 'observed'])
+def test_input_invalidates_summary_snapshot(stats, element):
+    browser = FakeBrowser(FakeSelenium([True, True]))
+    browser._summary_snapshot = ('token', {'tables': {}, 'forms': {}})
+    MiqBrowserPlugin(browser).after_keyboard_input(element, 'text')
+    assert browser._summary_snapshot is None
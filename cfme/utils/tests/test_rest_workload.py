@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import time
+
+from cfme.utils.rest_workload import bulk_action, IssueStats, run_open_loop
+
+
+class FakeCollection(object):
+    def __init__(self):
+        self.action = self
+        self.calls = []
+
+    def refresh(self, *resources):
+        self.calls.append(resources)
+
+
+def test_bulk_action_single_request():
+    collection = FakeCollection()
+    assert bulk_action(collection, 'refresh', iter([1, 2, 3])) == 3
+    assert bulk_action(collection, 'refresh', []) == 0
+    assert collection.calls == [(1, 2, 3)]
+
+
+def test_open_loop_keeps_rate_with_slow_batches():
+    issued = []
+
+    def issue(tick):
+        issued.append((tick, time.time()))
+        # every batch takes longer than the interval
+        time.sleep(0.15)
+        return 2
+
+    stats = run_open_loop(issue, interval=0.05, total_time=0.5, workers=5)
+    assert sorted(tick for tick, _ in issued) == list(range(10))
+    assert stats.queued == 20
+    assert stats.failed == 0
+    assert max(stats.drifts) < 0.05
+    assert stats.elapsed < 1
+
+
+def test_open_loop_records_failures():
+    def issue(tick):
+        if tick % 2:
+            raise ValueError('boom')
+        return 1
+
+    stats = run_open_loop(issue, interval=0.01, total_time=0.04)
+    assert stats.queued == 2
+    assert stats.quantifiers()['Failed_Batches'] == 2
+    assert stats.quantifiers()['Issued_Batches'] == 4
+
+
+def test_late_batches():
+    stats = IssueStats(1)
+    stats.record(0.5, 0.1, 1)
+    stats.record(1.5, 0.1, 1)
+    assert stats.late == 1
+    assert stats.quantifiers()['Issue_Drift_Max'] == 1.5
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from cfme.utils import simplecov
+
+
+def write_resultsets(coverage_root, resultsets):
+    for (ip, pid), coverage in resultsets.items():
+        coverage_root.ensure(ip, str(pid), '.resultset.json').write(json.dumps(
+            {'{}-{}'.format(ip, pid): {'coverage': coverage, 'timestamp': pid}}))
+
+
+@pytest.fixture
+def coverage_root(tmpdir):
+    write_resultsets(tmpdir, {
+        ('10.0.0.1', 1): {'a.rb': [1, None, 0], 'b.rb': [0, 2]},
+        ('10.0.0.1', 2): {'a.rb': [2, None, 0]},
+        ('10.0.0.2', 3): {'a.rb': [0, None, 5], 'c.rb': [None, 1]},
+    })
+    return tmpdir
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_merge_resultsets(coverage_root, processes, monkeypatch):
+    monkeypatch.setattr(simplecov, 'MIN_RESULTSETS_PER_WORKER', 1)
+    paths = simplecov.find_resultsets(coverage_root.strpath)
+    assert len(paths) == 3
+
+    coverage, timestamp, skipped = simplecov.merge_resultsets(paths, processes=processes)
+    assert coverage == {'a.rb': [3, None, 5], 'b.rb': [0, 2], 'c.rb': [None, 1]}
+    assert timestamp == 3
+    assert skipped == []
+
+
+def test_merge_skips_invalid_json(coverage_root):
+    coverage_root.ensure('10.0.0.3', '4', '.resultset.json').write('{"truncated": ')
+    coverage, _, skipped = simplecov.merge_resultsets(
+        simplecov.find_resultsets(coverage_root.strpath))
+    assert coverage['a.rb'] == [3, None, 5]
+    assert len(skipped) == 1
+
+
+@pytest.mark.parametrize(('hits1', 'hits2'), [
+    ([1, 2], [1, 2, 3]),
+    ([1, None], [1, 2]),
+])
+def test_merge_line_hits_mismatch(hits1, hits2):
+    with pytest.raises(ValueError):
+        simplecov.merge_line_hits(hits1, hits2)
+
+
+def test_write_resultset(tmpdir):
+    path = tmpdir.join('merged', '.resultset.json')
+    simplecov.write_resultset(path.strpath, {'a.rb': [1, None]}, 42)
+    assert simplecov.read_resultset(path.strpath) == ({'a.rb': [1, None]}, 42)
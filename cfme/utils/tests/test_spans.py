@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from cfme.utils import spans
+
+
+@spans.traced('fake', detail=lambda seconds=0: seconds)
+def fake_call(seconds=0):
+    time.sleep(seconds)
+
+
+def calling_fake():
+    fake_call()
+
+
+@pytest.fixture
+def recorder():
+    recorder = spans.SpanRecorder()
+    spans.enable(recorder)
+    recorder.start_tree('test')
+    yield recorder
+    spans.disable()
+
+
+def names(span):
+    return [child.name for child in span.children]
+
+
+def test_tree(recorder):
+    with spans.span('outer'):
+        fake_call(0.01)
+        token = spans.start_span('manual')
+        fake_call()
+        spans.finish_span(token)
+    root, dropped = recorder.finish_tree()
+    assert dropped == 0
+    assert names(root) == ['outer']
+    outer = root.children[0]
+    assert names(outer) == ['fake 0.01', 'manual']
+    assert names(outer.children[1]) == ['fake 0']
+    assert outer.children[0].duration >= 0.01
+    assert root.duration >= outer.duration >= outer.children[0].duration
+
+    name, site, start, duration, children = root.serialize(root.start)
+    assert name == 'test'
+    assert start == 0
+    assert children[0][0] == 'outer'
+
+
+def test_call_site(recorder):
+    calling_fake()
+    root, _ = recorder.finish_tree()
+    line = calling_fake.__code__.co_firstlineno + 1
+    assert root.children[0].site.endswith('test_spans.py:{}'.format(line))
+
+
+def test_not_recording():
+    assert not spans.recording()
+    assert spans.start_span('manual') is None
+    with spans.span('outer'):
+        fake_call()
+
+
+def test_exception_closes_span(recorder):
+    with pytest.raises(ZeroDivisionError):
+        with spans.span('outer'):
+            1 / 0
+    fake_call()
+    root, _ = recorder.finish_tree()
+    assert names(root) == ['outer', 'fake 0']
+
+
+def test_threads(recorder):
+    def work():
+        with spans.span('thread'):
+            fake_call()
+    with spans.span('main'):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    root, _ = recorder.finish_tree()
+    # spans of threads without an open span go under the root
+    assert sorted(names(root)) == ['main', 'thread']
+    thread_span = [child for child in root.children if child.name == 'thread'][0]
+    assert names(thread_span) == ['fake 0']
+
+
+def test_max_spans():
+    recorder = spans.SpanRecorder(max_spans=10)
+    spans.enable(recorder)
+    try:
+        recorder.start_tree('test')
+        for _ in range(25):
+            fake_call()
+        root, dropped = recorder.finish_tree()
+    finally:
+        spans.disable()
+    assert len(root.children) == 10
+    assert dropped == 15
+
+
+def test_overhead_bounded():
+    # the micro-benchmark of scripts/benchmark_spans.py, with loose bounds for slow machines
+    from scripts.benchmark_spans import overheads
+    results = {name: overhead for name, _, overhead in overheads(20000)}
+    assert results['traced, not recording'] < 5e-6
+    assert results['traced, recording'] < 20e-6
+    assert results['traced, recording sites'] < 50e-6
+    assert results['traced, over the limit'] < 5e-6
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+
+import pytest
+import yaml
+
+from scripts.benchmark_startup import (
+    ImportProfiler, StartupTimer, candidate_names, compare, merge, write_config, FAKE_PROVIDERS)
+
+pytest_plugins = 'pytester'
+
+test_file = """
+import pytest
+
+
+def pytest_generate_tests(metafunc):
+    if 'number' in metafunc.fixturenames:
+        metafunc.parametrize('number', [1, 2, 3])
+
+
+def test_number(number):
+    pass
+"""
+
+
+@pytest.fixture
+def package(tmpdir, monkeypatch):
+    root = tmpdir.mkdir('startup_pkg')
+    root.join('__init__.py').write('')
+    root.join('heavy.py').write('import time\ntime.sleep(0.05)\n')
+    root.join('light.py').write('import time\nfrom startup_pkg import heavy\ntime.sleep(0.02)\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    yield 'startup_pkg'
+    for name in list(sys.modules):
+        if name.startswith('startup_pkg'):
+            del sys.modules[name]
+
+
+def test_import_profiler(package):
+    profiler = ImportProfiler()
+    profiler.install()
+    try:
+        started = time.time()
+        import startup_pkg.light  # noqa
+    finally:
+        profiler.uninstall()
+    rows = {module: (importer, self_time, cumulative)
+            for module, importer, _, self_time, cumulative in profiler.rows}
+    assert set(rows) == {'startup_pkg, startup_pkg.light', 'startup_pkg.heavy'}
+    assert rows['startup_pkg.heavy'][0] == 'startup_pkg.light'
+    assert rows['startup_pkg.heavy'][1] >= 0.05
+    _, light_self, light_cumulative = rows['startup_pkg, startup_pkg.light']
+    # the time of the nested import is not in the self time
+    assert 0.02 <= light_self < 0.05
+    assert light_cumulative >= light_self + rows['startup_pkg.heavy'][1]
+    assert len(profiler.outer) == 1
+    assert profiler.between(started, time.time()) == light_cumulative
+    assert profiler.between(time.time(), time.time() + 1) == 0
+
+
+@pytest.mark.parametrize('args, names', [
+    (('a.b', None, None, 0), ['a', 'a.b']),
+    (('a', None, ['b', '*'], 0), ['a', 'a.b']),
+    (('c', {'__name__': 'a.b'}, None, 1), ['a', 'a.c']),
+    (('', {'__name__': 'a.b', '__package__': 'a'}, ['c'], 1), ['a', 'a.c']),
+    (('c', {'__name__': 'a.b.d', '__path__': []}, None, 2), ['a', 'a.b', 'a.b.c']),
+    # implicit relative import of Python 2
+    (('os', {'__name__': 'a.b'}, None, -1), ['a', 'a.os', 'os']),
+])
+def test_candidate_names(args, names):
+    assert candidate_names(*args) == names
+
+
+def test_startup_timer(testdir):
+    testdir.makepyfile(test_file)
+    timer = StartupTimer(time.time(), ImportProfiler())
+    testdir.inline_run('--collect-only', '--dummy-appliance', plugins=[timer])
+    assert [phase[0] for phase in timer.phases] == [
+        'plugins', 'conftests', 'options', 'configure', 'session start', 'collection']
+    assert timer.counts['items'] == 3
+    assert timer.counts['testgen calls'] == 1
+    assert timer.durations['testgen'] > 0
+
+
+def test_compare():
+    baseline = {'warm': {'measures': {
+        'total': 10., 'phase.configure': 0.2, 'import.cfme.utils': 0.01, 'testgen': 1.}}}
+    current = {'warm': {'measures': {
+        'total': 11., 'phase.configure': 0.35, 'import.cfme.utils': 0.04, 'testgen': 1.5}},
+        'cold': {'measures': {'total': 100.}}}
+    assert compare(baseline, current, threshold=0.2, min_delta=0.1) == [
+        ('warm.phase.configure', 0.2, 0.35), ('warm.testgen', 1., 1.5)]
+    assert compare(baseline, current, threshold=0.05, min_delta=0.2) == [
+        ('warm.testgen', 1., 1.5), ('warm.total', 10., 11.)]
+
+
+def test_merge():
+    results = [{'counts': {'items': i}, 'measures': {'total': total}}
+               for i, total in enumerate([3., 1., 2.])]
+    merged = merge(results)
+    assert merged['measures'] == {'total': 2.}
+    assert merged['counts'] == {'items': 0}
+    assert merged['runs'] == 3
+
+
+def test_write_config(tmpdir):
+    write_config(str(tmpdir), copies=2)
+    cfme_data = yaml.safe_load(tmpdir.join('cfme_data.yaml').read())
+    providers = cfme_data['management_systems']
+    assert len(providers) == 2 * len(FAKE_PROVIDERS)
+    vsphere = providers['virtualcenter-1']
+    assert vsphere['type'] == 'virtualcenter'
+    assert vsphere['endpoints']['default']['hostname'] == 'virtualcenter-1.example.com'
+    credentials = yaml.safe_load(tmpdir.join('credentials.yaml').read())
+    assert all(endpoint.get('credentials', 'fake') in credentials
+               for provider in providers.values()
+               for endpoint in provider['endpoints'].values())
+    assert 'trackerbot' not in yaml.safe_load(tmpdir.join('env.yaml').read())
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from widgetastic_manageiq import Table
+
+HEADERS = ['Name', 'Memory', 'CPUs']
+
+
+class BulkTable(object):
+    """Table serving rows_as_tuples from given rows of (text, displayed, rowspan, colspan)"""
+    rows_as_tuples = Table.__dict__['rows_as_tuples']
+
+    def __init__(self, headers, rows):
+        self.headers = headers
+        self.rows = rows
+
+    def read_bulk(self):
+        return self.headers, [[Table.BulkCell(*cell) for cell in row] for row in self.rows]
+
+
+def cells(*texts):
+    return [(text, True, 1, 1) for text in texts]
+
+
+@pytest.fixture
+def report_table():
+    return BulkTable(HEADERS, [
+        cells('vm1', '1024', '1'),
+        cells('vm2', '2048', '2'),
+        # the Totals row of a report, one cell spanning all the columns
+        [('Totals: 3072', True, 1, 3)],
+        # a Totals row of a grouped report, the label cell spans two columns
+        [('Totals:', True, 1, 2), ('3', True, 1, 1)],
+        [('vm3', True, 1, 1), ('', False, 1, 1), ('4', True, 1, 1)],
+    ])
+
+
+def test_rows_as_tuples(report_table):
+    assert report_table.rows_as_tuples() == [('vm1', '1024', '1'), ('vm2', '2048', '2')]
+
+
+def test_rows_as_tuples_all(report_table):
+    rows = report_table.rows_as_tuples(skip_partially_displayed=False)
+    assert rows[2] == ('Totals: 3072',)
+    assert len(rows) == 5
+
+
+def test_rows_as_tuples_without_headers():
+    table = BulkTable([], [cells('vm1', '1024'), [('Totals: 1024', True, 1, 2)]])
+    assert table.rows_as_tuples() == [('vm1', '1024')]
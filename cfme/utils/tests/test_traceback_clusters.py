@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from cfme.utils.traceback_clusters import normalize, TracebackClusters
+
+EXCEPTIONS = ['TimedOutError', 'NoSuchElementException', 'AssertionError', 'KeyError',
+              'APIException', 'ItemNotFound', 'CandidateNotFound', 'ValueError']
+WORDS = ['provider', 'vm', 'host', 'datastore', 'button', 'dialog', 'request', 'service',
+         'catalog', 'tenant', 'quota', 'refresh', 'power', 'snapshot', 'template', 'cluster',
+         'volume', 'network', 'tag', 'policy', 'alert', 'schedule', 'report', 'widget']
+
+
+def synthetic_tracebacks(clusters, rnd):
+    """Returns shuffled ``(short traceback, cluster)``, ``clusters`` is the size of each cluster
+
+    Failures of a cluster differ by addresses, ids, timestamps, quoted values and line numbers,
+    and by one of two method names called in the traceback.
+    """
+    tracebacks = []
+    for cluster, size in enumerate(clusters):
+        words = rnd.sample(WORDS, 8)
+        exception = EXCEPTIONS[cluster % len(EXCEPTIONS)]
+        template = (
+            '    def test_{w[0]}_{w[1]}(appliance, {w[2]}):\n'
+            '>       {w[3]}.{{method}}({w[4]}={{value!r}})\n'
+            'E       {exception}: {w[5]} {w[6]} of {{value!r}} at {{address}} (id {{id}}) did '
+            'not {w[7]} by {{time}}\n'
+            'cfme/{w[0]}/{w[1]}.py:{{line}}: {exception}\n'
+            '{exception}\n').format(w=words, exception=exception)
+        methods = ['wait_for_{}'.format(words[7]), 'check_{}'.format(words[2])]
+        for _ in range(size):
+            tracebacks.append((template.format(
+                method=rnd.choice(methods),
+                value='{}-{}'.format(words[0], rnd.randint(0, 10 ** 6)),
+                address=hex(rnd.randint(0, 2 ** 48)),
+                id=rnd.randint(1, 10 ** 12),
+                time='2018-05-{:02d} {:02d}:{:02d}:{:02d}'.format(
+                    rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59),
+                    rnd.randint(0, 59)),
+                line=rnd.randint(10, 2000)), cluster))
+    rnd.shuffle(tracebacks)
+    return tracebacks
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("<Vm object at 0x7f3a2c1b9e10>", "<Vm object at <address>>"),
+    ("vm 'test-vm-x1y2' not found", "vm <value> not found"),
+    ('id 10000000000123 took 42s', 'id <n> took 42s'),
+    ('at 2018-05-17 10:21:33.123 and 10:21:33', 'at <time> and <time>'),
+    ('request 3f2504e0-4f89-11d3-9a0c-0305e82c3301\n\n  failed', 'request <uuid> failed'),
+    ('test_case12[param3]', 'test_case12[param3]'),
+])
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_known_clusters(seed):
+    rnd = random.Random(seed)
+    sizes = [rnd.randint(1, 60) for _ in range(40)]
+    clusters = TracebackClusters()
+    for text, cluster in synthetic_tracebacks(sizes, rnd):
+        clusters.add(text, cluster)
+    assert len(clusters) == sum(sizes)
+
+    found = clusters.clusters()
+    assert sorted(sorted(set(item for _, item in cluster.entries)) for cluster in found) == [
+        [cluster] for cluster in range(len(sizes))]
+    assert [cluster.size for cluster in found] == sorted(sizes, reverse=True)
+    for cluster in found:
+        assert cluster.example in cluster.entries
+
+
+def test_top():
+    clusters = TracebackClusters()
+    for i in range(3):
+        clusters.add("KeyError: 'vm-{}' of the provider in the inventory".format(i), 'test_a')
+    clusters.add('TimedOutError: Could not do refresh in time', 'test_b')
+    # the most common normalized traceback represents the cluster
+    clusters.add("KeyError: 'vm-x' of the provider in the inventory at 0x7f3a2c1b9e10", 'test_c')
+    top = clusters.top(1)
+    assert len(top) == 1
+    assert top[0].size == 4
+    assert top[0].example == ("KeyError: 'vm-0' of the provider in the inventory", 'test_a')
+    assert [cluster.size for cluster in clusters.top()] == [4, 1]
+
+
+def test_dissimilar_not_clustered():
+    clusters = TracebackClusters()
+    clusters.add('NoSuchElementException: Could not find the Save button of the dialog')
+    clusters.add('APIException: Provider refresh failed, the credentials are invalid')
+    assert [cluster.size for cluster in clusters.clusters()] == [1, 1]
+
+
+def test_without_traceback_not_clustered():
+    clusters = TracebackClusters()
+    for item, text in enumerate(['', '  \n\t', None, 'TimedOutError: Could not do refresh']):
+        clusters.add(text, item)
+    assert [cluster.entries for cluster in clusters.clusters()] == [
+        [('TimedOutError: Could not do refresh', 3)]]
+    assert [item for _, item in clusters.without_traceback] == [0, 1, 2]
+    assert len(clusters) == 1
+
+
+def test_bands_divide_signature():
+    with pytest.raises(ValueError):
+        TracebackClusters(num_perm=64, bands=10)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from cfme.markers.uncollect import UncollectEngine, value_key
+
+
+class FakeMark(object):
+    def __init__(self, condition, reason=None):
+        self.args = (condition,)
+        self.kwargs = {'reason': reason} if reason else {}
+
+    def __iter__(self):
+        return iter([self])
+
+
+class FakeHolder(object):
+    held_appliance = 'appliance'
+
+
+class FakePluginManager(object):
+    holder = None
+
+    def get_plugin(self, name):
+        return self.holder
+
+
+class FakeCallSpec(object):
+    def __init__(self, params):
+        self.params = params
+
+
+class FakeRequest(object):
+    def __init__(self, funcargnames):
+        self.funcargnames = funcargnames
+
+
+class FakeItem(object):
+    config = None
+
+    def __init__(self, marks, **params):
+        self.name = 'test_item[{}]'.format('-'.join(str(v) for v in params.values()))
+        self.marks = marks
+        self.callspec = FakeCallSpec(params)
+        self._request = FakeRequest(list(params))
+
+    def get_marker(self, name):
+        return self.marks if name == 'uncollectif' else None
+
+
+@pytest.fixture
+def config(monkeypatch):
+    pluginmanager = FakePluginManager()
+    monkeypatch.setattr(FakeItem, 'config', type('Config', (object,), {
+        'pluginmanager': pluginmanager}))
+    return pluginmanager
+
+
+def test_evaluated_once_per_values(config):
+    calls = []
+
+    def condition(provider_type, version):
+        calls.append((provider_type, version))
+        return provider_type == 'ec2'
+    marks = [FakeMark(condition, reason='not on ec2')]
+    items = [FakeItem(marks, provider_type=provider_type, version=version, name=name)
+             for provider_type in ('ec2', 'rhevm', 'virtualcenter')
+             for version in ('5.8', '5.9')
+             for name in range(10)]
+    engine = UncollectEngine()
+    results = [engine.evaluate(item) for item in items]
+    assert results.count((True, 'not on ec2')) == 20
+    assert results.count((False, None)) == 40
+    assert len(calls) == 6
+    assert engine.stats['conditions'] == 1
+    assert engine.stats['hits'] == 54
+
+
+def test_unhashable_values(config):
+    calls = []
+
+    def condition(provider_data):
+        calls.append(provider_data)
+        return provider_data['type'] == 'ec2'
+    marks = [FakeMark(condition)]
+    ec2, rhevm = {'type': 'ec2'}, {'type': 'rhevm'}
+    engine = UncollectEngine()
+    results = [engine.evaluate(FakeItem(marks, provider_data=data, name=name))
+               for data in (ec2, rhevm) for name in range(3)]
+    assert [result for result, _ in results] == [True] * 3 + [False] * 3
+    assert calls == [ec2, rhevm]
+
+
+def test_appliance(config):
+    config.holder = FakeHolder()
+    engine = UncollectEngine()
+    item = FakeItem([FakeMark(lambda appliance: appliance == 'appliance')], provider='ec2')
+    assert engine.evaluate(item) == (True, 'No reason given')
+    assert engine.evaluate(FakeItem([], provider='ec2')) == (False, None)
+
+
+def test_missing_fixture(config):
+    engine = UncollectEngine()
+    with pytest.raises(Exception) as exc_info:
+        engine.evaluate(FakeItem([FakeMark(lambda provider_type: True)], provider='ec2'))
+    assert "wasn't in the function" in str(exc_info.value)
+
+
+def test_unhashable_key_holds_value():
+    data = {'type': 'ec2'}
+    key = value_key(data)
+    del data
+    # a freed dict would likely give its id to the next one
+    assert key != value_key({'type': 'rhevm'})
+    assert key[1].value == {'type': 'ec2'}
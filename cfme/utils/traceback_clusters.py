@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Clustering of similar tracebacks.
+
+Failures of one cause rarely have identical tracebacks, they differ by object addresses, ids,
+timestamps or the values in the messages. Tracebacks are normalized first, so that failures which
+only differ by those fall into the same cluster right away. The distinct normalized tracebacks
+left get MinHash signatures of their word shingles, and the signatures are split into bands put
+into LSH buckets. A traceback is only compared with the tracebacks it shares a bucket with, which
+keeps clustering linear in the number of tracebacks, and is merged with their clusters when the
+signatures estimate a Jaccard similarity of at least ``threshold``. Failures without a
+traceback are not clustered, they are kept apart in ``without_traceback``.
+
+Usage:
+
+.. code-block:: python
+
+    clusters = TracebackClusters()
+    for test_name, short_tb in failures:
+        clusters.add(short_tb, test_name)
+    for cluster in clusters.top(10):
+        print(cluster.size, cluster.example)
+"""
+import random
+import re
+import zlib
+
+import attr
+import six
+
+# Prime larger than the crc32 shingle hashes, modulus of the MinHash permutations
+_PRIME = 4294967311
+
+# Applied in this order, timestamps and uuids before their numbers get replaced
+_NORMALIZE = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'),
+     '<time>'),
+    (re.compile(r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b'), '<time>'),
+    (re.compile(r'\b[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\b'), '<uuid>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<address>'),
+    (re.compile(r'"(?:[^"\\\n]|\\.)*"'), '<value>'),
+    (re.compile(r"'(?:[^'\\\n]|\\.)*'"), '<value>'),
+    (re.compile(r'\b\d+\b'), '<n>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+_WORD = re.compile(r'[<>\w]+')
+
+
+def normalize(text):
+    """Replaces the parts of a traceback that differ between failures of one cause
+
+    Timestamps, uuids, hex addresses, quoted values and numbers (ids, ports, line numbers) are
+    replaced by placeholders, whitespace is collapsed.
+    """
+    if isinstance(text, six.binary_type):
+        text = text.decode('utf-8', 'replace')
+    for regexp, replacement in _NORMALIZE:
+        text = regexp.sub(replacement, text)
+    return text.strip()
+
+
+def shingles(text, size=3):
+    """Returns the set of ``size`` consecutive words of ``text``"""
+    words = _WORD.findall(text)
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+@attr.s
+class Cluster(object):
+    """Tracebacks clustered together by :py:class:`TracebackClusters`
+
+    Attributes:
+        entries: ``(text, item)`` of all the tracebacks of the cluster
+        example: The ``(text, item)`` representing the cluster, its normalized traceback is the
+            most common one of the cluster
+    """
+    entries = attr.ib()
+    example = attr.ib()
+
+    @property
+    def size(self):
+        return len(self.entries)
+
+
+class TracebackClusters(object):
+    """Clusters tracebacks as they are added
+
+    Args:
+        threshold: Least Jaccard similarity of the shingles of two normalized tracebacks, as
+            estimated by their signatures, to put them into one cluster
+        num_perm: Length of the MinHash signatures
+        bands: Number of LSH bands the signatures are split into, two tracebacks are compared
+            when all the values of one of their bands are equal
+        shingle_size: Number of words in a shingle
+        seed: Seed of the MinHash permutations
+    """
+    def __init__(self, threshold=0.5, num_perm=64, bands=32, shingle_size=3, seed=0):
+        if num_perm % bands:
+            raise ValueError('num_perm {} is not divisible by bands {}'.format(num_perm, bands))
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rnd = random.Random(seed)
+        self._perms = [(rnd.randint(1, _PRIME - 1), rnd.randint(0, _PRIME - 1))
+                       for _ in range(num_perm)]
+        # normalized traceback: its index, the following lists are by the index
+        self._indexes = {}
+        self._entries = []
+        self._signatures = []
+        # union-find of the indexes
+        self._parents = []
+        # (band, band values): the first index of the bucket
+        self._buckets = {}
+        #: ``(text, item)`` of the empty tracebacks, they have nothing to cluster by
+        self.without_traceback = []
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries)
+
+    def signature(self, normalized):
+        """Returns the MinHash signature of a normalized traceback"""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) & 0xffffffff
+                  for shingle in shingles(normalized, self.shingle_size)]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms]
+
+    def similarity(self, signature, other):
+        """Estimates the Jaccard similarity of the shingles of two signatures"""
+        return sum(1 for x, y in zip(signature, other) if x == y) / float(self.num_perm)
+
+    def add(self, text, item=None):
+        """Adds a traceback, ``item`` identifies where it came from, eg. the test name"""
+        normalized = normalize(text or '')
+        if not normalized:
+            self.without_traceback.append((text, item))
+            return
+        index = self._indexes.get(normalized)
+        if index is None:
+            index = self._add_distinct(normalized)
+        self._entries[index].append((text, item))
+
+    def _add_distinct(self, normalized):
+        index = len(self._parents)
+        self._indexes[normalized] = index
+        self._entries.append([])
+        self._parents.append(index)
+        signature = self.signature(normalized)
+        self._signatures.append(signature)
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            bucket = (band, ) + tuple(signature[band * rows:(band + 1) * rows])
+            # comparing with the first traceback of the bucket only, the others are either in
+            # its cluster already or were not similar enough to it
+            first = self._buckets.setdefault(bucket, index)
+            if (first != index and self._find(first) != self._find(index) and
+                    self.similarity(signature, self._signatures[first]) >= self.threshold):
+                self._parents[self._find(index)] = self._find(first)
+        return index
+
+    def _find(self, index):
+        parents = self._parents
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def clusters(self):
+        """Returns all the :py:class:`Cluster` s, the largest first"""
+        members = {}
+        for index in range(len(self._parents)):
+            if self._entries[index]:
+                members.setdefault(self._find(index), []).append(index)
+        clusters = []
+        for indexes in sorted(members.values()):
+            entries = [entry for index in indexes for entry in self._entries[index]]
+            common = max(indexes, key=lambda index: len(self._entries[index]))
+            clusters.append(Cluster(entries=entries, example=self._entries[common][0]))
+        # stable, clusters of equal size stay in the order their first tracebacks came in
+        clusters.sort(key=lambda cluster: cluster.size, reverse=True)
+        return clusters
+
+    def top(self, number=10):
+        """Returns the ``number`` largest :py:class:`Cluster` s"""
+        return self.clusters()[:number]
@@ -1,7 +1,6 @@
 import argparse
 import json
 import re
-import six.moves.urllib.parse
 import urllib
 from collections import defaultdict, namedtuple
 from datetime import date, datetime
@@ -12,6 +11,7 @@ import requests
 from lxml import html
 import time
 
+from cfme.utils.api_pages import PAGE_WORKERS, PageFetcher
 from cfme.utils.conf import env
 from cfme.utils.log import logger
 from cfme.utils.providers import providers_data
@@ -353,38 +353,13 @@ def trackerbot_add_provider_template(stream, provider, template_name, custom_dat
         print('{}: Error occured while template sync to trackerbot'.format(provider))
 
 
-def depaginate(api, result):
-    """Depaginate the first (or only) page of a paginated result"""
-    meta = result['meta']
-    if meta['next'] is None:
-        # No pages means we're done
-        return result
-
-    # make a copy of meta that we'll mess with and eventually return
-    # since we'll be chewing on the 'meta' object with every new GET
-    # same thing for objects, since we'll just be appending to it
-    # while we pull more records
-    ret_meta = meta.copy()
-    ret_objects = result['objects']
-    while meta['next']:
-        # parse out url bits for constructing the new api req
-        next_url = six.moves.urllib.parse.urlparse(meta['next'])
-        # ugh...need to find the word after 'api/' in the next URL to
-        # get the resource endpoint name; not sure how to make this better
-        next_endpoint = next_url.path.strip('/').split('/')[-1]
-        next_params = {k: v[0] for k, v in six.moves.urllib.parse.parse_qs(next_url.query).items()}
-        result = getattr(api, next_endpoint).get(**next_params)
-        ret_objects.extend(result['objects'])
-        meta = result['meta']
-
-    # fix meta up to not tell lies
-    ret_meta['total_count'] = len(ret_objects)
-    ret_meta['next'] = None
-    ret_meta['limit'] = ret_meta['total_count']
-    return {
-        'meta': ret_meta,
-        'objects': ret_objects
-    }
+def depaginate(api, result, workers=PAGE_WORKERS):
+    """Depaginate the first (or only) page of a paginated result
+
+    The pages are fetched by ``workers`` at a time when the result tells its counts, see
+    :py:mod:`cfme.utils.api_pages`.
+    """
+    return PageFetcher(api, workers=workers).depaginate(result)
 
 
 def composite_uncollect(build, source='jenkins'):
@@ -1,7 +1,15 @@
 from wait_for import wait_for as wait_for_mod, wait_for_decorator as wait_for_decorator_mod
 from wait_for import RefreshTimer, TimedOutError  # NOQA
 from cfme.utils.log import logger
+from cfme.utils.spans import traced
 from functools import partial
 
-wait_for = partial(wait_for_mod, logger=logger)
+
+@traced('wait_for')
+def wait_for(*args, **kwargs):
+    """:py:func:`wait_for.wait_for` logging to the framework log"""
+    kwargs.setdefault('logger', logger)
+    return wait_for_mod(*args, **kwargs)
+
+
 wait_for_decorator = partial(wait_for_decorator_mod, logger=logger)
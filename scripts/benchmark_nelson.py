@@ -0,0 +1,141 @@
+#!/usr/bin/env python2
+"""Benchmark of the docstring metadata cache of :py:mod:`cfme.fixtures.nelson`.
+
+Reads the docstrings of the test functions of the test modules (without importing them) and
+times getting their metadata the way collection does: parsing every docstring by napoleon as
+before the cache, with an empty cache (first collection, the cache is written) and with the cache
+written by the previous collection (unchanged modules).
+
+    python scripts/benchmark_nelson.py cfme/tests --repeat 3
+"""
+import argparse
+import ast
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from py.path import local
+
+from cfme.fixtures import nelson
+from cfme.fixtures.pytest_store import store
+
+
+class FileCache(object):
+    """One JSON file per key, like the pytest cache"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key.replace('/', '_'))
+
+    def get(self, key, default):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return default
+
+    def set(self, key, value):
+        with open(self._path(key), 'w') as f:
+            json.dump(value, f, indent=2, sort_keys=True)
+
+
+class Config(object):
+    def __init__(self, cache):
+        self.cache = cache
+
+
+class Collector(object):
+    def __init__(self, fspath, config):
+        self.fspath = fspath
+        self.config = config
+        self.nodeid = fspath.strpath
+
+
+class Session(object):
+    def __init__(self, config):
+        self.config = config
+
+
+class Function(object):
+    def __init__(self, doc):
+        self.__doc__ = doc
+
+
+def read_functions(paths):
+    """Returns ``[(module path, [(name, function with the docstring)])]`` of the test modules"""
+    modules = []
+    for path in paths:
+        for module in sorted(local(path).visit('test_*.py')):
+            try:
+                tree = ast.parse(module.read())
+            except SyntaxError:
+                continue
+            functions = [(node.name, Function(ast.get_docstring(node, clean=False)))
+                         for node in ast.walk(tree)
+                         if isinstance(node, ast.FunctionDef) and node.name.startswith('test')]
+            if functions:
+                modules.append((module, functions))
+    return modules
+
+
+def parse_all(modules, cache):
+    for _, functions in modules:
+        for _, function in functions:
+            nelson.get_meta(function)
+
+
+def collect(modules, cache):
+    """Gets the metadata by the cache in a new collection, writes the cache at its end"""
+    nelson._module_cache.clear()
+    config = Config(cache)
+    for path, functions in modules:
+        collector = Collector(path, config)
+        for name, function in functions:
+            nelson.get_cached_meta(collector, name, function)
+    nelson.pytest_collection_finish(Session(config))
+
+
+def measure(function, *args):
+    started = time.time()
+    function(*args)
+    return time.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=['cfme/tests'],
+                        help='Directories of the test modules')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, the best is shown')
+    args = parser.parse_args()
+
+    store.parallelizer_role = None
+    modules = read_functions(args.paths)
+    functions = sum(len(module_functions) for _, module_functions in modules)
+    print('{} test functions in {} modules'.format(functions, len(modules)))
+
+    row = '{:<14}{:>10}{:>10}{:>10}'
+    print(row.format('case', 'seconds', 'hits', 'misses'))
+    for name in ('parse', 'empty cache', 'cached'):
+        best = None
+        for _ in range(args.repeat):
+            cache_dir = tempfile.mkdtemp(prefix='nelson-cache-')
+            try:
+                cache = FileCache(cache_dir)
+                if name == 'cached':
+                    collect(modules, cache)
+                nelson._cache_stats.update(hits=0, misses=0)
+                elapsed = measure(parse_all if name == 'parse' else collect, modules, cache)
+            finally:
+                shutil.rmtree(cache_dir)
+            best = elapsed if best is None else min(best, elapsed)
+        stats = nelson._cache_stats if name != 'parse' else {'hits': '-', 'misses': '-'}
+        print(row.format(name, round(best, 3), stats['hits'], stats['misses']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
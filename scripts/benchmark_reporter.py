@@ -0,0 +1,124 @@
+#!/usr/bin/env python2
+"""Benchmark of the artifactor reporter plugin.
+
+Drives the events of a run of ``--tests`` synthetic tests through
+:py:class:`artifactor.plugins.reporter.Reporter`, once building the report incrementally and
+once processing all the artifacts on every build, and compares their wall time and peak RSS.
+Each of them runs in its own process so that their peak RSS don't mix.
+
+    python scripts/benchmark_reporter.py --tests 50000 --build-every 5000
+"""
+import argparse
+import json
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from riggerlib.tools import recursive_update
+
+from artifactor.plugins.reporter import Reporter
+
+PATHS = ('full', 'incremental')
+# outcome of a test: weight
+OUTCOMES = {'passed': 85, 'failed': 8, 'skipped': 5, 'error': 2}
+WHENS = ('setup', 'call', 'teardown')
+# outcome of a test: outcomes of the phases it reports
+PHASE_OUTCOMES = {
+    'passed': ('passed', 'passed', 'passed'),
+    'failed': ('passed', 'failed', 'passed'),
+    'skipped': ('skipped', ),
+    'error': ('failed', ),
+}
+
+
+def synthetic_tests(tests, modules):
+    rnd = random.Random(0)
+    outcomes = [outcome for outcome, weight in OUTCOMES.items() for _ in range(weight)]
+    for i in range(tests):
+        module = i % modules
+        location = 'cfme/tests/area{}/test_module{}.py'.format(module % 20, module)
+        name = 'test_case{}[provider{}-param{}]'.format(i // modules, i % 7, i)
+        yield location, name, rnd.choice(outcomes)
+
+
+def drive(path, tests, modules, build_every, artifact_dir):
+    reporter = Reporter('reporter', {'incremental': path == 'incremental', 'build_interval': 0},
+                        None)
+    reporter.configure()
+    artifacts = {}
+    old_artifacts = {}
+
+    def fire(hook, *args):
+        recursive_update(artifacts, hook(*args)[1]['artifacts'])
+
+    build_time = 0
+    started = time.time()
+    for i, (location, name, outcome) in enumerate(synthetic_tests(tests, modules)):
+        fire(reporter.start_test, location, name, 'slave01')
+        if outcome == 'skipped':
+            fire(reporter.skip_test, location, name,
+                 {'type': 'blocker', 'reason': [1000 + i % 50]})
+        elif outcome in ('failed', 'error'):
+            fire(reporter.tb_info, location, name, 'AssertionError: {}'.format(i % 100),
+                 '{}:{}'.format(location, i % 300), 'E   assert {} == 0'.format(i % 100))
+        for when, phase_outcome in zip(WHENS, PHASE_OUTCOMES[outcome]):
+            fire(reporter.report_test, artifacts, artifact_dir, location, name, False, when,
+                 phase_outcome, 0.5)
+        fire(reporter.finish_test, artifacts, location, name, 'slave01')
+        if (i + 1) % build_every == 0:
+            old_artifacts.update(artifacts)
+            build_started = time.time()
+            reporter.run_report(old_artifacts, artifact_dir)
+            build_time += time.time() - build_started
+    old_artifacts.update(artifacts)
+    finish_started = time.time()
+    reporter.finish_session(old_artifacts, artifact_dir)
+    finished = time.time()
+    return {
+        'path': path,
+        'wall_time': round(finished - started, 2),
+        'build_time': round(build_time, 2),
+        'finish_session_time': round(finished - finish_started, 2),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024., 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tests', type=int, default=50000, help='Number of synthetic tests')
+    parser.add_argument('--modules', type=int, default=500, help='Number of test modules')
+    parser.add_argument('--build-every', type=int, default=5000,
+                        help='Tests between two build_report events')
+    parser.add_argument('--path', choices=PATHS, help='Only run this path, in this process')
+    args = parser.parse_args()
+
+    if args.path:
+        artifact_dir = tempfile.mkdtemp(prefix='benchmark_reporter_')
+        try:
+            print(json.dumps(drive(
+                args.path, args.tests, args.modules, args.build_every, artifact_dir)))
+        finally:
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+        return 0
+
+    results = []
+    for path in PATHS:
+        output = subprocess.check_output([
+            sys.executable, __file__, '--path', path, '--tests', str(args.tests),
+            '--modules', str(args.modules), '--build-every', str(args.build_every)])
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    columns = ['path', 'wall_time', 'build_time', 'finish_session_time', 'peak_rss_mb']
+    print('{} tests, {} modules, build every {} tests'.format(
+        args.tests, args.modules, args.build_every))
+    print(''.join('{:>22}'.format(column) for column in columns))
+    for result in results:
+        print(''.join('{:>22}'.format(result[column]) for column in columns))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
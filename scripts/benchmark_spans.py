@@ -0,0 +1,80 @@
+#!/usr/bin/env python2
+"""Micro-benchmark of the overhead of the spans of :py:mod:`cfme.utils.spans`.
+
+Calls a fake choke point (a function doing a little work) plainly, traced while the spans are
+not recorded, and traced while they are recorded with and without the call sites, and prints the
+overhead per call against the plain calls.
+
+    python scripts/benchmark_spans.py --calls 100000
+"""
+import argparse
+import sys
+import time
+
+from cfme.utils import spans
+
+
+def fake_call(n=20):
+    return sum(range(n))
+
+
+traced_call = spans.traced('fake')(fake_call)
+
+
+def nested_call():
+    with spans.span('outer'):
+        return traced_call()
+
+
+def measure(function, calls, recorder=None):
+    """Seconds per call of ``function``, with the spans recorded into ``recorder``"""
+    if recorder is not None:
+        spans.enable(recorder)
+        recorder.start_tree('benchmark')
+    try:
+        started = time.time()
+        for _ in range(calls):
+            function()
+        return (time.time() - started) / calls
+    finally:
+        if recorder is not None:
+            recorder.finish_tree()
+        spans.disable()
+
+
+def overheads(calls, repeat=3):
+    """Returns ``[(name, seconds per call, overhead per call)]``, the best of ``repeat`` runs"""
+    cases = [
+        ('plain', fake_call, None),
+        ('traced, not recording', traced_call, None),
+        ('traced, recording', traced_call,
+         lambda: spans.SpanRecorder(max_spans=calls * 2, call_sites=False)),
+        ('traced, recording sites', traced_call,
+         lambda: spans.SpanRecorder(max_spans=calls * 2)),
+        ('traced, over the limit', traced_call, lambda: spans.SpanRecorder(max_spans=0)),
+        ('nested, recording sites', nested_call,
+         lambda: spans.SpanRecorder(max_spans=calls * 2)),
+    ]
+    results = []
+    for name, function, recorder in cases:
+        per_call = min(measure(function, calls, recorder() if recorder else None)
+                       for _ in range(repeat))
+        results.append((name, per_call))
+    plain = results[0][1]
+    return [(name, seconds, seconds - plain) for name, seconds in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000, help='Calls per case')
+    args = parser.parse_args()
+
+    row = '{:<26}{:>14}{:>14}'
+    print(row.format('case', 'us per call', 'us overhead'))
+    for name, per_call, overhead in overheads(args.calls):
+        print(row.format(name, round(per_call * 1e6, 3), round(overhead * 1e6, 3)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
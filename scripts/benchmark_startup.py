@@ -0,0 +1,590 @@
+#!/usr/bin/env python2
+"""Benchmark of the startup and the collection of the framework.
+
+Runs ``pytest --collect-only`` against a synthetic configuration, ``--providers`` fake providers
+of every type with all the test flags defined, and a dummy appliance, so that it runs fully
+offline, and times the phases of the startup in the pytest process:
+
+* ``bootstrap``: importing pytest and the framework path helpers
+* ``plugins``: the registration of the pytest plugins, the import of the ``cfme`` plugin graph
+* ``conftests``: the loading of the initial conftests
+* ``options``: the parsing of the command line
+* ``configure``: ``pytest_configure`` of all the plugins
+* ``session start``: ``pytest_sessionstart`` of all the plugins
+* ``collection``: importing the test modules, ``testgen`` parametrization and the uncollection
+* ``finish``: the end of the session
+
+with the part of every phase spent importing modules, the time spent loading the yaycl YAMLs, the
+time spent in ``pytest_generate_tests`` (``testgen``) and in ``pytest_collection_modifyitems``,
+and the time of every import statement which imported modules, like ``python -X importtime``.
+
+The first run is cold, without the bytecode of the framework, the next ``--warm`` runs are warm
+and their median is reported. The results are compared to the baseline file, which
+``--save-baseline`` writes, and the measures slower than the baseline by more than ``--threshold``
+(and ``--min-delta``) are reported as regressions, in which case the script exits with 1.
+
+    python scripts/benchmark_startup.py --save-baseline
+    python scripts/benchmark_startup.py --warm 5 -- cfme/tests/infrastructure
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+try:
+    # before builtins, which is the backport of the future package on Python 2
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(PROJECT_PATH, 'log', 'startup_baseline.json')
+DEFAULT_OUTPUT = os.path.join(PROJECT_PATH, 'log', 'startup_benchmark.json')
+# packages whose bytecode is removed before the cold run
+FRAMEWORK_PACKAGES = ('cfme', 'widgetastic_manageiq', 'artifactor')
+# imports cheaper than this in both the baseline and the run are not compared
+IMPORT_FLOOR = 0.05
+# flags of the tests, see cfme.utils.testgen.providers
+TEST_FLAG = re.compile(r'test_flag:[ \t]*([\w, ]+)')
+
+# fake providers of the synthetic cfme_data.yaml, the hostnames are reserved for documentation
+FAKE_PROVIDERS = {
+    'virtualcenter': {
+        'version': '6.5',
+        'server_zone': 'default',
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com'}},
+    },
+    'rhevm': {
+        'version': '4.2',
+        'server_zone': 'default',
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com',
+                                  'api_port': 443, 'verify_tls': False}},
+    },
+    'scvmm': {
+        'version': '2016',
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com',
+                                  'security_protocol': 'Kerberos'}},
+    },
+    'ec2': {
+        'version': '1.0',
+        'server_zone': 'default',
+        'region': 'us-east-1',
+        'region_name': 'US East (Northern Virginia)',
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com'}},
+    },
+    'azure': {
+        'version': '1.0',
+        'region': 'eastus',
+        'tenant_id': '00000000-0000-0000-0000-000000000000',
+        'subscription_id': '00000000-0000-0000-0000-000000000000',
+        'endpoints': {'default': {'credentials': 'fake'}},
+    },
+    'gce': {
+        'version': '1.0',
+        'project': 'fake-project',
+        'zone': 'us-central1-a',
+        'region': 'us-central1',
+        'region_name': 'Iowa',
+        'endpoints': {'default': {'credentials': 'fake-gce'}},
+    },
+    'openstack': {
+        'version': '12.0',
+        'server_zone': 'default',
+        'port': 5000,
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com'}},
+    },
+    'openshift': {
+        'version': '3.9',
+        'server_zone': 'default',
+        'credentials': 'fake',
+        'ssh_creds': 'fake',
+        'endpoints': {'default': {'hostname': '{key}.example.com', 'api_port': 8443,
+                                  'sec_protocol': 'SSL trusting custom CA'}},
+    },
+    'lenovo': {
+        'version': '1.0',
+        'endpoints': {'default': {'credentials': 'fake', 'hostname': '{key}.example.com',
+                                  'api_port': 443}},
+    },
+}
+# data of every fake provider, for the tests requiring these fields
+FAKE_PROVIDER_DATA = {
+    'provisioning': {'template': 'fake-template', 'image': {'name': 'fake-image'},
+                     'host': 'fake-host', 'datastore': 'fake-datastore', 'vlan': 'fake-vlan',
+                     'cluster': 'fake-cluster'},
+    'templates': {'small_template': {'name': 'fake-template', 'creds': 'fake'}},
+    'hosts': [{'name': 'fake-host', 'type': 'esxi', 'credentials': 'fake'}],
+    'datacenters': ['fake-datacenter'],
+    'clusters': ['fake-cluster'],
+    'datastores': [{'type': 'nfs', 'name': 'fake-datastore'}],
+}
+FAKE_CREDENTIALS = {
+    'default': {'username': 'admin', 'password': 'smartvm'},
+    'fake': {'username': 'fake', 'password': 'fake', 'token': 'fake', 'domain': 'fake'},
+    'fake-gce': {'service_account': {
+        'type': 'service_account', 'project_id': 'fake-project', 'private_key_id': 'fake',
+        'private_key': 'fake', 'client_email': 'fake@example.com', 'client_id': 'fake',
+        'auth_uri': 'https://accounts.example.com/auth', 'token_uri': 'https://example.com/token',
+        'auth_provider_x509_cert_url': 'https://example.com/certs',
+        'client_x509_cert_url': 'https://example.com/cert'}},
+}
+
+
+class ImportProfiler(object):
+    """Times the import statements which import modules, like ``python -X importtime``
+
+    Wraps ``__import__``. Every call of it which imports modules is recorded as a row
+    ``[modules, importer, start, self, cumulative]``, ``modules`` the names of the modules it
+    imported (``wrapanapi, wrapanapi.utils`` when ``wrapanapi`` was not imported yet), ``importer``
+    the module the import is in, ``self`` the time not spent in the nested imports.
+    Modules imported without ``__import__`` (``importlib.import_module`` on Python 3) are
+    accounted to the import statement they happen in.
+    """
+    def __init__(self):
+        self.rows = []
+        # (start, cumulative) of the outermost import statements which imported modules
+        self.outer = []
+        self._stack = []
+        self._claimed = set()
+        self._import = None
+
+    def install(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=None,
+                      level=-1 if sys.version_info[0] == 2 else 0):
+        modules = sys.modules
+        candidates = [
+            candidate for candidate in candidate_names(name, globals, fromlist, level)
+            if modules.get(candidate) is None]
+        frame = [0.]
+        self._stack.append(frame)
+        started = time.time()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - started
+            self._stack.pop()
+            imported = [
+                candidate for candidate in candidates
+                if modules.get(candidate) is not None and candidate not in self._claimed]
+            if imported or frame[0]:
+                if self._stack:
+                    self._stack[-1][0] += elapsed
+                else:
+                    self.outer.append((started, elapsed))
+            if imported:
+                self._claimed.update(imported)
+                importer = globals.get('__name__') if globals else None
+                self.rows.append(
+                    [', '.join(sorted(imported)), importer, started, elapsed - frame[0], elapsed])
+
+    def between(self, start, end):
+        """Time spent importing between ``start`` and ``end``"""
+        return sum(elapsed for started, elapsed in self.outer if start <= started < end)
+
+
+def candidate_names(name, globals, fromlist, level):
+    """Absolute names of the modules an ``__import__`` call may import"""
+    bases = []
+    if level != 0 and globals:
+        package = globals.get('__package__')
+        if package is None:
+            package = globals.get('__name__', '')
+            if '__path__' not in globals:
+                package = package.rpartition('.')[0]
+        if package:
+            if level > 0:
+                package = package.rsplit('.', level - 1)[0]
+            bases.append('{}.{}'.format(package, name) if name else package)
+    if level <= 0 and name:
+        bases.append(name)
+    candidates = []
+    for base in bases:
+        parts = base.split('.')
+        candidates.extend('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+        for item in fromlist or ():
+            if item != '*':
+                candidates.append('{}.{}'.format(base, item))
+    return candidates
+
+
+class ConfigLoadProfiler(object):
+    """Times the loading of the yaycl YAMLs, by YAML"""
+    def __init__(self):
+        self.files = defaultdict(float)
+        self._depth = 0
+
+    def install(self):
+        import yaycl
+        populate = yaycl.Config._populate
+        profiler = self
+
+        def _populate(config, key):
+            profiler._depth += 1
+            started = time.time()
+            try:
+                return populate(config, key)
+            finally:
+                profiler._depth -= 1
+                if not profiler._depth:
+                    profiler.files[key] += time.time() - started
+        yaycl.Config._populate = _populate
+
+
+def hookwrapper(func):
+    """Marks a hook of :py:class:`StartupTimer` as a hook wrapper, without importing pytest"""
+    func.hookwrapper = True
+    return func
+
+
+class StartupTimer(object):
+    """pytest plugin timing the phases of the startup
+
+    The phases follow each other, every call of :py:meth:`phase` ends the current phase.
+    """
+    def __init__(self, started, imports):
+        self.imports = imports
+        self.phases = []
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self._last = started
+
+    def phase(self, name):
+        now = time.time()
+        self.phases.append([name, now - self._last, self.imports.between(self._last, now)])
+        self._last = now
+
+    def pytest_plugin_registered(self, plugin, manager):
+        self.counts['plugins'] += 1
+
+    @hookwrapper
+    def pytest_load_initial_conftests(self, early_config, parser, args):
+        self.phase('plugins')
+        yield
+        self.phase('conftests')
+
+    @hookwrapper
+    def pytest_cmdline_main(self, config):
+        self.phase('options')
+        yield
+
+    # pytest_configure is historic, it can't be wrapped, it is between these two
+    @hookwrapper
+    def pytest_sessionstart(self, session):
+        self.phase('configure')
+        yield
+
+    @hookwrapper
+    def pytest_collection(self, session):
+        self.phase('session start')
+        yield
+        self.phase('collection')
+
+    @hookwrapper
+    def pytest_generate_tests(self, metafunc):
+        started = time.time()
+        yield
+        self.durations['testgen'] += time.time() - started
+        self.counts['testgen calls'] += 1
+
+    @hookwrapper
+    def pytest_collection_modifyitems(self, session, config, items):
+        started = time.time()
+        yield
+        self.durations['modifyitems'] += time.time() - started
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.counts['collection errors'] += 1
+
+    def pytest_collection_finish(self, session):
+        self.counts['items'] = len(session.items)
+
+
+def profile_startup(output, conf_dir, pytest_args):
+    """Runs pytest with ``pytest_args`` in this process and writes the timings to ``output``"""
+    started = time.time()
+    imports = ImportProfiler()
+    imports.install()
+    config_loads = ConfigLoadProfiler()
+    config_loads.install()
+    # before anything reads it, see cfme.utils.conf
+    from py.path import local
+    from cfme.utils import path
+    path.conf_path = local(conf_dir)
+    import pytest
+
+    timer = StartupTimer(started, imports)
+    timer.phase('bootstrap')
+    exit_code = pytest.main(pytest_args, plugins=[timer])
+    timer.phase('finish')
+    finished = time.time()
+    imports.uninstall()
+
+    measures = {}
+    for name, duration, importing in timer.phases:
+        measures['phase.{}'.format(name)] = duration
+        measures['phase.{}.importing'.format(name)] = importing
+    measures.update(timer.durations)
+    measures['total'] = finished - started
+    measures['imports'] = imports.between(started, finished)
+    measures['config'] = sum(config_loads.files.values())
+    for module, _, _, _, cumulative in imports.rows:
+        measures['import.{}'.format(module)] = cumulative
+    counts = dict(timer.counts, modules=len(sys.modules), exit_code=exit_code)
+    with open(output, 'w') as f:
+        json.dump({
+            'phases': timer.phases,
+            'config': dict(config_loads.files),
+            'imports': imports.rows,
+            'counts': counts,
+            'measures': measures,
+        }, f)
+    return exit_code
+
+
+def test_flags():
+    """All the ``test_flag`` of the tests, defined in the synthetic configuration"""
+    flags = set()
+    for dirpath, _, filenames in os.walk(os.path.join(PROJECT_PATH, 'cfme', 'tests')):
+        for filename in filenames:
+            if filename.endswith('.py'):
+                with open(os.path.join(dirpath, filename)) as f:
+                    for match in TEST_FLAG.findall(f.read()):
+                        flags.update(flag.strip() for flag in match.split(','))
+    return sorted(flags)
+
+
+def write_config(conf_dir, copies):
+    """Writes the synthetic YAMLs with ``copies`` fake providers of every type to ``conf_dir``"""
+    import yaml
+    providers = {}
+    for prov_type, template in sorted(FAKE_PROVIDERS.items()):
+        for i in range(copies):
+            key = '{}-{}'.format(prov_type, i)
+            data = json.loads(json.dumps(template).replace('{key}', key))
+            data.update(FAKE_PROVIDER_DATA, type=prov_type, name='Fake {} {}'.format(prov_type, i))
+            providers[key] = data
+    files = {
+        'cfme_data': {'basic_info': {'app_version': '5.9'}, 'management_systems': providers,
+                      'test_flags': ','.join(test_flags())},
+        'credentials': FAKE_CREDENTIALS,
+        # no trackerbot, sprout or artifactor, nothing is contacted
+        'env': {'appliances': [{'hostname': 'appliance.example.com'}],
+                'browser': {'webdriver': 'Firefox'}},
+    }
+    for name, data in files.items():
+        with open(os.path.join(conf_dir, '{}.yaml'.format(name)), 'w') as f:
+            yaml.safe_dump(data, f, default_flow_style=False)
+
+
+def remove_bytecode():
+    """Removes the bytecode of the framework packages, for a cold start"""
+    for package in FRAMEWORK_PACKAGES:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(PROJECT_PATH, package)):
+            if '__pycache__' in dirnames:
+                dirnames.remove('__pycache__')
+                shutil.rmtree(os.path.join(dirpath, '__pycache__'), ignore_errors=True)
+            for filename in filenames:
+                if filename.endswith(('.pyc', '.pyo')):
+                    os.remove(os.path.join(dirpath, filename))
+
+
+def run(python, conf_dir, pytest_args, work_dir):
+    """Profiles one startup in a new process, returns its results"""
+    output = os.path.join(work_dir, 'result.json')
+    log = os.path.join(work_dir, 'pytest.log')
+    started = time.time()
+    with open(log, 'w') as f:
+        subprocess.call(
+            [python, os.path.abspath(__file__), '--child', output, '--conf-dir', conf_dir, '--'] +
+            pytest_args, stdout=f, stderr=subprocess.STDOUT, cwd=PROJECT_PATH)
+    process = time.time() - started
+    if not os.path.exists(output):
+        with open(log) as f:
+            sys.stderr.write(''.join(f.readlines()[-30:]))
+        raise RuntimeError('The profiled startup failed, see its output above')
+    with open(output) as f:
+        result = json.load(f)
+    os.remove(output)
+    result['measures']['process'] = process
+    return result
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.
+
+
+def merge(results):
+    """Median of the measures of ``results``, the other data of the first one"""
+    merged = dict(results[0])
+    keys = set(key for result in results for key in result['measures'])
+    merged['measures'] = {
+        key: median([result['measures'].get(key, 0.) for result in results]) for key in keys}
+    merged['runs'] = len(results)
+    return merged
+
+
+def compare(baseline, current, threshold, min_delta):
+    """Returns ``[(key, baseline, current)]`` of the measures of ``current`` which regressed
+
+    A measure regressed when it is slower than the baseline by more than ``threshold`` (relative)
+    and ``min_delta`` seconds. Imports under :py:data:`IMPORT_FLOOR` are ignored.
+    """
+    regressions = []
+    for mode, result in sorted(current.items()):
+        if mode not in baseline:
+            continue
+        old_measures = baseline[mode]['measures']
+        new_measures = result['measures']
+        for key in sorted(set(old_measures) | set(new_measures)):
+            old, new = old_measures.get(key, 0.), new_measures.get(key, 0.)
+            if key.startswith('import.') and max(old, new) < IMPORT_FLOOR:
+                continue
+            if new - old > max(min_delta, old * threshold):
+                regressions.append(('{}.{}'.format(mode, key), old, new))
+    return regressions
+
+
+def package(modules):
+    """Package an import is accounted to, ``cfme.<subpackage>`` for the framework"""
+    parts = modules.split(', ')[0].split('.')
+    return '.'.join(parts[:2]) if parts[0] == 'cfme' else parts[0]
+
+
+def report(results, top):
+    for mode, result in sorted(results.items()):
+        measures = result['measures']
+        counts = result['counts']
+        print('\n{} start, {} run(s): {:.2f}s in the process, {:.2f}s in total'.format(
+            mode, result['runs'], measures['total'], measures['process']))
+        print('  {items} items, {plugins} plugins, {modules} modules, '
+              '{errors} collection errors'.format(
+                  items=counts.get('items', 0), plugins=counts.get('plugins', 0),
+                  modules=counts.get('modules', 0), errors=counts.get('collection errors', 0)))
+        row = '  {:<16}{:>10}{:>12}'
+        print(row.format('phase', 'seconds', 'importing'))
+        for name, _, _ in result['phases']:
+            print(row.format(name, '{:.3f}'.format(measures['phase.{}'.format(name)]),
+                             '{:.3f}'.format(measures['phase.{}.importing'.format(name)])))
+        print(row.format('(testgen)', '{:.3f}'.format(measures.get('testgen', 0.)), ''))
+        print(row.format('(modifyitems)', '{:.3f}'.format(measures.get('modifyitems', 0.)), ''))
+        print(row.format('(config load)', '{:.3f}'.format(measures['config']), ''))
+
+    mode = 'cold' if 'cold' in results else 'warm'
+    result = results[mode]
+    by_package = defaultdict(float)
+    for module, _, _, self_time, _ in result['imports']:
+        by_package[package(module)] += self_time
+    print('\nSelf import time by package ({} start):'.format(mode))
+    for name, self_time in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print('  {:>8.3f}s  {}'.format(self_time, name))
+    print('\nSlowest imports (cumulative, self, module <- importer):')
+    for module, importer, _, self_time, cumulative in sorted(
+            result['imports'], key=lambda row: -row[4])[:top]:
+        print('  {:>8.3f}s {:>8.3f}s  {} <- {}'.format(
+            cumulative, self_time, module, importer or '-'))
+    print('\nYAMLs loaded: {}'.format(', '.join(
+        '{} {:.3f}s'.format(name, duration) for name, duration in sorted(
+            result['config'].items(), key=lambda item: -item[1]))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--warm', type=int, default=3, help='Number of warm runs')
+    parser.add_argument('--no-cold', dest='cold', action='store_false',
+                        help='Do not remove the bytecode of the framework for a cold run')
+    parser.add_argument('--providers', type=int, default=2,
+                        help='Fake providers of every type in the synthetic configuration')
+    parser.add_argument('--appliance-version', default='5.9',
+                        help='Version of the dummy appliance')
+    parser.add_argument('--python', default=sys.executable, help='Python to run pytest with')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Save the results as the baseline')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='File to save the results to')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown from the baseline which is a regression')
+    parser.add_argument('--min-delta', type=float, default=0.1,
+                        help='Slowdown in seconds from the baseline under which is no regression')
+    parser.add_argument('--top', type=int, default=20, help='Number of imports to show')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--conf-dir', help=argparse.SUPPRESS)
+    parser.add_argument('pytest_args', nargs='*',
+                        help='Tests to collect and pytest options, after --, cfme/tests by default')
+    args = parser.parse_args()
+
+    if args.child:
+        return profile_startup(args.child, args.conf_dir, args.pytest_args)
+
+    tests = args.pytest_args or ['cfme/tests']
+    pytest_args = ['--collect-only', '-q', '--dummy-appliance',
+                   '--dummy-appliance-version', args.appliance_version] + tests
+    work_dir = tempfile.mkdtemp(prefix='benchmark_startup_')
+    try:
+        conf_dir = os.path.join(work_dir, 'conf')
+        os.mkdir(conf_dir)
+        write_config(conf_dir, args.providers)
+        results = {}
+        if args.cold:
+            remove_bytecode()
+            results['cold'] = merge([run(args.python, conf_dir, pytest_args, work_dir)])
+        if args.warm:
+            results['warm'] = merge(
+                [run(args.python, conf_dir, pytest_args, work_dir) for _ in range(args.warm)])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if not results:
+        parser.error('Nothing to run, use at least one warm run or the cold one')
+
+    results = {'created': time.time(), 'python': args.python, 'tests': tests,
+               'results': results}
+    report(results['results'], args.top)
+    for filename in [args.output] + ([args.baseline] if args.save_baseline else []):
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'w') as f:
+            json.dump(results, f)
+    print('\nResults saved to {}'.format(args.output))
+    if args.save_baseline:
+        print('Baseline saved to {}'.format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}, save one with --save-baseline'.format(args.baseline))
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['tests'] != tests:
+        print('The baseline collected {} instead'.format(' '.join(baseline['tests'])))
+    for mode, result in sorted(results['results'].items()):
+        old_items = baseline['results'].get(mode, {}).get('counts', {}).get('items')
+        if old_items is not None and old_items != result['counts'].get('items'):
+            print('{} items in the {} baseline, {} now'.format(
+                old_items, mode, result['counts'].get('items')))
+    regressions = compare(baseline['results'], results['results'], args.threshold, args.min_delta)
+    if not regressions:
+        print('No regression from the baseline')
+        return 0
+    print('\nRegressions from the baseline (over {:.0%} and {}s):'.format(
+        args.threshold, args.min_delta))
+    for key, old, new in sorted(regressions, key=lambda item: item[1] - item[2]):
+        print('  {:>8.3f}s -> {:>8.3f}s  {}'.format(old, new, key))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python2
+"""Benchmark of the traceback clustering of the test report.
+
+Clusters synthetic short tracebacks of ``--clusters`` known causes by
+:py:class:`cfme.utils.traceback_clusters.TracebackClusters` and by the ``difflib`` loop the
+report used before, and prints their time and how many clusters they found.
+
+    python scripts/benchmark_tb_clusters.py --failures 1000 10000 50000
+"""
+import argparse
+import difflib
+import random
+import sys
+import time
+
+from cfme.utils.traceback_clusters import TracebackClusters
+
+EXCEPTIONS = ['TimedOutError', 'NoSuchElementException', 'AssertionError', 'KeyError',
+              'APIException', 'ItemNotFound', 'CandidateNotFound', 'ValueError',
+              'StaleElementReferenceException', 'MoveTargetOutOfBoundsException']
+WORDS = ['provider', 'vm', 'host', 'datastore', 'button', 'dialog', 'request', 'service',
+         'catalog', 'tenant', 'quota', 'refresh', 'power', 'snapshot', 'template', 'cluster',
+         'volume', 'network', 'tag', 'policy', 'alert', 'schedule', 'report', 'widget',
+         'container', 'project', 'pod', 'image', 'stack', 'flavor', 'zone', 'region']
+
+
+def synthetic_tracebacks(failures, clusters, rnd):
+    """Returns ``(short traceback, cause)`` of ``failures`` failures of ``clusters`` causes
+
+    Cause sizes are skewed like in real runs. Failures of a cause differ by addresses, ids,
+    timestamps, quoted values, line numbers and one of three methods called.
+    """
+    causes = []
+    for cause in range(clusters):
+        words = rnd.sample(WORDS, 8)
+        exception = EXCEPTIONS[cause % len(EXCEPTIONS)]
+        template = (
+            '    def test_{w[0]}_{w[1]}(appliance, {w[2]}):\n'
+            '>       {w[3]}.{{method}}({w[4]}={{value!r}})\n'
+            'E       {exception}: {w[5]} {w[6]} of {{value!r}} at {{address}} (id {{id}}) did '
+            'not {w[7]} by {{time}}\n'
+            'cfme/{w[0]}/{w[1]}.py:{{line}}: {exception}\n'
+            '{exception}\n').format(w=words, exception=exception)
+        methods = ['wait_for_{}'.format(words[7]), 'check_{}'.format(words[2]),
+                   'get_{}'.format(words[5])]
+        causes.append((template, methods, words[0]))
+    weights = [1. / (cause + 1) for cause in range(clusters)]
+    tracebacks = []
+    for _ in range(failures):
+        cause = weighted_choice(weights, rnd)
+        template, methods, name = causes[cause]
+        tracebacks.append((template.format(
+            method=rnd.choice(methods),
+            value='{}-{}'.format(name, rnd.randint(0, 10 ** 6)),
+            address=hex(rnd.randint(0, 2 ** 48)),
+            id=rnd.randint(1, 10 ** 12),
+            time='2018-05-{:02d} {:02d}:{:02d}:{:02d}'.format(
+                rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59), rnd.randint(0, 59)),
+            line=rnd.randint(10, 2000)), cause))
+    return tracebacks
+
+
+def weighted_choice(weights, rnd):
+    point = rnd.uniform(0, sum(weights))
+    for index, weight in enumerate(weights):
+        point -= weight
+        if point <= 0:
+            return index
+    return len(weights) - 1
+
+
+def difflib_clusters(tb_errors):
+    """The clustering the report did before, returns the clusters as lists of entries"""
+    sets = []
+    for entry in tb_errors:
+        for tset in sets:
+            if difflib.SequenceMatcher(a=entry[0][:10], b=tset[0][0][:10]).ratio() > .8:
+                if difflib.SequenceMatcher(a=entry[0][:20], b=tset[0][0][:20]).ratio() > .75:
+                    if difflib.SequenceMatcher(a=entry[0][:30], b=tset[0][0][:30]).ratio() > .7:
+                        tset.append(entry)
+                        break
+        else:
+            sets.append([entry])
+    return sets
+
+
+def lsh_clusters(tb_errors):
+    clusters = TracebackClusters()
+    for entry in tb_errors:
+        clusters.add(*entry)
+    return [cluster.entries for cluster in clusters.clusters()]
+
+
+def measure(function, tb_errors):
+    started = time.time()
+    clusters = function(tb_errors)
+    elapsed = time.time() - started
+    # clusters holding failures of more than one cause
+    mixed = sum(1 for cluster in clusters if len(set(cause for _, cause in cluster)) > 1)
+    return elapsed, len(clusters), mixed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--failures', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='Numbers of failures to cluster')
+    parser.add_argument('--clusters', type=int, default=200, help='Number of known causes')
+    parser.add_argument('--difflib-limit', type=int, default=10000,
+                        help='Skip the difflib loop above this number of failures')
+    args = parser.parse_args()
+
+    row = '{:>10}{:>10}{:>10}{:>10}{:>10}{:>10}'
+    print(row.format('failures', 'causes', 'method', 'seconds', 'clusters', 'mixed'))
+    for failures in args.failures:
+        tracebacks = synthetic_tracebacks(failures, args.clusters, random.Random(failures))
+        causes = len(set(cause for _, cause in tracebacks))
+        methods = [('lsh', lsh_clusters)]
+        if failures <= args.difflib_limit:
+            methods.append(('difflib', difflib_clusters))
+        for name, function in methods:
+            elapsed, clusters, mixed = measure(function, tracebacks)
+            print(row.format(failures, causes, name, round(elapsed, 2), clusters, mixed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
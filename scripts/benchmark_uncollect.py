@@ -0,0 +1,176 @@
+#!/usr/bin/env python2
+"""Benchmark of the evaluation of the ``uncollectif`` markers at collection.
+
+Builds a synthetic collection of ``--items`` items parametrized by providers, versions and a few
+other fixtures repeating across the items, and evaluates their ``uncollectif`` markers by
+:py:class:`cfme.markers.uncollect.UncollectEngine` and by the evaluation done before it, which
+introspected and called every condition for every item.
+
+    python scripts/benchmark_uncollect.py --items 20000
+"""
+import argparse
+import inspect
+import random
+import sys
+import time
+
+from cfme.markers.uncollect import UncollectEngine, get_uncollect_function
+from cfme.test_framework.appliance import PLUGIN_KEY
+from cfme.utils.pytest_shortcuts import extract_fixtures_values
+from cfme.utils.version import Version
+
+PROVIDER_TYPES = ['ec2', 'azure', 'gce', 'openstack', 'rhevm', 'virtualcenter', 'scvmm',
+                  'openshift', 'redhat', 'lenovo']
+CATEGORIES = {'ec2': 'cloud', 'azure': 'cloud', 'gce': 'cloud', 'openstack': 'cloud',
+              'rhevm': 'infra', 'virtualcenter': 'infra', 'scvmm': 'infra',
+              'openshift': 'containers', 'redhat': 'infra', 'lenovo': 'physical'}
+
+
+class FakeProvider(object):
+    def __init__(self, type_, version):
+        self.type = type_
+        self.category = CATEGORIES[type_]
+        self.version = version
+        self.key = '{}-{}'.format(type_, version)
+
+    def one_of(self, *types):
+        return self.type in types
+
+
+class FakeAppliance(object):
+    version = Version('5.9.2.1')
+
+
+class FakeHolder(object):
+    held_appliance = FakeAppliance()
+
+
+class FakePluginManager(object):
+    def get_plugin(self, name):
+        return FakeHolder() if name == PLUGIN_KEY else None
+
+
+class FakeConfig(object):
+    pluginmanager = FakePluginManager()
+
+
+class FakeMark(object):
+    def __init__(self, condition, reason):
+        self.args = (condition,)
+        self.kwargs = {'reason': reason}
+
+    def __iter__(self):
+        return iter([self])
+
+
+class FakeCallSpec(object):
+    def __init__(self, params):
+        self.params = params
+
+
+class FakeRequest(object):
+    def __init__(self, funcargnames):
+        self.funcargnames = funcargnames
+
+
+class FakeItem(object):
+    config = FakeConfig()
+
+    def __init__(self, name, marks, params):
+        self.name = name
+        self.marks = marks
+        self.callspec = FakeCallSpec(params)
+        self._request = FakeRequest(list(params) + ['appliance'])
+
+    def get_marker(self, name):
+        return self.marks if name == 'uncollectif' else None
+
+
+CONDITIONS = [
+    (lambda provider: provider.one_of('ec2', 'gce'), 'Not supported on public clouds'),
+    (lambda provider: provider.category != 'infra', 'Infra providers only'),
+    (lambda appliance, provider: appliance.version < '5.9' and provider.one_of('azure'),
+     'Azure needs 5.9'),
+    (lambda provider, collection_name: collection_name == 'services' and
+     provider.one_of('scvmm', 'redhat'), 'No services on the provider'),
+    (lambda appliance, collection_name: appliance.version < '5.10' and
+     collection_name == 'clusters', 'Clusters come with 5.10'),
+    (lambda provider, power_state: power_state == 'suspended' and
+     provider.one_of('openstack', 'ec2', 'azure'), 'Cloud can not suspend'),
+    (lambda provider: provider.version < 6, 'Old provider'),
+]
+
+
+def synthetic_items(items, rnd):
+    """Returns ``items`` test items parametrized like the provider tests"""
+    providers = [FakeProvider(type_, version)
+                 for type_ in PROVIDER_TYPES for version in (5, 6, 7)]
+    collection_names = ['vms', 'hosts', 'services', 'clusters', 'datastores']
+    power_states = ['on', 'off', 'suspended']
+    tests = []
+    while len(tests) * len(providers) < items:
+        conditions = rnd.sample(CONDITIONS, rnd.randint(1, 2))
+        tests.append(('test_{}'.format(len(tests)),
+                      [FakeMark(*condition) for condition in conditions]))
+    result = []
+    for name, marks in tests:
+        for provider in providers:
+            params = {'provider': provider, 'collection_name': rnd.choice(collection_names),
+                      'power_state': rnd.choice(power_states)}
+            result.append(FakeItem('{}[{}]'.format(name, provider.key), marks, params))
+    return result[:items]
+
+
+def legacy_uncollectif(item):
+    """The evaluation done before the engine, without its debug logging"""
+    markers = item.get_marker('uncollectif')
+    if not markers:
+        return False, None
+    for mark in markers:
+        log_msg = 'Trying uncollecting {}: {}'.format(
+            item.name,
+            mark.kwargs.get('reason', 'No reason given'))
+        try:
+            arg_names = inspect.getargspec(get_uncollect_function(mark)).args
+        except TypeError:
+            return not bool(mark.args[0]), mark.kwargs.get('reason', 'No reason given')
+        assert log_msg
+        app = item.config.pluginmanager.get_plugin(PLUGIN_KEY).held_appliance
+        values = extract_fixtures_values(item)
+        values.update({'appliance': app})
+        args = [values[arg] for arg in arg_names]
+        retval = mark.args[0](*args)
+        if retval:
+            return retval, mark.kwargs.get('reason', "No reason given")
+        else:
+            return False, None
+    else:
+        return False, None
+
+
+def measure(evaluate, items):
+    started = time.time()
+    uncollected = sum(1 for item in items if evaluate(item)[0])
+    return time.time() - started, uncollected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=20000, help='Number of collected items')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic collection')
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items, random.Random(args.seed))
+    engine = UncollectEngine()
+    row = '{:>10}{:>10}{:>14}'
+    print(row.format('method', 'seconds', 'uncollected'))
+    for name, evaluate in [('legacy', legacy_uncollectif), ('engine', engine.evaluate)]:
+        elapsed, uncollected = measure(evaluate, items)
+        print(row.format(name, round(elapsed, 3), uncollected))
+    for line in engine.summary():
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
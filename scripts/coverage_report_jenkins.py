@@ -8,6 +8,7 @@ import py
 import re
 import requests
 import subprocess
+import tarfile
 import time
 
 from collections import namedtuple
@@ -15,6 +16,7 @@ from requests.auth import HTTPBasicAuth
 from six.moves.urllib.parse import urlsplit, urlunsplit
 
 from cfme.test_framework.sprout.client import SproutClient
+from cfme.utils import simplecov
 from cfme.utils.appliance import IPAppliance
 from cfme.utils.conf import credentials, env
 from cfme.utils.log import logger, add_stdout_handler
@@ -757,8 +759,73 @@ def download_and_merge_coverage_data(ssh, builds, jenkins_data, wave_size):
             )
 
 
+def download_and_merge_coverage_data_locally(ssh, builds, jenkins_data):
+    """Download and merge coverage data locally.
+
+    The coverage tarballs are downloaded and merged one by one on this machine with
+    :py:mod:`cfme.utils.simplecov`.  Only the merged .resultset.json file is uploaded to
+    the appliance, laid out as a single result set (1/1/.resultset.json), so that the
+    coverage_merger.rb run in :py:func:`merge_coverage_data` just adds the non-covered
+    files and generates the HTML report.
+
+    Args:
+        ssh:  ssh object
+        builds:  jenkins job builds from which to pull coverage data.
+        jenkins_data:  Named tupple with these attributes:  url, user, token, client
+
+    Returns:
+        Nothing
+    """
+    coverage = {}
+    timestamp = 0
+    work_dir = py.path.local.mkdtemp()
+    try:
+        for build in builds:
+            logger.info('Downloading the coverage data from build %s', build.number)
+            url = '{}/job/{}/{}/artifact/{}'.format(
+                jenkins_data.url, build.job, build.number, build.coverage_archive)
+            archive = work_dir.join('coverage.tgz')
+            response = requests.get(
+                url, verify=False, stream=True,
+                auth=HTTPBasicAuth(jenkins_data.user, jenkins_data.token))
+            response.raise_for_status()
+            with archive.open('wb') as f:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
+
+            logger.info('Merging the coverage data from build %s', build.number)
+            build_dir = work_dir.ensure(str(build.number), dir=True)
+            with tarfile.open(archive.strpath) as tar:
+                tar.extractall(build_dir.strpath)
+            # The archive has a top level directory, hence the extra level
+            coverage, build_timestamp, skipped = simplecov.merge_resultsets(
+                simplecov.find_resultsets(build_dir.strpath, depth=3), coverage=coverage)
+            timestamp = max(timestamp, build_timestamp)
+            for resultset in skipped:
+                logger.error('Skipped invalid resultset %s of build %s', resultset, build.number)
+            build_dir.remove()
+            archive.remove()
+
+        merged_resultset = work_dir.join('.resultset.json')
+        simplecov.write_resultset(merged_resultset.strpath, coverage, timestamp)
+
+        merged_data_dir = py.path.local(COVERAGE_DIR).join('/1/1')
+        ssh_run_cmd(
+            ssh=ssh,
+            cmd='mkdir -p {}'.format(merged_data_dir),
+            error_msg='Could not make new merged data dir: {}'.format(merged_data_dir))
+        logger.info('Uploading merged coverage data to the appliance')
+        ssh.put_file(merged_resultset.strpath, merged_data_dir.join('.resultset.json').strpath)
+    finally:
+        work_dir.remove(ignore_errors=True)
+
+    merge_coverage_data(
+        ssh=ssh,
+        coverage_dir=COVERAGE_DIR)
+
+
 def aggregate_coverage(appliance, jenkins_url, jenkins_user, jenkins_token, jenkins_jobs,
-        wave_size):
+        wave_size, local_merge=True):
     """ Aggregates code coverage data across the builds of specified jenkins jobs
 
     Given the version of the specified appliance, find all builds for the specified jenkins
@@ -773,6 +840,7 @@ def aggregate_coverage(appliance, jenkins_url, jenkins_user, jenkins_token, jenk
         jenkins_token:  Jenkins user authentication token.
         jenkins_jobs:  Jenkins job names from which to aggregate coverage data
         wave_size:  How many coverage tarballs to extract at a time when merging
+        local_merge:  Merge the coverage data locally instead of on the appliance
 
     Returns:
         Nothing
@@ -824,11 +892,17 @@ def aggregate_coverage(appliance, jenkins_url, jenkins_user, jenkins_token, jenk
     # Merge data and do sonar scan
     with appliance.ssh_client as ssh:
         setup_appliance_for_merger(appliance, ssh)
-        download_and_merge_coverage_data(
-            ssh=ssh,
-            builds=eligible_builds,
-            jenkins_data=jenkins_data,
-            wave_size=wave_size)
+        if local_merge:
+            download_and_merge_coverage_data_locally(
+                ssh=ssh,
+                builds=eligible_builds,
+                jenkins_data=jenkins_data)
+        else:
+            download_and_merge_coverage_data(
+                ssh=ssh,
+                builds=eligible_builds,
+                jenkins_data=jenkins_data,
+                wave_size=wave_size)
         pull_merged_coverage_data(
             ssh=ssh,
             coverage_dir=COVERAGE_DIR)
@@ -857,8 +931,10 @@ def aggregate_coverage(appliance, jenkins_url, jenkins_user, jenkins_token, jenk
     help='Jenkins user authentication token')
 @click.option('--wave-size', 'wave_size', default=10,
     help='How many coverage tarballs to extract at a time when merging')
+@click.option('--local-merge/--appliance-merge', 'local_merge', default=True,
+    help='Merge coverage data locally (default) or on the appliance')
 def coverage_report_jenkins(jenkins_url, jenkins_jobs, jenkins_user, jenkins_token, appliance_ip,
-        appliance_version, wave_size):
+        appliance_version, wave_size, local_merge):
     """Aggregate coverage data from jenkins job(s) and upload to sonarqube"""
     if appliance_ip is None and appliance_version is None:
         ValueError('Must specify either --appliance-ip or --find-appliance')
@@ -890,7 +966,8 @@ def coverage_report_jenkins(jenkins_url, jenkins_jobs, jenkins_user, jenkins_tok
                     jenkins_user,
                     jenkins_token,
                     jenkins_jobs,
-                    wave_size))
+                    wave_size,
+                    local_merge))
 
         finally:
             with diaper:
@@ -904,7 +981,8 @@ def coverage_report_jenkins(jenkins_url, jenkins_jobs, jenkins_user, jenkins_tok
                 jenkins_user,
                 jenkins_token,
                 jenkins_jobs,
-                wave_size))
+                wave_size,
+                local_merge))
 
 
 if __name__ == '__main__':
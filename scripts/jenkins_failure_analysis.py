@@ -4,6 +4,7 @@ from collections import defaultdict
 from jinja2 import Environment, FileSystemLoader
 from cfme.utils.path import template_path, log_path
 from cfme.utils.conf import jenkins
+from cfme.utils.traceback_clusters import TracebackClusters
 
 
 def get_json(run):
@@ -17,6 +18,7 @@ template_env = Environment(
 )
 
 tests = defaultdict(dict)
+failures = TracebackClusters()
 
 runs = [(run['name'], run['ver']) for run in jenkins['runs']]
 
@@ -29,11 +31,16 @@ for run, ver in sorted(runs):
         tests[test_name][ver] = {
             'status': case['status'],
             'age': case['age']}
+        if case['status'] in ('FAILED', 'REGRESSION'):
+            failures.add(
+                case.get('errorStackTrace') or case.get('errorDetails') or '',
+                (test_name, ver))
 
 test_index = sorted(tests)
 
-data = template_env.get_template('jenkins_report.html').render(tests=tests,
-                                                               runs=runs, test_index=test_index)
+data = template_env.get_template('jenkins_report.html').render(
+    tests=tests, runs=runs, test_index=test_index, failure_clusters=failures.top(10),
+    failures_without_traceback=len(failures.without_traceback))
 
 f = open(log_path.strpath + '/jenkins.html', "w")
 f.write(data)
@@ -48,6 +48,7 @@ with open(os.path.join(data_path.strpath, 'suite.yaml')) as f:
     suite_data = yaml.safe_load(f)
 
 
+# doc_data.yaml is generated by collecting the tests with py.test --doc-data
 with open('doc_data.yaml') as f:
     doc_data = yaml.load(f)
 
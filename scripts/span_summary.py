@@ -0,0 +1,100 @@
+#!/usr/bin/env python2
+"""Ranks the most expensive call sites of a run recorded by ``--span-profile``.
+
+Reads the trees of spans of the tests (see :py:mod:`cfme.fixtures.span_profile`) and sums the
+spans by name and call site. ``total`` is the time spent in the spans, ``self`` the part of it not
+spent in their child spans.
+
+    python scripts/span_summary.py log/spans/*.jsonl --top 30 --sort self
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+# --sort choices, attributes of SiteStats
+SORT_KEYS = {'total': 'total', 'self': 'self_time', 'count': 'count', 'max': 'max'}
+
+
+class SiteStats(object):
+    __slots__ = ('count', 'total', 'self_time', 'max', 'tests')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.self_time = 0.
+        self.max = 0.
+        self.tests = set()
+
+
+def walk(span, test, stats):
+    """Adds the children of ``span`` and their children to ``stats``"""
+    for child in span[4]:
+        name, site, _, duration, children = child
+        if duration is None:
+            # left open, the test was interrupted
+            continue
+        site_stats = stats[name, site]
+        site_stats.count += 1
+        site_stats.total += duration
+        site_stats.self_time += duration - sum(c[3] or 0 for c in children)
+        site_stats.max = max(site_stats.max, duration)
+        site_stats.tests.add(test)
+        walk(child, test, stats)
+
+
+def summarize(lines):
+    """Returns ``{(name, site): SiteStats}``, the number of tests and of dropped spans"""
+    stats = defaultdict(SiteStats)
+    tests = dropped = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        tests += 1
+        dropped += record.get('dropped', 0)
+        walk(record['spans'], record['test'], stats)
+    return stats, tests, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='+', help='JSONL files of --span-profile')
+    parser.add_argument('--top', type=int, default=25, help='Number of call sites to show')
+    parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total',
+                        help='What to rank the call sites by')
+    parser.add_argument('--name', default=None,
+                        help='Only spans whose name starts with this, e.g. wait_for or fixture')
+    args = parser.parse_args()
+
+    lines = []
+    for filename in args.files:
+        with open(filename) as f:
+            lines.extend(f)
+    stats, tests, dropped = summarize(lines)
+    if args.name:
+        stats = {key: value for key, value in stats.items() if key[0].startswith(args.name)}
+
+    by_name = defaultdict(float)
+    for (name, _), site_stats in stats.items():
+        by_name[name.split(' ')[0]] += site_stats.self_time
+    print('{} tests, {} spans dropped over the limit'.format(tests, dropped))
+    print('\nSelf time by kind of span:')
+    for name, self_time in sorted(by_name.items(), key=lambda item: -item[1]):
+        print('  {:<12}{:>12.2f}s'.format(name, self_time))
+
+    sort_key = SORT_KEYS[args.sort]
+    ranked = sorted(stats.items(), key=lambda item: -getattr(item[1], sort_key))[:args.top]
+    print('\nTop {} call sites by {}:'.format(len(ranked), args.sort))
+    row = '{:>10} {:>10} {:>8} {:>9} {:>6}  {}'
+    print(row.format('total', 'self', 'count', 'max', 'tests', 'span @ call site'))
+    for (name, site), site_stats in ranked:
+        print(row.format(
+            '{:.2f}s'.format(site_stats.total), '{:.2f}s'.format(site_stats.self_time),
+            site_stats.count, '{:.2f}s'.format(site_stats.max), len(site_stats.tests),
+            '{} @ {}'.format(name, site)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 import atexit
 import json
 import math
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from datetime import date
 from math import ceil
 from tempfile import NamedTemporaryFile
@@ -51,6 +51,150 @@ class DynamicTableAddError(Exception):
 ManageIQTree = BootstrapTreeview
 
 
+# Serializes all summary tables and summary forms of the page. The page is marked with a token,
+# so the caller learns whether the page was reloaded since the snapshot it holds (arguments[0])
+# was taken. Tables and forms with a title present more than once on the page are set to null.
+SUMMARY_SNAPSHOT_SCRIPT = jsmin('''
+    var token = window.__miqqeSummarySnapshotToken;
+    if (token && token === arguments[0]) {
+        return [token, null];
+    }
+    if (!token) {
+        token = window.__miqqeSummarySnapshotToken = String(Math.random()).substring(2);
+    }
+    function normalize(text) {
+        return (text || '').replace(/\\s+/g, ' ').trim();
+    }
+    function visibleText(el) {
+        var lines = (el.innerText || el.textContent || '').split('\\n');
+        var result = [];
+        for (var i = 0; i < lines.length; i++) {
+            var line = normalize(lines[i]);
+            if (line) {
+                result.push(line);
+            }
+        }
+        return result.join('\\n');
+    }
+    function childImg(el) {
+        for (var i = 0; i < el.children.length; i++) {
+            if (el.children[i].tagName === 'IMG') {
+                var img = el.children[i];
+                return [img.getAttribute('alt'), img.getAttribute('title'), img.src];
+            }
+        }
+        return null;
+    }
+    function childLink(el) {
+        var link = el.querySelector('a');
+        return link ? link.href : null;
+    }
+    function valueOf(cell) {
+        return {text: visibleText(cell), img: childImg(cell), link: childLink(cell)};
+    }
+    var tables = {};
+    var allTables = document.getElementsByTagName('table');
+    for (var t = 0; t < allTables.length; t++) {
+        var table = allTables[t];
+        if (!table.tHead) {
+            continue;
+        }
+        var title = null;
+        var heads = table.tHead.getElementsByTagName('th');
+        for (var h = 0; h < heads.length; h++) {
+            if ((heads[h].getAttribute('align') || '').indexOf('left') !== -1) {
+                title = normalize(heads[h].textContent);
+                break;
+            }
+        }
+        if (title === null) {
+            continue;
+        }
+        if (tables.hasOwnProperty(title)) {
+            tables[title] = null;
+            continue;
+        }
+        var fields = [];
+        var rows = table.tBodies.length ? table.tBodies[0].rows : [];
+        for (var r = 0; r < rows.length; r++) {
+            var cells = rows[r].cells;
+            if (cells.length < 2 || !cells[0].getAttribute('class')) {
+                continue;
+            }
+            var field = valueOf(cells[1]);
+            field.rowspan = cells[0].rowSpan;
+            if (field.rowspan > 1) {
+                field.values = [field.text];
+                for (var s = 1; s < field.rowspan && r + s < rows.length; s++) {
+                    field.values.push(visibleText(rows[r + s].cells[0]));
+                }
+            }
+            fields.push([visibleText(cells[0]), field]);
+        }
+        tables[title] = fields;
+    }
+    var forms = {};
+    var titles = document.getElementsByTagName('h3');
+    for (var f = 0; f < titles.length; f++) {
+        var formTitle = normalize(titles[f].textContent);
+        if (forms.hasOwnProperty(formTitle)) {
+            forms[formTitle] = null;
+            continue;
+        }
+        var items = [];
+        for (var sibling = titles[f].nextElementSibling; sibling;
+                sibling = sibling.nextElementSibling) {
+            if (sibling.tagName !== 'DIV') {
+                continue;
+            }
+            var labels = sibling.getElementsByTagName('label');
+            for (var l = 0; l < labels.length; l++) {
+                var value = labels[l].nextElementSibling;
+                while (value && value.tagName !== 'DIV') {
+                    value = value.nextElementSibling;
+                }
+                if (value) {
+                    items.push([visibleText(labels[l]), valueOf(value)]);
+                }
+            }
+        }
+        forms[formTitle] = items;
+    }
+    return [token, {tables: tables, forms: forms}];
+''')
+
+
+def summary_snapshot(browser):
+    """Returns a snapshot of all the summary tables and summary forms on the current page.
+
+    The whole page is serialized with one JavaScript call and kept on the browser object until
+    the page is reloaded or :py:func:`invalidate_summary_snapshot` is called (the browser plugin
+    does so after every click and keyboard input). Every later call still sends the script to
+    check the token of the page, only that check runs and nothing is serialized then.
+
+    Returns:
+        A dict ``{'tables': {title: fields}, 'forms': {title: fields}}`` where fields is an
+        ordered dict ``{field name: {'text', 'img', 'link', 'rowspan', 'values'}}`` or ``None``
+        if the title is not unique on the page.
+    """
+    cached = getattr(browser, '_summary_snapshot', None)
+    token, data = browser.execute_script(
+        SUMMARY_SNAPSHOT_SCRIPT, cached[0] if cached else None, silent=True)
+    if data is None:
+        return cached[1]
+    snapshot = {
+        kind: {title: None if fields is None else OrderedDict(fields)
+               for title, fields in data[kind].items()}
+        for kind in ('tables', 'forms')}
+    browser._summary_snapshot = (token, snapshot)
+    return snapshot
+
+
+def invalidate_summary_snapshot(browser):
+    """Drops the snapshot taken by :py:func:`summary_snapshot`, e.g. after the page changed."""
+    browser._summary_snapshot = None
+
+
 class SummaryFormItem(Widget):
     """The UI item that shows the values for objects that are NOT VMs, Providers and such ones."""
     LOCATOR = (
@@ -105,9 +249,16 @@ class SummaryForm(Widget):
         Widget.__init__(self, parent, logger=logger)
         self.group_title = group_title
 
+    def _snapshot(self):
+        """Returns items of this form from the page's summary snapshot or None if not there."""
+        return summary_snapshot(self.browser)['forms'].get(self.group_title)
+
     @property
     def items(self):
         """Returns a list of the items names."""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return list(snapshot)
         b = self.browser
         return [b.text(el) for el in b.elements(self.ALL_LABELS)]
 
@@ -132,8 +283,11 @@ class SummaryForm(Widget):
             :py:class:`str` or
             :py:class:`list` in case a few values present for 1 field(covers multiple tags)
         """
-
-        multiple_lines = self.get_item(item_name).text.splitlines()
+        snapshot = self._snapshot()
+        if snapshot is not None and item_name in snapshot:
+            multiple_lines = snapshot[item_name]['text'].splitlines()
+        else:
+            multiple_lines = self.get_item(item_name).text.splitlines()
         if len(multiple_lines) > 1:
             return multiple_lines
         else:
@@ -406,6 +560,78 @@ class Table(VanillaTable):
         './thead/tr/th/div/i[contains(@class, "fa-sort-")]'])
     SORT_LINK = './thead/tr/th[{}]'
     Row = TableRow
+    # Serializes the whole table in one go. HTMLTableElement.rows does not descend into nested
+    # tables, rows with th cells only are considered headers like the HEADERS locator does.
+    READ_BULK_SCRIPT = jsmin('''
+        function isDisplayed(el) {
+            return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+        }
+        function getText(el) {
+            return (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim();
+        }
+        var headers = [];
+        var rows = [];
+        var tableRows = arguments[0].rows;
+        for (var i = 0; i < tableRows.length; i++) {
+            var cells = tableRows[i].cells;
+            var hasData = false;
+            for (var j = 0; j < cells.length; j++) {
+                if (cells[j].tagName === 'TD') {
+                    hasData = true;
+                    break;
+                }
+            }
+            if (!hasData) {
+                if (!rows.length) {
+                    headers = [];
+                    for (var j = 0; j < cells.length; j++) {
+                        headers.push(getText(cells[j]));
+                    }
+                }
+                continue;
+            }
+            var row = [];
+            for (var j = 0; j < cells.length; j++) {
+                row.push([getText(cells[j]), isDisplayed(cells[j]),
+                          cells[j].rowSpan, cells[j].colSpan]);
+            }
+            rows.push(row);
+        }
+        return {headers: headers, rows: rows};
+    ''')
+    BulkCell = namedtuple('BulkCell', ['text', 'displayed', 'rowspan', 'colspan'])
+
+    def read_bulk(self):
+        """Reads headers and all the cells of the table with a single JavaScript call.
+
+        Much faster than iterating over :py:meth:`rows` for big tables, as reading each cell
+        through the row widgets means a few WebDriver round trips per cell.
+
+        Returns:
+            A 2-tuple of list of headers and list of rows, every row being a list of
+            :py:attr:`BulkCell` namedtuples (``text``, ``displayed``, ``rowspan``, ``colspan``).
+        """
+        data = self.browser.execute_script(self.READ_BULK_SCRIPT, self.browser.element(self))
+        rows = [[self.BulkCell(*cell) for cell in row] for row in data['rows']]
+        return data['headers'], rows
+
+    def rows_as_tuples(self, skip_partially_displayed=True):
+        """Returns texts of the table cells as tuples, one tuple per row.
+
+        Uses :py:meth:`read_bulk`, so the whole table is read in one go.
+
+        Args:
+            skip_partially_displayed: Skip rows with any of the cells hidden or spanning more
+                than 1 column, or with another number of cells than headers (e.g. "Totals: ddd"
+                rows in reports).
+        """
+        headers, rows = self.read_bulk()
+        return [
+            tuple(cell.text for cell in row)
+            for row in rows
+            if not skip_partially_displayed or (
+                (not headers or len(row) == len(headers)) and
+                all(cell.displayed and cell.colspan <= 1 for cell in row))]
 
     @property
     def checkbox_all(self):
@@ -490,18 +716,34 @@ class SummaryTable(VanillaTable):
     Todo:
         * Make it work properly with rowspan (that is for the My Company Tags).
 
+    Fields are read from the page's summary snapshot (see :py:func:`summary_snapshot`) when the
+    table is in there, so reading a whole details page takes one full read of the page plus one
+    token check per access. Element based methods (:py:meth:`get_field`, :py:meth:`click_at`)
+    always go through Selenium.
+
     Args:
         title: Title of the table (eg. ``Properties``)
     """
     BASELOC = './/table[./thead/tr/th[contains(@align, "left") and normalize-space(.)={}]]'
     Image = namedtuple('Image', ['alt', 'title', 'src'])
+    USE_SNAPSHOT = True
 
     def __init__(self, parent, title, *args, **kwargs):
         VanillaTable.__init__(self, parent, self.BASELOC.format(quote(title)), *args, **kwargs)
+        self.title = title
+
+    def _snapshot(self):
+        """Returns fields of this table from the page's summary snapshot or None if not there."""
+        if not self.USE_SNAPSHOT:
+            return None
+        return summary_snapshot(self.browser)['tables'].get(self.title)
 
     @property
     def fields(self):
         """Returns a list of the field names in the table (the left column)."""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return list(snapshot)
         fields_names = []
         for field in self:
             if self.browser.get_attribute('class', field[0]):
@@ -545,6 +787,10 @@ class SummaryTable(VanillaTable):
         Returns:
             :py:class:`str`
         """
+        snapshot = self._snapshot()
+        if snapshot is not None and field_name in snapshot:
+            value = snapshot[field_name]
+            return value['values'] if value['rowspan'] > 1 else value['text']
         fields = self.get_field(field_name)
         if isinstance(fields, (list, tuple)):
             return [field.text for field in fields]
@@ -560,6 +806,10 @@ class SummaryTable(VanillaTable):
         Returns:
             A 3-tuple: ``alt``, ``title``, ``src``.
         """
+        snapshot = self._snapshot()
+        if snapshot is not None and field_name in snapshot:
+            img = snapshot[field_name]['img']
+            return self.Image(*img) if img else None
         try:
             img_el = self.browser.element('./img', parent=self.get_field(field_name)[1])
         except NoSuchElementException:
@@ -585,6 +835,7 @@ class SummaryTable(VanillaTable):
 class NestedSummaryTable(SummaryTable):
     HEADER_IN_ROWS = './tbody/tr[1]/td'
     HEADERS = './tbody/tr[1]/td/strong'
+    USE_SNAPSHOT = False
 
     def __init__(self, parent, title, *args, **kwargs):
         SummaryTable.__init__(self, parent, title, *args, **kwargs)
@@ -625,6 +876,7 @@ class ParametrizedSummaryTable(ParametrizedView):
 
 class ContainerSummaryTable(SummaryTable):
     BASELOC = './/div[@head-title={}]//table'
+    USE_SNAPSHOT = False
 
 
 class StatusBox(Widget, ClickableMixin):
@@ -1285,6 +1537,60 @@ class JSPaginationPane(View, ReportDataControllerMixin):
 
     The intention of this view is to use it as nested view on f.e. Infrastructure Providers page.
     """
+    #: The most items ManageIQ shows on a page
+    MAX_ITEMS_PER_PAGE = 1000
+    # Sends commands to the report data controller and tells whether the paginator is displayed,
+    # shared by the scripts below
+    GTL_FUNCTIONS = '''
+        function gtl(action, data) {
+            var message = {controller: 'reportDataController', action: action};
+            if (data !== undefined) {
+                message.data = [data];
+            }
+            sendDataWithRx(message);
+            return ManageIQ.qe.gtl.result;
+        }
+        function paginatorDisplayed() {
+            return document.getElementById('paging_div') !== null ||
+                document.getElementsByTagName('miq-pagination').length !== 0;
+        }
+    '''
+    # Sets the items per page (arguments[0]), or goes to the first page once they are set.
+    # Returns whether a page is being loaded and the items per page found, null if there's no
+    # paginator.
+    PREPARE_PAGES_SCRIPT = jsmin(GTL_FUNCTIONS + '''
+        if (!paginatorDisplayed()) {
+            return null;
+        }
+        var itemsPerPage = gtl('get_items_per_page');
+        if (itemsPerPage != arguments[0]) {
+            gtl('set_items_per_page', arguments[0]);
+            return [true, itemsPerPage];
+        }
+        if (gtl('get_current_page') != 1) {
+            gtl('first_page');
+            return [true, itemsPerPage];
+        }
+        return [false, itemsPerPage];
+    ''')
+    # Reads the state and the items of the current page and moves on to the next page if there is
+    # one, all in one call. The items are copied before the next page replaces them.
+    READ_PAGE_SCRIPT = jsmin(GTL_FUNCTIONS + '''
+        if (!paginatorDisplayed()) {
+            return null;
+        }
+        var state = {
+            page: gtl('get_current_page'),
+            pages: gtl('get_pages_amount'),
+            items: JSON.parse(JSON.stringify(gtl('get_all_items') || []))
+        };
+        state.advanced = state.pages !== null && state.page < state.pages;
+        if (state.advanced) {
+            gtl('next_page');
+        }
+        return state;
+    ''')
+
     @property
     def is_displayed(self):
         # upstream sometimes shows old pagination page and sometime new one
@@ -1366,6 +1672,67 @@ class JSPaginationPane(View, ReportDataControllerMixin):
         else:
             return
 
+    def bulk_pages(self, items_per_page=MAX_ITEMS_PER_PAGE, stop=None):
+        """Generator of the items of all the pages, by one JS call per page
+
+        Sets ``items_per_page`` once and starts at the first page. Every call reads the items of
+        the page and moves on to the next page right away. The items per page set before are set
+        back once the generator is exhausted or closed, use ``stop`` to be left on the page of an
+        item then.
+
+        Args:
+            items_per_page: Number of items per page to set, the most by default
+            stop: Called with the items, the iteration stops at the first page holding an item it
+                is true for and the paginator is left on the page of that item
+
+        Yields:
+            items of the pages, as ``get_all_items`` returns them
+        """
+        self.browser.plugin.ensure_page_safe()
+        previous = None
+        # the second call goes to the first page if setting the items per page didn't
+        for _ in range(3):
+            prepared = self.browser.execute_script(self.PREPARE_PAGES_SCRIPT, items_per_page)
+            if prepared is None:
+                return
+            loading, current = prepared
+            if previous is None:
+                previous = current
+            self.browser.plugin.ensure_page_safe()
+            if not loading:
+                break
+        restore = previous != items_per_page
+        # position of the item stopped at among all the items
+        stopped_at = None
+        try:
+            while True:
+                # the pages amount comes as null from time to time, the page is read again then
+                state = wait_for(self.browser.execute_script, [self.READ_PAGE_SCRIPT],
+                                 num_sec=10, fail_condition=lambda state: state and
+                                 state['pages'] is None)[0]
+                if state is None:
+                    return
+                self.logger.debug('Read page %s of %s', state['page'], state['pages'])
+                matches = [i for i, item in enumerate(state['items'])
+                           if stop is not None and stop(item)]
+                if matches:
+                    stopped_at = (state['page'] - 1) * items_per_page + matches[0]
+                    if state['advanced'] and not restore:
+                        self.browser.plugin.ensure_page_safe()
+                        self.go_to_page(state['page'])
+                    yield state['items']
+                    return
+                yield state['items']
+                if not state['advanced']:
+                    return
+                self.browser.plugin.ensure_page_safe()
+        finally:
+            if restore:
+                # the following tests on the view get the items per page they set
+                self.set_items_per_page(previous)
+                if stopped_at is not None:
+                    self.go_to_page(stopped_at // previous + 1)
+
     @property
     def min_item(self):
         return self._invoke_cmd('pagination_range')['start']
@@ -2956,17 +3323,20 @@ class EntitiesConditionalView(View, ReportDataControllerMixin):
                 el_name = br.get_attribute('title', el)
                 elements.append({'name': el_name, 'entity_id': el_id})
         else:
-            entities = self._invoke_cmd('get_all_items')
-            for entity in entities:
-                try:
-                    name = entity['item']['cells']['Name']
-                except KeyError:
-                    # Floating Ip view has an issue. it doesn't have Name though it should
-                    name = entity['item']['cells']['Instance name']
-
-                elements.append({'name': name, 'entity_id': entity['item']['id']})
+            elements.extend(self._js_element(entity)
+                            for entity in self._invoke_cmd('get_all_items'))
         return elements
 
+    @staticmethod
+    def _js_element(entity):
+        """Name and id of an item of the JS api"""
+        try:
+            name = entity['item']['cells']['Name']
+        except KeyError:
+            # Floating Ip view has an issue. it doesn't have Name though it should
+            name = entity['item']['cells']['Instance name']
+        return {'name': name, 'entity_id': entity['item']['id']}
+
     @property
     def entity_ids(self):
         return [el['entity_id'] for el in self._current_page_elements]
@@ -3052,6 +3422,12 @@ class EntitiesConditionalView(View, ReportDataControllerMixin):
         if not surf_pages:
             return [self.parent.entity_class(parent=self, entity_id=el['entity_id'],
                                              name=el['name']) for el in self._current_page_elements]
+        elif self.browser.product_version >= '5.9':
+            # all the items of a page by one call
+            return [self.parent.entity_class(parent=self, entity_id=el['entity_id'],
+                                             name=el['name'])
+                    for items in self.paginator.bulk_pages()
+                    for el in map(self._js_element, items)]
         else:
             entities = []
             for _ in self.paginator.pages():
@@ -3073,6 +3449,17 @@ class EntitiesConditionalView(View, ReportDataControllerMixin):
             self.search.clear_simple_search()
             self.search.simple_search(text=keys['name'])
 
+        if surf_pages and list(keys) == ['name'] and self.browser.product_version >= '5.9':
+            # one call per page, stopping on the page of the entity
+            name = keys['name']
+            elements = []
+            for items in self.paginator.bulk_pages(
+                    stop=lambda item: self._js_element(item)['name'] == name):
+                elements = [el for el in map(self._js_element, items) if el['name'] == name]
+            if elements:
+                return self.parent.entity_class(parent=self, entity_id=elements[0]['entity_id'])
+            raise ItemNotFound("Entity {keys} isn't found on this page".format(keys=keys))
+
         for _ in self.paginator.pages():
             if len(keys) == 1 and 'name' in keys:
                 entity_id = self.get_id_by_name(name=keys['name'])
@@ -3916,6 +4303,71 @@ class LineChart(Widget, ClickableMixin):
     X_AXIS = ".//*[contains(@class, 'c3-axis c3-axis-x')]/*[contains(@class, 'tick')]"
     tooltip = Table(locator='.//div[contains(@class,"c3-tooltip-container")]/table')
     LEGENDS = ".//*[contains(@class, 'c3-legend-item c3-legend-item-')]"
+    # Renders the tooltip of every x-axis point with the chart's own tooltip formatter.
+    # Returns null if the c3 chart object is not available, then data are read by hovering.
+    TOOLTIPS_SCRIPT = jsmin('''
+        var root = arguments[0];
+        var legends = arguments[1];
+        var charts = (window.ManageIQ && ManageIQ.charts && ManageIQ.charts.c3) || {};
+        var chart = null;
+        for (var key in charts) {
+            if (charts.hasOwnProperty(key) && charts[key] && charts[key].element &&
+                    root.contains(charts[key].element)) {
+                chart = charts[key];
+                break;
+            }
+        }
+        if (!chart || !chart.internal) {
+            return null;
+        }
+        function getText(el) {
+            return (el.textContent || '').replace(/\\s+/g, ' ').trim();
+        }
+        try {
+            var $$ = chart.internal;
+            var targets = $$.data.targets;
+            var xFormat = $$.axis && $$.axis.getXAxisTickFormat ?
+                $$.axis.getXAxisTickFormat() : $$.getXAxisTickFormat();
+            var yFormat = $$.getYFormat($$.hasArcType());
+            var ticks = root.querySelectorAll('.c3-axis-x > .tick');
+            var container = document.createElement('div');
+            var count = targets.length ? targets[0].values.length : 0;
+            var points = [];
+            for (var i = 0; i < count; i++) {
+                var selected = [];
+                for (var t = 0; t < targets.length; t++) {
+                    var d = $$.getValueOnIndex(targets[t].values, i);
+                    if (!d || d.value === null || d.value === undefined) {
+                        continue;
+                    }
+                    d = $$.addName(d);
+                    if (legends === null || legends.indexOf(d.name) !== -1) {
+                        selected.push(d);
+                    }
+                }
+                var timestamp = ticks[i] ? ticks[i].textContent : null;
+                if (!selected.length) {
+                    points.push([timestamp, null, []]);
+                    continue;
+                }
+                container.innerHTML = $$.config.tooltip_contents.call(
+                    $$, selected, xFormat, yFormat, $$.color);
+                var th = container.querySelector('th');
+                var rows = [];
+                var trs = container.querySelectorAll('tr');
+                for (var r = 0; r < trs.length; r++) {
+                    var tds = trs[r].querySelectorAll('td');
+                    if (tds.length >= 2) {
+                        rows.push([getText(tds[0]), getText(tds[1])]);
+                    }
+                }
+                points.push([timestamp, th ? getText(th) : null, rows]);
+            }
+            return points;
+        } catch (e) {
+            return null;
+        }
+    ''')
 
     def __init__(self, parent, id, logger=None):
         """Create the widget"""
@@ -3960,6 +4412,26 @@ class LineChart(Widget, ClickableMixin):
             leg = self._legends.get(leg)
         return 'c3-legend-item-hidden' not in self.browser.classes(leg)
 
+    def _read_tooltips(self, legends=None):
+        """Reads the tooltips of all the x-axis points with a single JavaScript call.
+
+        The tooltips are rendered from the data bound to the chart by the chart's own formatter,
+        so the texts are the same as when hovering over the chart, legends don't need to be
+        toggled and nothing is hovered.
+
+        Args:
+            legends: Names of legends to read, all the legends if not set (hidden ones too)
+        Returns:
+            :py:class:`list` of ``(timestamp, tooltip title, [(legend, value), ...])`` per x-axis
+            point or ``None`` if the chart object is not reachable from the page.
+        """
+        return self.browser.execute_script(
+            self.TOOLTIPS_SCRIPT, self.browser.element(self),
+            None if legends is None else list(legends), silent=True)
+
+    def _data_from_tooltips(self, points):
+        return {title: dict(rows) for _, title, rows in points if title is not None}
+
     @property
     def _get_data(self):
         data = {}
@@ -4021,6 +4493,9 @@ class LineChart(Widget, ClickableMixin):
         Returns:
             :py:class:`dict` complete data on chart
         """
+        points = self._read_tooltips()
+        if points is not None:
+            return self._data_from_tooltips(points)
         self.display_all_legends()
         return self._get_data
 
@@ -4032,6 +4507,9 @@ class LineChart(Widget, ClickableMixin):
         Returns:
             :py:class:`dict` data for selected legends
         """
+        points = self._read_tooltips(legends)
+        if points is not None:
+            return self._data_from_tooltips(points)
         self.hide_all_legends()
         self.display_legends(*legends)
         return self._get_data
@@ -4044,6 +4522,11 @@ class LineChart(Widget, ClickableMixin):
         Returns:
             :py:class:`dict` data for selected timestamp
         """
+        points = self._read_tooltips()
+        if points is not None:
+            for point_timestamp, _, rows in points:
+                if point_timestamp == timestamp:
+                    return dict(rows)
         el = self._elements.get(timestamp)
         self.browser.move_to_element(el)
         tooltip_data = {}